@@ -0,0 +1,201 @@
+"""Admission control for the chat endpoints: per-client rate limits and a bounded run queue.
+
+A chat request holds the worker for seconds of LLM work, so admitting every
+request lets latency grow without bound under a spike. A request first
+spends a token from its client's bucket (429 when the bucket is empty),
+then takes one of `max_concurrent` slots, waiting in a FIFO queue of at
+most `max_queue` requests for at most `queue_timeout` seconds (503 when the
+queue is full or the wait runs out). Both rejections come with a
+Retry-After hint. Everything runs on the event loop, so there are no locks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+try:
+    from .metrics import observe_stage
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from metrics import observe_stage
+
+REJECT_REASONS = ("rate_limited", "queue_full", "queue_timeout")
+# Weight of the newest slot hold time in the running average behind Retry-After.
+HOLD_SMOOTHING = 0.2
+
+
+class Rejected(Exception):
+    """The request was not admitted; answer `status_code` with a Retry-After header."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class RateLimiter:
+    """A token bucket per client: `per_minute` tokens a minute, holding at most `burst`.
+
+    Buckets are kept for the `max_clients` most recently seen clients; an
+    evicted client starts again with a full bucket.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        # client -> (tokens, monotonic time they were counted)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def check(self, client: str, cost: float = 1.0) -> None:
+        """Spend `cost` tokens or raise a 429 `Rejected`; `cost` must fit in a full bucket."""
+        if not self.enabled:
+            return
+        if cost > self.burst:
+            raise ValueError(f"Cost {cost} exceeds the bucket size {self.burst}.")
+        now = time.monotonic()
+        tokens, counted = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - counted) * self.rate)
+        if tokens < cost:
+            self._buckets[client] = (tokens, now)
+            raise Rejected(429, "rate_limited", (cost - tokens) / self.rate)
+        self._buckets[client] = (tokens - cost, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+
+class Ticket:
+    """An admitted request's slot; `release()` (or leaving the `with` block) frees it once."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._started)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Rate-limits clients and bounds how many admitted requests run at once.
+
+    A freed slot is handed straight to the oldest waiter, so queued requests
+    are served in arrival order and a newcomer cannot overtake them.
+    `max_concurrent <= 0` disables the slot limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        rate_per_minute: float = 0.0,
+        rate_burst: int = 1,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.limiter = RateLimiter(rate_per_minute, rate_burst)
+        self.active = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = dict.fromkeys(REJECT_REASONS, 0)
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._hold_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Rough seconds until a new request could get a slot, from the average hold time."""
+        hold = self._hold_seconds or 1.0
+        return hold * (self.queued + 1) / max(1, self.max_concurrent)
+
+    async def admit(self, client: str, cost: float = 1.0) -> Ticket:
+        """Wait for a slot for `client`, or raise `Rejected` without waiting longer than allowed."""
+        self.charge(client, cost)
+        return await self.acquire()
+
+    def charge(self, client: str, cost: float = 1.0) -> None:
+        """Spend `cost` of `client`'s rate-limit tokens, or raise a 429 `Rejected`."""
+        try:
+            self.limiter.check(client, cost)
+        except Rejected as exc:
+            self.rejected[exc.reason] += 1
+            raise
+
+    async def acquire(self) -> Ticket:
+        """Wait for a slot without charging any client, or raise a 503 `Rejected`."""
+        started = time.monotonic()
+        await self._acquire()
+        self.admitted += 1
+        observe_stage("admission_wait", time.monotonic() - started)
+        return Ticket(self)
+
+    async def _acquire(self) -> None:
+        if self.max_concurrent <= 0 or (self.active < self.max_concurrent and not self._waiters):
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise Rejected(503, "queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self._release(None)
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(exc, asyncio.TimeoutError):
+                self.rejected["queue_timeout"] += 1
+                raise Rejected(503, "queue_timeout", self.retry_after()) from None
+            raise
+
+    def _release(self, held_seconds: Optional[float]) -> None:
+        if held_seconds is not None:
+            if self._hold_seconds:
+                self._hold_seconds += HOLD_SMOOTHING * (held_seconds - self._hold_seconds)
+            else:
+                self._hold_seconds = held_seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter, so `active` stays the same.
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
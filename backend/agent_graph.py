@@ -0,0 +1,199 @@
+"""The LangGraph agent: state, nodes and graph construction.
+
+Importing LangGraph (and the OpenAI client it pulls in through LangSmith)
+dominates the app's import time, so main.py only imports this module when
+the first chat needs the agent or the background warm-up builds it.
+
+Every run is bounded. The model gets at most `max_iterations` turns (the
+last one without tools, so it has to answer), and a run given a deadline
+in `config["configurable"]["deadline"]` (a `time.monotonic()` timestamp)
+cancels whatever model or tool call is in flight when it passes. Either way
+the run ends with the best answer available instead of an error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import (
+    Annotated,
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    TypedDict,
+)
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode
+
+try:
+    from .intent import navigation_from_text
+    from .metrics import AGENT_DEGRADED, annotate, record_token_usage, span
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from intent import navigation_from_text
+    from metrics import AGENT_DEGRADED, annotate, record_token_usage, span
+
+FALLBACK_PREFIX = "I couldn't put together a full answer, but here is the most relevant information I found:\n\n"
+FALLBACK_NO_CONTEXT = "Sorry, I couldn't put together an answer to that. Please try again in a moment."
+FALLBACK_CONTEXT_CHARS = 1200
+TOOL_TIMEOUT_MESSAGE = "The request ran out of time before this tool finished."
+
+# Called with a turn's tool calls before they run; the context manager it
+# returns is held while they run (e.g. to batch their embedding calls).
+PrepareTools = Callable[[List[Dict[str, Any]]], Awaitable[ContextManager[Any]]]
+
+
+# -------------------- Agent State -------------------- #
+
+class AgentState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+    navigation_payload: Optional[str]
+    # Agent turns taken so far in this run.
+    iterations: int
+
+
+# -------------------- Limits -------------------- #
+
+def remaining_seconds(config: Optional[RunnableConfig]) -> Optional[float]:
+    """Seconds left before the run's deadline, or None when it has none."""
+    deadline = ((config or {}).get("configurable") or {}).get("deadline")
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def fallback_answer(messages: Sequence[BaseMessage], reason: str) -> AIMessage:
+    """The best answer available without another model call: this turn's retrieved context."""
+    turn: Sequence[BaseMessage] = messages
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            turn = messages[index + 1:]
+            break
+    context = [
+        str(message.content)
+        for message in turn
+        if isinstance(message, ToolMessage)
+        and message.name != "navigate_to_section"
+        and message.status != "error"
+    ]
+    AGENT_DEGRADED.inc(reason=reason)
+    annotate(degraded=reason)
+    if not context:
+        return AIMessage(content=FALLBACK_NO_CONTEXT, response_metadata={"degraded": reason})
+    body = "\n\n".join(context)[:FALLBACK_CONTEXT_CHARS]
+    return AIMessage(content=FALLBACK_PREFIX + body, response_metadata={"degraded": reason})
+
+
+# -------------------- Graph -------------------- #
+
+def build_graph(
+    llm: BaseChatModel,
+    functions: Sequence[Callable[..., Any]],
+    max_iterations: int = 4,
+    prepare_tools: Optional[PrepareTools] = None,
+):
+    """Compile the agent graph with `functions` exposed to the model as tools."""
+    tools = [tool(function) for function in functions]
+    llm_with_tools = llm.bind_tools(tools)
+
+    # 1. Agent Node: The brain of the operation, decides what to do.
+    async def agent_node(state: AgentState, config: RunnableConfig) -> dict:
+        """Invokes the LLM to determine the next action."""
+        iterations = state.get("iterations", 0) + 1
+        remaining = remaining_seconds(config)
+        if remaining is not None and remaining <= 0:
+            return {"messages": [fallback_answer(state["messages"], "deadline")], "iterations": iterations}
+
+        # The last allowed turn gets no tools, so the model has to answer.
+        final_turn = iterations >= max_iterations
+        model = llm if final_turn else llm_with_tools
+        try:
+            with span("llm") as call:
+                response = await asyncio.wait_for(model.ainvoke(state["messages"]), remaining)
+                call["tool_calls"] = [tool_call["name"] for tool_call in response.tool_calls]
+        except asyncio.TimeoutError:
+            return {"messages": [fallback_answer(state["messages"], "deadline")], "iterations": iterations}
+        record_token_usage(response.usage_metadata)
+        if final_turn and response.tool_calls:
+            return {"messages": [fallback_answer(state["messages"], "iterations")], "iterations": iterations}
+
+        # Check if a navigation tool was called and extract the payload
+        navigation_payload = None
+        if response.tool_calls:
+            for tool_call in response.tool_calls:
+                if tool_call["name"] == "navigate_to_section":
+                    navigation_payload = tool_call["args"].get("section")
+                    break  # Stop after finding the first navigation call
+        else:
+            # Fallback: infer navigation intent from the assistant's text when the tool was not called
+            navigation_payload = navigation_from_text(response.content)
+
+        # Only write the payload when one was found, so the final answer turn
+        # does not clear a navigation chosen earlier in the run.
+        update = {"messages": [response], "iterations": iterations}
+        if navigation_payload:
+            update["navigation_payload"] = navigation_payload
+        return update
+
+    # 2. Tool Node: Executes the tools chosen by the agent. ToolNode runs a
+    # turn's calls concurrently; this wrapper bounds them by the deadline.
+    tool_node = ToolNode(tools)
+
+    async def tools_node(state: AgentState, config: RunnableConfig) -> dict:
+        tool_calls = state["messages"][-1].tool_calls
+
+        async def run_tools() -> dict:
+            scope = await prepare_tools(tool_calls) if prepare_tools else nullcontext()
+            with scope:
+                return await tool_node.ainvoke(state, config)
+
+        with span("tools") as call:
+            call["calls"] = len(tool_calls)
+            try:
+                return await asyncio.wait_for(run_tools(), remaining_seconds(config))
+            except asyncio.TimeoutError:
+                call["timed_out"] = True
+                return {
+                    "messages": [
+                        ToolMessage(
+                            content=TOOL_TIMEOUT_MESSAGE,
+                            tool_call_id=tool_call["id"],
+                            name=tool_call["name"],
+                            status="error",
+                        )
+                        for tool_call in tool_calls
+                    ]
+                }
+
+    # 3. Edge Logic: Decides whether to end the graph or continue.
+    def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
+        """Determines the next step based on the last message."""
+        last_message = state["messages"][-1]
+        if last_message.tool_calls and state.get("iterations", 0) < max_iterations:
+            return "tools"
+        return "__end__"
+
+    graph_builder = StateGraph(AgentState)
+
+    graph_builder.add_node("agent", agent_node)
+    graph_builder.add_node("tools", tools_node)
+
+    graph_builder.set_entry_point("agent")
+
+    graph_builder.add_conditional_edges(
+        "agent",
+        should_continue,
+    )
+    graph_builder.add_edge("tools", "agent")
+
+    return graph_builder.compile()
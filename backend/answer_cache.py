@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+PUNCTUATION_RE = re.compile(r"[^\w\s]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = PUNCTUATION_RE.sub(" ", message.lower())
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+@dataclass
+class _Entry:
+    response: Any
+    vector: Optional[np.ndarray]
+    expires_at: float
+
+
+class AnswerCache:
+    """Bounded LRU cache of chat answers with TTL and embedding-similarity lookup.
+
+    Entries are keyed by normalized message text. Each entry may also carry
+    the unit-normalized query embedding so paraphrases above
+    `similarity_threshold` (cosine) are served too. `generation` is bumped by
+    `invalidate()`; answers computed against an older generation are dropped
+    on `store()` so they never outlive a content change.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.93,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.generation = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.max_entries > 0 and self.similarity_threshold <= 1.0
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, message: str) -> Optional[Any]:
+        """Exact match on normalized text. A miss here is not counted yet."""
+        key = normalize_message(message)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.response
+
+    def lookup_similar(self, vector: Optional[Sequence[float]]) -> Optional[Any]:
+        """Best cosine match above the threshold; counts a miss when nothing qualifies."""
+        with self._lock:
+            if vector is not None and self.semantic_enabled:
+                query = _unit(vector)
+                self._expire(time.monotonic())
+                best_key, best_score = None, self.similarity_threshold
+                for key, entry in self._entries.items():
+                    if entry.vector is None or entry.vector.shape != query.shape:
+                        continue
+                    score = float(np.dot(entry.vector, query))
+                    if score >= best_score:
+                        best_key, best_score = key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return self._entries[best_key].response
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        message: str,
+        response: Any,
+        vector: Optional[Sequence[float]],
+        generation: int,
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        key = normalize_message(message)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = _Entry(
+                response=response,
+                vector=_unit(vector) if vector is not None else None,
+                expires_at=time.monotonic() + self.ttl_seconds,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "generation": self.generation,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
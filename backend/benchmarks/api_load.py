@@ -0,0 +1,147 @@
+"""Latency percentiles, throughput and peak RSS of the API at controlled concurrency.
+
+    python -m backend.benchmarks.api_load --concurrency 1 8 32 --requests 200 --llm-latency 0.05
+
+Runs the app in-process over ASGI against the offline fake chat model and
+hash embeddings, so no network or API key is needed. Each endpoint is driven
+by `concurrency` workers until `--requests` responses have come back. The
+answer cache is disabled unless `--answer-cache` is given, so every chat
+request exercises the agent, and chat admission control (rate limit and run
+slots) unless `--admission` is given; with it, shed requests count as
+errors. Results are saved as JSON (see report.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from backend.benchmarks.report import latency_summary, peak_rss_mb, write_results
+
+ENDPOINTS = ("projects", "blogs", "blog", "chat")
+
+
+async def drive(
+    send: Callable[[int], Awaitable],
+    total: int,
+    concurrency: int,
+) -> Tuple[List[float], int, float]:
+    """Run `send(i)` for i < total with at most `concurrency` in flight."""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            started = time.perf_counter()
+            try:
+                response = await send(i)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def request_factories(client, blogs: List[Dict], projects: List[Dict]) -> Dict[str, Callable[[int], Awaitable]]:
+    subjects = [project["name"] for project in projects] + [blog["title"] for blog in blogs]
+    questions = [
+        "What is {} about?",
+        "Which technologies were used in {}?",
+        "Summarize the results of {}.",
+    ]
+    return {
+        "projects": lambda i: client.get("/api/projects"),
+        "blogs": lambda i: client.get("/api/blogs"),
+        "blog": lambda i: client.get(f"/api/blogs/{blogs[i % len(blogs)]['slug']}"),
+        "chat": lambda i: client.post(
+            "/api/chat",
+            json={"message": questions[i % len(questions)].format(subjects[i % len(subjects)])},
+        ),
+    }
+
+
+async def run(args: argparse.Namespace) -> List[Dict]:
+    import httpx
+
+    from backend import main
+
+    await main.on_startup()
+    blogs, projects = main.get_all_blogs(), main.get_all_projects()
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        factories = request_factories(client, blogs, projects)
+        for endpoint in args.endpoints:
+            send = factories[endpoint]
+            await drive(send, min(args.warmup, args.requests), 1)
+            for concurrency in args.concurrency:
+                total = args.chat_requests if endpoint == "chat" else args.requests
+                latencies, errors, wall = await drive(send, total, concurrency)
+                results.append(
+                    {
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        "requests": total,
+                        "errors": errors,
+                        "throughput_rps": total / wall if wall else 0.0,
+                        **latency_summary(latencies),
+                        "peak_rss_mb": peak_rss_mb(),
+                    }
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="requests per listing run")
+    parser.add_argument("--chat-requests", type=int, default=100, help="requests per chat run")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--embedding-latency", type=float, default=0.0)
+    parser.add_argument("--answer-cache", action="store_true", help="keep the chat answer cache enabled")
+    parser.add_argument("--admission", action="store_true", help="keep chat admission control enabled")
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    # Must be set before the app module is imported.
+    os.environ["PORTFOLIO_FAKE_MODELS"] = "1"
+    os.environ["PORTFOLIO_FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["PORTFOLIO_FAKE_EMBEDDING_LATENCY"] = str(args.embedding_latency)
+    if not args.answer_cache:
+        os.environ["ANSWER_CACHE_MAX_ENTRIES"] = "0"
+    if not args.admission:
+        os.environ["CHAT_MAX_CONCURRENCY"] = "0"
+        os.environ["CHAT_RATE_PER_MINUTE"] = "0"
+
+    results = asyncio.run(run(args))
+
+    print(
+        f"{'endpoint':<9} {'conc':>5} {'req/s':>9} {'p50_ms':>8} {'p95_ms':>8} "
+        f"{'p99_ms':>8} {'errors':>7} {'rss_MB':>8}"
+    )
+    for row in results:
+        print(
+            f"{row['endpoint']:<9} {row['concurrency']:>5} {row['throughput_rps']:>9.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+            f"{row['errors']:>7} {row['peak_rss_mb']:>8.1f}"
+        )
+    write_results("api_load", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
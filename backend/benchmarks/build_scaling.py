@@ -0,0 +1,99 @@
+"""`initialize_database` and `build_vector_store` on synthetic corpora of growing size.
+
+    python -m backend.benchmarks.build_scaling --sizes 100 1000 10000 100000
+
+Each size runs in a fresh interpreter against synthetic seed files in a temp
+dir, so peak RSS is per size. Phases:
+
+* `init_db`   – seed the database from the seed files (startup path)
+* `cold`      – build the index with an empty embedding cache
+* `cached`    – rebuild with every vector served from the embedding cache
+* `snapshot`  – warm start from the snapshot written by the previous phase
+
+Embeddings are the local hash embeddings (`--dim` wide), so the numbers
+measure this code rather than the embedding API.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from backend.benchmarks.report import peak_rss_mb, write_results
+
+PHASES = ("init_db", "cold", "cached", "snapshot")
+
+
+def _child(rows: int, dim: int) -> None:
+    os.environ["PORTFOLIO_FAKE_MODELS"] = "1"
+    from backend.benchmarks.synthetic import temporary_data_dir
+
+    timings: Dict[str, float] = {}
+    with temporary_data_dir(rows):
+        from backend import main
+        from backend.indexing import vector_count
+        from backend.fakes import fake_embeddings
+
+        embeddings = fake_embeddings(size=dim)
+
+        started = time.perf_counter()
+        main.initialize_database()
+        timings["init_db"] = time.perf_counter() - started
+
+        for phase in ("cold", "cached"):
+            started = time.perf_counter()
+            main.build_vector_store(force_rebuild=True, embeddings=embeddings)
+            timings[phase] = time.perf_counter() - started
+        chunks = vector_count(main.LIVE_INDEX.store)
+
+        main.LIVE_INDEX.current = None
+        started = time.perf_counter()
+        main.build_vector_store(embeddings=embeddings)
+        timings["snapshot"] = time.perf_counter() - started
+
+    result = {"rows": rows, "chunks": chunks, "dim": dim, "peak_rss_mb": peak_rss_mb()}
+    result.update({f"{phase}_s": seconds for phase, seconds in timings.items()})
+    print("RESULT " + json.dumps(result))
+
+
+def _run_size(rows: int, dim: int) -> Dict:
+    cmd = [sys.executable, "-m", "backend.benchmarks.build_scaling", "--child", str(rows), "--dim", str(dim)]
+    completed = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"No result for {rows} rows:\n{completed.stderr[-2000:]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=256, help="embedding width")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _child(args.child, args.dim)
+        return
+
+    results: List[Dict] = []
+    print(f"{'rows':>7} {'chunks':>8} " + " ".join(f"{phase + '_s':>10}" for phase in PHASES) + f" {'rss_MB':>8}")
+    for rows in args.sizes:
+        row = _run_size(rows, args.dim)
+        results.append(row)
+        print(
+            f"{row['rows']:>7} {row['chunks']:>8} "
+            + " ".join(f"{row[phase + '_s']:>10.3f}" for phase in PHASES)
+            + f" {row['peak_rss_mb']:>8.1f}"
+        )
+    write_results("build_scaling", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
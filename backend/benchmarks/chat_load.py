@@ -0,0 +1,83 @@
+"""Check that listing endpoints keep their latency while chats are in flight.
+
+Runs the app in-process against the offline fake models:
+
+    python -m backend.benchmarks.chat_load --chats 20 --llm-latency 0.5
+
+Listing latency is sampled once with the app idle and once while `--chats`
+concurrent /api/chat requests are waiting on the (simulated) LLM.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+from backend.benchmarks.report import percentile
+
+
+async def sample_latency(client, path: str, samples: int) -> List[float]:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from backend import main
+
+    await main.on_startup()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        idle = await sample_latency(client, args.path, args.samples)
+
+        started = time.perf_counter()
+        chats = [
+            asyncio.create_task(
+                client.post("/api/chat", json={"message": f"Tell me about project number {i}"})
+            )
+            for i in range(args.chats)
+        ]
+        await asyncio.sleep(0.05)  # let every chat reach the LLM call
+        loaded = await sample_latency(client, args.path, args.samples)
+        responses = await asyncio.gather(*chats)
+        chat_wall = time.perf_counter() - started
+
+    ok = sum(1 for response in responses if response.status_code == 200)
+    shed = sum(1 for response in responses if response.status_code in (429, 503))
+    print(f"{'phase':<8} {'p50_ms':>8} {'p95_ms':>8} {'max_ms':>8}")
+    for phase, timings in (("idle", idle), ("loaded", loaded)):
+        print(
+            f"{phase:<8} {statistics.median(timings) * 1000:>8.2f} "
+            f"{percentile(timings, 95) * 1000:>8.2f} {max(timings) * 1000:>8.2f}"
+        )
+    print(f"{ok}/{args.chats} chats completed in {chat_wall:.2f}s ({shed} turned away by admission control)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--path", default="/api/projects")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Must be set before the app module is imported.
+    os.environ["PORTFOLIO_FAKE_MODELS"] = "1"
+    os.environ["PORTFOLIO_FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    # Every chat comes from the same simulated client, so only the run slots apply.
+    os.environ.setdefault("CHAT_RATE_PER_MINUTE", "0")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
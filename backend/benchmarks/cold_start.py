@@ -0,0 +1,76 @@
+"""Measure cold-start time with and without the persisted vector index snapshot.
+
+Each mode runs in a fresh interpreter so import and startup costs are included:
+
+    python -m backend.benchmarks.cold_start --runs 3 --fake-embeddings
+
+`rebuild` ignores the snapshot and rebuilds the index (reusing any vectors in
+the rag.db embedding cache), `snapshot` warm-starts from the index written by
+the previous run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = ("rebuild", "snapshot")
+
+
+def _child(mode: str, fake_embeddings: bool) -> None:
+    started = time.perf_counter()
+    from backend import main
+
+    embeddings = None
+    if fake_embeddings:
+        from backend.fakes import fake_embeddings
+
+        embeddings = fake_embeddings()
+
+    main.initialize_database()
+    main.build_vector_store(force_rebuild=mode == "rebuild", embeddings=embeddings)
+    print(f"ELAPSED {time.perf_counter() - started:.6f}")
+
+
+def _run_once(mode: str, fake_embeddings: bool) -> float:
+    cmd = [sys.executable, "-m", "backend.benchmarks.cold_start", "--child", mode]
+    if fake_embeddings:
+        cmd.append("--fake-embeddings")
+    started = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    for line in result.stdout.splitlines():
+        if line.startswith("ELAPSED "):
+            return float(line.split()[1])
+    return wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--fake-embeddings",
+        action="store_true",
+        help="Use deterministic local embeddings instead of calling OpenAI.",
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.fake_embeddings)
+        return
+
+    print(f"{'mode':<10} {'runs':>4} {'median_s':>10} {'min_s':>10} {'max_s':>10}")
+    for mode in MODES:
+        timings = [_run_once(mode, args.fake_embeddings) for _ in range(args.runs)]
+        print(
+            f"{mode:<10} {len(timings):>4} {statistics.median(timings):>10.3f} "
+            f"{min(timings):>10.3f} {max(timings):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare two saved benchmark results files metric by metric.
+
+    python -m backend.benchmarks.compare results/api_load-A.json results/api_load-B.json
+
+Rows are matched on their non-numeric fields plus `concurrency`/`rows`;
+every shared numeric metric is printed with its relative change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, Tuple
+
+KEY_FIELDS = ("endpoint", "concurrency", "rows", "dim")
+
+
+def _key(row: Dict) -> Tuple:
+    return tuple((name, row[name]) for name in KEY_FIELDS if name in row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    with open(args.candidate, "r", encoding="utf-8") as handle:
+        candidate = json.load(handle)
+    if baseline["benchmark"] != candidate["benchmark"]:
+        parser.error(f"cannot compare {baseline['benchmark']} with {candidate['benchmark']}")
+
+    print(f"{baseline['meta'].get('git_commit')} -> {candidate['meta'].get('git_commit')}")
+    before = {_key(row): row for row in baseline["results"]}
+    for row in candidate["results"]:
+        old = before.get(_key(row))
+        if old is None:
+            continue
+        label = " ".join(f"{name}={value}" for name, value in _key(row))
+        print(label)
+        for metric, value in row.items():
+            if metric in KEY_FIELDS or not isinstance(value, (int, float)) or metric not in old:
+                continue
+            change = (value - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            print(f"  {metric:<16} {old[metric]:>12.3f} {value:>12.3f} {change:>+8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Size of the context `retrieve_portfolio_context` hands the LLM, per token budget.
+
+    python -m backend.benchmarks.context_size --budgets 300 400 600
+
+Runs every `portfolio` question from `data/intent_examples.json` through
+retrieval and reports the tokens and passages of the packed context, plus
+the time spent assembling it. `top3` is the previous behaviour for
+comparison: the three best fused candidates joined whole, with no
+deduplication or budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from backend.benchmarks.report import latency_summary, percentile, write_results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budgets", type=int, nargs="+", default=[300, 400, 600])
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("PORTFOLIO_FAKE_MODELS", "1")
+    from backend import main as app_main
+    from backend import retrieval
+    from backend.chunking import count_tokens
+    from backend.context import PASSAGE_SEPARATOR, assemble_context
+
+    app_main.initialize_database()
+    app_main.build_vector_store()
+    store = app_main.LIVE_INDEX.store
+    examples = json.loads((app_main.DATA_DIR / "intent_examples.json").read_text(encoding="utf-8"))
+    questions = [row["text"] for row in examples if row["label"] == "portfolio"]
+
+    candidates = {}
+    for question in questions:
+        lexical = retrieval.search_content(retrieval.build_match_query(question), retrieval.LEXICAL_K)
+        vector = store.embeddings.embed_query(question)
+        hits = retrieval.search_vectors(store, [vector])[0]
+        candidates[question] = retrieval._candidates(lexical, hits)
+
+    results: List[Dict] = []
+    baseline = [
+        count_tokens(PASSAGE_SEPARATOR.join(passage.text for passage in passages[:3]))
+        for passages in candidates.values()
+    ]
+    results.append({"budget": "top3", "tokens": baseline, "passages": [3] * len(baseline), "seconds": [0.0]})
+    for budget in args.budgets:
+        row: Dict = {"budget": budget, "tokens": [], "passages": [], "seconds": []}
+        for passages in candidates.values():
+            started = time.perf_counter()
+            packed = assemble_context(passages, budget)
+            row["seconds"].append(time.perf_counter() - started)
+            row["tokens"].append(count_tokens(PASSAGE_SEPARATOR.join(packed)))
+            row["passages"].append(len(packed))
+        results.append(row)
+
+    print(f"{len(questions)} questions")
+    print(f"{'budget':>6} {'tok_p50':>8} {'tok_p95':>8} {'tok_max':>8} {'passages':>8} {'assemble_p50_ms':>16}")
+    summary = []
+    for row in results:
+        tokens = row["tokens"]
+        entry = {
+            "budget": row["budget"],
+            "tokens_p50": percentile(tokens, 50),
+            "tokens_p95": percentile(tokens, 95),
+            "tokens_max": max(tokens),
+            "passages_mean": statistics.mean(row["passages"]),
+            "assemble": latency_summary(row["seconds"]),
+        }
+        summary.append(entry)
+        print(
+            f"{entry['budget']:>6} {entry['tokens_p50']:>8} {entry['tokens_p95']:>8} {entry['tokens_max']:>8} "
+            f"{entry['passages_mean']:>8.1f} {entry['assemble']['p50_ms']:>16.2f}"
+        )
+    write_results("context_size", args, summary, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Calls per second for the SQLite read paths with pooled vs per-call connections.
+
+    python -m backend.benchmarks.db_reads --calls 2000
+
+`per-call` reproduces the old behaviour of opening a fresh connection for
+every query; `pooled` uses the long-lived read-only connections in db.py.
+The HTTP listing endpoints are served from the in-memory response cache, so
+these readers now matter for cache rebuilds, retrieval and indexing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def _per_call_connection():
+    from backend import db
+
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _calls_per_second(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return calls / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    from backend import db
+
+    db.initialize_database()
+    slug = db.get_all_blogs()[0]["slug"]
+    readers = {
+        "get_all_projects": db.get_all_projects,
+        "get_all_blogs": db.get_all_blogs,
+        "get_blog_by_slug": lambda: db.get_blog_by_slug(slug),
+        "search_content": lambda: db.search_content('"GraphGPT"'),
+    }
+    pooled_reader = db._read_connection
+
+    results = {}
+    for mode, reader in (("per-call", _per_call_connection), ("pooled", pooled_reader)):
+        db._read_connection = reader
+        for name, fn in readers.items():
+            _calls_per_second(fn, min(50, args.calls))  # warm up
+            results[(mode, name)] = _calls_per_second(fn, args.calls)
+    db._read_connection = pooled_reader
+
+    print(f"{'reader':<20} {'per-call/s':>12} {'pooled/s':>10} {'speedup':>8}")
+    for name in readers:
+        before, after = results[("per-call", name)], results[("pooled", name)]
+        print(f"{name:<20} {before:>12.0f} {after:>10.0f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Time and peak memory of the RAG gathering/chunking stream as the corpus grows.
+
+    python -m backend.benchmarks.gather_scaling --sizes 100 1000 5000
+
+Each size seeds that many blogs and documents into a temporary database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from backend.benchmarks.synthetic import (
+    synthetic_blogs,
+    synthetic_documents,
+    temporary_database,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+    os.environ.setdefault("PORTFOLIO_FAKE_MODELS", "1")
+
+    from backend import db, main as app_main
+
+    print(f"{'rows':>7} {'chunks':>8} {'seconds':>9} {'ms/row':>8} {'peak_MB':>9} {'KB/row':>8}")
+    for size in args.sizes:
+        with temporary_database():
+            db.seed_blogs(synthetic_blogs(size))
+            db.seed_documents(synthetic_documents(size))
+            rows = 2 * size
+
+            started = time.perf_counter()
+            chunks = sum(1 for _ in app_main.iter_chunks_for_rag())
+            elapsed = time.perf_counter() - started
+
+            tracemalloc.start()
+            for _ in app_main.iter_documents_for_rag():
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print(
+            f"{rows:>7} {chunks:>8} {elapsed:>9.3f} {elapsed / rows * 1000:>8.3f} "
+            f"{peak / 1e6:>9.2f} {peak / rows / 1e3:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Precision/recall and latency of the local intent router.
+
+    python -m backend.benchmarks.intent_report --folds 5
+
+Accuracy is measured with stratified k-fold cross-validation over
+`data/intent_examples.json`: every example is routed by a router trained on
+the other folds. A bypass is only correct when it matches the label, and
+`portfolio` questions must always reach the agent. Latency is per message,
+for the compiled patterns alone and for the full router.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from typing import Dict, List
+
+
+def _outcome(intent) -> str:
+    if intent.kind == "navigate":
+        return intent.section
+    return intent.kind
+
+
+def _expected(label: str) -> str:
+    return "agent" if label == "portfolio" else label
+
+
+def cross_validate(examples: List[Dict[str, str]], folds: int) -> Dict[str, dict]:
+    from sklearn.model_selection import StratifiedKFold
+
+    from backend.intent import IntentRouter
+
+    texts = [row["text"] for row in examples]
+    labels = [row["label"] for row in examples]
+    counts: Dict[str, Counter] = {"navigate": Counter(), "off_topic": Counter()}
+    misrouted = []
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    for train, test in splitter.split(texts, labels):
+        router = IntentRouter([examples[i] for i in train])
+        for i in test:
+            got = _outcome(router.route(texts[i]))
+            want = _expected(labels[i])
+            for kind, members in (("navigate", ("projects", "blogs", "home")), ("off_topic", ("off_topic",))):
+                predicted, actual = got in members, want in members
+                if predicted and actual and got == want:
+                    counts[kind]["tp"] += 1
+                elif predicted:
+                    counts[kind]["fp"] += 1
+                elif actual:
+                    counts[kind]["fn"] += 1
+            if got != want:
+                misrouted.append({"text": texts[i], "expected": want, "routed": got})
+
+    report = {}
+    for kind, count in counts.items():
+        tp, fp, fn = count["tp"], count["fp"], count["fn"]
+        report[kind] = {
+            "precision": tp / (tp + fp) if tp + fp else 1.0,
+            "recall": tp / (tp + fn) if tp + fn else 1.0,
+            "bypassed": tp + fp,
+        }
+    report["misrouted"] = misrouted
+    return report
+
+
+def _microseconds_per_call(fn, messages: List[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            fn(message)
+    return (time.perf_counter() - started) / (rounds * len(messages)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    from backend.intent import IntentRouter, is_request_off_topic, load_intent_examples, match_navigation
+
+    examples = load_intent_examples()
+    report = cross_validate(examples, args.folds)
+
+    messages = [row["text"] for row in examples]
+    router = IntentRouter(examples)
+    router.warm_up()
+    report["latency_us"] = {
+        "patterns": _microseconds_per_call(
+            lambda message: is_request_off_topic(message) or match_navigation(message),
+            messages,
+            args.rounds,
+        ),
+        "router": _microseconds_per_call(router.route, messages, args.rounds),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{len(examples)} examples, {args.folds}-fold cross-validation")
+    print(f"{'bypass':<10} {'precision':>9} {'recall':>7} {'routed':>7}")
+    for kind in ("navigate", "off_topic"):
+        row = report[kind]
+        print(f"{kind:<10} {row['precision']:>9.3f} {row['recall']:>7.3f} {row['bypassed']:>7}")
+    print(f"patterns only: {report['latency_us']['patterns']:.1f} us/message")
+    print(f"full router:   {report['latency_us']['router']:.1f} us/message")
+    for row in report["misrouted"]:
+        print(f"  misrouted {row['text']!r}: expected {row['expected']}, routed {row['routed']}")
+
+
+if __name__ == "__main__":
+    main()
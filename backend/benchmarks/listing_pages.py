@@ -0,0 +1,81 @@
+"""Cost of the paged, filtered listing queries against reading the whole listing.
+
+    python -m backend.benchmarks.listing_pages --rows 30000 --limit 20
+
+Seeds a synthetic corpus (a third each documents, projects and blogs) into
+a temp database, then times each query and reports the JSON size of its
+result. `full` is the read behind the unpaged listing; the page queries
+should cost the same at `first` and `deep` (90% of the way through the
+listing), with or without a tag.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from backend.benchmarks.report import latency_summary, write_results
+
+
+def _time(fn: Callable[[], List[Dict[str, Any]]], repeat: int) -> Dict[str, Any]:
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = fn()
+        seconds.append(time.perf_counter() - started)
+    return {**latency_summary(seconds), "rows": len(rows), "bytes": len(json.dumps(rows))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=30000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--tag", default="RAG")
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    from backend import db
+    from backend.benchmarks.synthetic import temporary_data_dir
+
+    results = []
+    with temporary_data_dir(args.rows):
+        db.initialize_database()
+        projects = db.get_all_projects()
+        blogs = db.get_all_blogs()
+        deep_project = db.project_listing_key(projects[len(projects) * 9 // 10])
+        deep_blog = db.blog_listing_key(blogs[len(blogs) * 9 // 10])
+        tagged_blogs = [blog for blog in blogs if args.tag in blog["tags"]]
+        deep_tagged_blog = db.blog_listing_key(tagged_blogs[len(tagged_blogs) * 9 // 10])
+        limit = args.limit
+
+        queries = {
+            ("projects", "full"): db.get_all_projects,
+            ("projects", "first"): lambda: db.list_projects_page(limit),
+            ("projects", "deep"): lambda: db.list_projects_page(limit, deep_project),
+            ("projects", "type"): lambda: db.list_projects_page(limit, project_type="work"),
+            ("projects", "type+tag"): lambda: db.list_projects_page(limit, tag=args.tag, project_type="work"),
+            ("blogs", "full"): db.get_all_blogs,
+            ("blogs", "first"): lambda: db.list_blogs_page(limit),
+            ("blogs", "deep"): lambda: db.list_blogs_page(limit, deep_blog),
+            ("blogs", "tag"): lambda: db.list_blogs_page(limit, tag=args.tag),
+            ("blogs", "tag_deep"): lambda: db.list_blogs_page(limit, deep_tagged_blog, tag=args.tag),
+        }
+        for (listing, query), fn in queries.items():
+            fn()  # warm the page cache
+            results.append({"listing": listing, "query": query, **_time(fn, args.repeat)})
+
+    print(f"{len(projects)} projects, {len(blogs)} blogs, page size {args.limit}")
+    print(f"{'listing':<9} {'query':<9} {'p50_ms':>8} {'p95_ms':>8} {'rows':>6} {'kB':>8}")
+    for row in results:
+        print(
+            f"{row['listing']:<9} {row['query']:<9} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+            f"{row['rows']:>6} {row['bytes'] / 1024:>8.1f}"
+        )
+    write_results("listing_pages", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
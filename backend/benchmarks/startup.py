@@ -0,0 +1,161 @@
+"""Import-time breakdown and time to first response of a fresh API worker.
+
+    python -m backend.benchmarks.startup --runs 3 --max-import-ms 1500 --max-first-response-ms 3000
+
+`import` runs `python -X importtime -c "import backend.main"` and groups the
+self time of every imported module by top-level package. `first response`
+starts uvicorn and measures, from process spawn, when each cheap endpoint
+first answers. Medians over `--runs` fresh processes are checked against
+the budgets, and the exit status is 1 when one is exceeded or when a module
+that is meant to load lazily (LangGraph, the OpenAI client, FAISS,
+scikit-learn) is imported by `backend.main` again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+from backend.benchmarks.report import write_results
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+LAZY_MODULES = ("langgraph", "langchain_openai", "faiss", "sklearn")
+CHEAP_ENDPOINTS = ("/api/projects", "/api/blogs", "/metrics")
+
+
+def _env() -> Dict[str, str]:
+    # Offline models, no watcher, and the default background warm-up.
+    return {**os.environ, "PORTFOLIO_FAKE_MODELS": "1", "SEED_WATCH_INTERVAL": "0"}
+
+
+def import_profile() -> Tuple[float, Dict[str, float]]:
+    """Total import time of backend.main in ms, and self time per top-level package."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=REPO_ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        if name == "backend.main":
+            total = int(cumulative_us) / 1000
+    return total, dict(packages)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_responses(timeout: float = 60.0) -> Dict[str, float]:
+    """Milliseconds from spawning uvicorn until each cheap endpoint first returns 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    timings: Dict[str, float] = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5.0) as client:
+            for path in CHEAP_ENDPOINTS:
+                while True:
+                    if time.perf_counter() - started > timeout:
+                        raise RuntimeError(f"{path} did not answer within {timeout:.0f}s")
+                    try:
+                        if client.get(path).status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.005)
+                timings[path] = (time.perf_counter() - started) * 1000
+    finally:
+        server.terminate()
+        server.wait(10)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12, help="packages shown in the breakdown")
+    parser.add_argument("--max-import-ms", type=float, default=1500.0)
+    parser.add_argument("--max-first-response-ms", type=float, default=3000.0)
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    per_package: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(args.runs):
+        total, packages = import_profile()
+        totals.append(total)
+        for package, ms in packages.items():
+            per_package[package].append(ms)
+    breakdown = sorted(
+        ((package, statistics.median(values)) for package, values in per_package.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    eager = [module for module in LAZY_MODULES if module in per_package]
+
+    responses: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(args.runs):
+        for path, ms in first_responses().items():
+            responses[path].append(ms)
+    first = {path: statistics.median(values) for path, values in responses.items()}
+
+    import_ms = statistics.median(totals)
+    print(f"import backend.main: {import_ms:.0f} ms (median of {args.runs})")
+    print(f"{'package':<28} {'self_ms':>8}")
+    for package, ms in breakdown[:args.top]:
+        print(f"{package:<28} {ms:>8.1f}")
+    print(f"{'endpoint':<28} {'first_ms':>8}")
+    for path, ms in first.items():
+        print(f"{path:<28} {ms:>8.0f}")
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.0f} ms (budget {args.max_import_ms:.0f} ms)")
+    slowest = max(first.values())
+    if slowest > args.max_first_response_ms:
+        failures.append(f"first response took {slowest:.0f} ms (budget {args.max_first_response_ms:.0f} ms)")
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+
+    results = [
+        {"metric": "import_ms", "value": import_ms},
+        *({"metric": "first_response_ms", "endpoint": path, "value": ms} for path, ms in first.items()),
+        *({"metric": "package_self_ms", "package": package, "value": ms} for package, ms in breakdown),
+    ]
+    write_results("startup", args, results, args.output)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Synthetic corpora and a throwaway database for scaling benchmarks."""
+
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+WORDS = (
+    "agent graph retrieval diffusion reasoning pipeline embedding vector latency "
+    "evaluation telemetry warehouse model training inference dataset schema cache "
+    "token prompt policy reward sampling attention transformer cluster spark neo4j"
+).split()
+TAGS = ["AI", "RAG", "LLM", "Graphs", "RL", "Data", "Agents", "Diffusion"]
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def synthetic_documents(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "doc_id": f"synthetic_doc_{i}",
+            "title": f"Synthetic document {i}",
+            "category": rng.choice(["experience", "profile", "skills"]),
+            "tags": rng.sample(TAGS, 3),
+            "content": _paragraph(rng),
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_projects(count: int, seed: int = 1) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "slug": f"synthetic-project-{i}",
+            "name": f"Synthetic Project {i}",
+            "short_summary": _sentence(rng),
+            "long_summary": _paragraph(rng, 3),
+            "tags": rng.sample(TAGS, 3),
+            "display_order": i,
+            "project_type": rng.choice(["work", "personal"]),
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_blogs(count: int, sections: int = 6, seed: int = 2) -> List[Dict]:
+    rng = random.Random(seed)
+    blogs = []
+    for i in range(count):
+        body = "\n\n".join(
+            f"## Section {s}\n\n{_paragraph(rng)}\n\n{_paragraph(rng)}" for s in range(sections)
+        )
+        blogs.append(
+            {
+                "slug": f"synthetic-blog-{i}",
+                "title": f"Synthetic Blog {i}",
+                "excerpt": _sentence(rng),
+                "content": f"# Synthetic Blog {i}\n\n{body}",
+                "published_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                "tags": rng.sample(TAGS, 3),
+            }
+        )
+    return blogs
+
+
+@contextmanager
+def temporary_database() -> Iterator[Path]:
+    """Point backend.db at an empty database in a temp dir for the duration."""
+    from backend import db
+
+    original = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        db.close_connections()
+        db.DB_PATH = Path(tmp) / "rag.db"
+        try:
+            db.create_schema()
+            yield db.DB_PATH
+        finally:
+            db.close_connections()
+            db.DB_PATH = original
+
+
+def synthetic_corpus(rows: int, seed: int = 0) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """`rows` source rows split evenly into documents, projects and short blogs."""
+    share = max(1, rows // 3)
+    return (
+        synthetic_documents(rows - 2 * share, seed=seed),
+        synthetic_projects(share, seed=seed + 1),
+        synthetic_blogs(share, sections=2, seed=seed + 2),
+    )
+
+
+@contextmanager
+def use_data_dir(data_dir: Path) -> Iterator[Path]:
+    """Point backend.db and the index snapshot at `data_dir` until the block exits."""
+    from backend import db, index_snapshot
+
+    names = ("DATA_DIR", "DB_PATH", "DOCUMENTS_SEED_PATH", "PROJECTS_SEED_PATH", "BLOGS_SEED_PATH", "STATE_PATH")
+    original = {name: getattr(db, name) for name in names}
+    original_snapshot = (index_snapshot.SNAPSHOT_DIR, index_snapshot.MANIFEST_PATH)
+    db.close_connections()
+    db.DATA_DIR = data_dir
+    db.DB_PATH = data_dir / "rag.db"
+    db.DOCUMENTS_SEED_PATH = data_dir / "knowledge_base.json"
+    db.PROJECTS_SEED_PATH = data_dir / "projects_seed.json"
+    db.BLOGS_SEED_PATH = data_dir / "blogs_seed.json"
+    db.STATE_PATH = data_dir / ".seed_state.json"
+    index_snapshot.SNAPSHOT_DIR = data_dir / "faiss_index"
+    index_snapshot.MANIFEST_PATH = index_snapshot.SNAPSHOT_DIR / "manifest.json"
+    try:
+        yield data_dir
+    finally:
+        db.close_connections()
+        for name, value in original.items():
+            setattr(db, name, value)
+        index_snapshot.SNAPSHOT_DIR, index_snapshot.MANIFEST_PATH = original_snapshot
+
+
+def write_synthetic_seeds(data_dir: Path, rows: int) -> None:
+    documents, projects, blogs = synthetic_corpus(rows)
+    for filename, seed in (
+        ("knowledge_base.json", documents),
+        ("projects_seed.json", projects),
+        ("blogs_seed.json", blogs),
+    ):
+        (data_dir / filename).write_text(json.dumps(seed), encoding="utf-8")
+
+
+@contextmanager
+def temporary_data_dir(rows: int) -> Iterator[Path]:
+    """Point backend.db and the index snapshot at synthetic seed files in a temp dir.
+
+    Nothing is seeded yet: `initialize_database()` does that from the files,
+    exactly as it does at startup.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        write_synthetic_seeds(data_dir, rows)
+        with use_data_dir(data_dir):
+            yield data_dir
@@ -0,0 +1,153 @@
+"""Memory, query latency and recall of the FAISS store against the numpy index.
+
+    python -m backend.benchmarks.vector_search --rows 20000 --dim 1536 --queries 200
+
+Builds every engine from the same synthetic unit vectors and metadata
+(three sources, a handful of tags) and times `similarity_search_by_vector`,
+the call retrieval makes per query, unfiltered and with a source filter.
+Recall@k is measured against an exact float32 scan. `vector_mb` is the
+memory held by the vectors themselves; `rss_mb` the growth of the process's
+resident set while the engine was built, which also counts the docstore.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from backend.benchmarks.report import latency_summary, write_results
+
+SOURCES = ("document", "project", "blog")
+TAGS = ("python", "llm", "rag", "vision", "data")
+ENGINES = ("faiss", "numpy-float32", "numpy-float16", "numpy-int8")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm", encoding="ascii") as handle:
+        resident_pages = int(handle.read().split()[1])
+    return resident_pages * 4096 / (1024 * 1024)
+
+
+def synthetic_rows(rows: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, dim), dtype=np.float32)
+    # Unit length like OpenAI embeddings, so FAISS's L2 ranking equals cosine ranking.
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    docs = [
+        {
+            "content": f"chunk {i}",
+            "metadata": {
+                "doc_id": f"doc:{i // 4}",
+                "chunk_id": f"doc:{i // 4}#{i % 4}",
+                "source": SOURCES[i % len(SOURCES)],
+                "tags": [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]],
+                "content_hash": str(i),
+            },
+        }
+        for i in range(rows)
+    ]
+    return docs, vectors
+
+
+def build_engine(name: str, docs: List[dict], vectors: np.ndarray, embeddings: Any):
+    from backend.indexing import build_vector_index
+
+    backend, _, dtype = name.partition("-")
+    return build_vector_index(docs, vectors, embeddings, backend, dtype or "float32")
+
+
+def vector_mb(store: Any) -> float:
+    nbytes = getattr(store, "nbytes", None)
+    if nbytes is None:
+        nbytes = store.index.code_size * store.index.ntotal
+    return nbytes / (1024 * 1024)
+
+
+def time_queries(search: Callable[[Sequence[float]], List[Any]], queries: np.ndarray) -> Dict[str, Any]:
+    seconds, hits = [], []
+    for query in queries:
+        started = time.perf_counter()
+        docs = search(query)
+        seconds.append(time.perf_counter() - started)
+        hits.append([doc.metadata["chunk_id"] for doc in docs])
+    return {"latency": latency_summary(seconds), "hits": hits}
+
+
+def recall(hits: List[List[str]], exact: List[List[str]]) -> float:
+    found = sum(len(set(got) & set(want)) for got, want in zip(hits, exact))
+    return found / max(1, sum(len(want) for want in exact))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=8)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    from backend.fakes import fake_embeddings
+    from backend.vector_index import NumpyVectorStore
+
+    embeddings = fake_embeddings(size=args.dim)
+    docs, vectors = synthetic_rows(args.rows, args.dim)
+    # Queries sit near stored rows, like a question close to a passage.
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, args.rows, args.queries)] + rng.standard_normal(
+        (args.queries, args.dim), dtype=np.float32
+    ) / np.sqrt(args.dim)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    source_filter = {"source": "blog"}
+
+    exact = NumpyVectorStore.from_embeddings(docs, vectors, embeddings, [d["metadata"]["chunk_id"] for d in docs])
+    expected = {
+        "all": [[d.metadata["chunk_id"] for d, _ in row] for row in exact.search(queries, args.k)],
+        "source": [[d.metadata["chunk_id"] for d, _ in row] for row in exact.search(queries, args.k, source_filter)],
+    }
+    del exact
+
+    results = []
+    for name in args.engines:
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        store = build_engine(name, docs, vectors, embeddings)
+        build_s = time.perf_counter() - started
+        row: Dict[str, Any] = {
+            "engine": name,
+            "rows": args.rows,
+            "dim": args.dim,
+            "build_s": build_s,
+            "vector_mb": vector_mb(store),
+            "rss_mb": _rss_mb() - rss_before,
+        }
+        for label, search_filter in (("all", None), ("source", source_filter)):
+            run = time_queries(
+                # Bound as defaults: `store` is deleted below to free it before the next engine.
+                lambda query, store=store, search_filter=search_filter: store.similarity_search_by_vector(
+                    query, k=args.k, filter=search_filter
+                ),
+                queries,
+            )
+            row[label] = {**run["latency"], "recall": recall(run["hits"], expected[label])}
+        results.append(row)
+        del store
+
+    print(f"{'engine':<15} {'vector_mb':>9} {'rss_mb':>8} {'build_s':>8}  {'p50_ms':>7} {'p95_ms':>7} {'recall':>6}  "
+          f"{'src_p50':>7} {'src_p95':>7} {'recall':>6}")
+    for row in results:
+        plain, filtered = row["all"], row["source"]
+        print(
+            f"{row['engine']:<15} {row['vector_mb']:>9.1f} {row['rss_mb']:>8.1f} {row['build_s']:>8.2f}  "
+            f"{plain['p50_ms']:>7.2f} {plain['p95_ms']:>7.2f} {plain['recall']:>6.3f}  "
+            f"{filtered['p50_ms']:>7.2f} {filtered['p95_ms']:>7.2f} {filtered['recall']:>6.3f}"
+        )
+    write_results("vector_search", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Startup cost and memory of N worker processes sharing one data directory.
+
+    python -m backend.benchmarks.workers --rows 20000 --workers 1 2 4 --engines faiss numpy-int8
+
+Each run starts N fresh processes at once against new synthetic seed files,
+and each does what a `uvicorn --workers N` worker does at startup: sync the
+database, then build or load the vector index. `embed_passes` counts the
+workers that had to embed the corpus; the others should load the snapshot
+the first one saved. Memory is read from /proc while every worker is still
+alive: `pss_mb` splits shared pages between the processes mapping them, so
+the sum over workers is their real footprint, and `private_mb` is what each
+worker holds on its own. Linux only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.benchmarks.report import write_results
+
+ENGINES = ("faiss", "numpy-float32", "numpy-int8")
+
+
+def _memory_mb() -> Dict[str, float]:
+    fields: Dict[str, float] = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as handle:
+        for line in handle:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0]) / 1024
+    return {
+        "rss_mb": fields["Rss"],
+        "pss_mb": fields["Pss"],
+        "private_mb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _worker(data_dir: str, engine: str, dim: int, started: float, ready, results) -> None:
+    backend, _, dtype = engine.partition("-")
+    os.environ["PORTFOLIO_FAKE_MODELS"] = "1"
+    os.environ["VECTOR_BACKEND"] = backend
+    os.environ["VECTOR_DTYPE"] = dtype or "float32"
+    from backend.benchmarks.synthetic import use_data_dir
+
+    with use_data_dir(Path(data_dir)):
+        from backend import main
+        from backend.fakes import fake_embeddings
+
+        main.initialize_database()
+        mode = main.build_vector_store(embeddings=fake_embeddings(size=dim))
+        startup_s = time.time() - started
+        # Measure only once every worker has its index, as a running server would.
+        ready.wait()
+        results.put({"mode": mode, "startup_s": startup_s, **_memory_mb()})
+        ready.wait()
+
+
+def run(engine: str, workers: int, rows: int, dim: int) -> Dict[str, Any]:
+    from backend.benchmarks.synthetic import write_synthetic_seeds
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_synthetic_seeds(Path(tmp), rows)
+        ready = context.Barrier(workers + 1)
+        results = context.Queue()
+        started = time.time()
+        processes = [
+            context.Process(target=_worker, args=(tmp, engine, dim, started, ready, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        ready.wait()
+        rows_out: List[Dict[str, Any]] = [results.get() for _ in processes]
+        ready.wait()
+        for process in processes:
+            process.join()
+
+    return {
+        "engine": engine,
+        "workers": workers,
+        "startup_s": max(row["startup_s"] for row in rows_out),
+        "embed_passes": sum(row["mode"] == "rebuild" for row in rows_out),
+        "modes": sorted(row["mode"] for row in rows_out),
+        "rss_mb": sum(row["rss_mb"] for row in rows_out),
+        "pss_mb": sum(row["pss_mb"] for row in rows_out),
+        "private_mb": sum(row["private_mb"] for row in rows_out),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    results = [run(engine, workers, args.rows, args.dim) for engine in args.engines for workers in args.workers]
+
+    print(f"{'engine':<14} {'workers':>7} {'startup_s':>9} {'embeds':>6} {'rss_mb':>8} {'pss_mb':>8} {'private_mb':>10}")
+    for row in results:
+        print(
+            f"{row['engine']:<14} {row['workers']:>7} {row['startup_s']:>9.2f} {row['embed_passes']:>6} "
+            f"{row['rss_mb']:>8.1f} {row['pss_mb']:>8.1f} {row['private_mb']:>10.1f}"
+        )
+    write_results("workers", args, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
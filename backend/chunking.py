@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_TOKENS = 300
+CHUNK_OVERLAP_TOKENS = 40
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+# Paragraph breaks first, then sentence ends; each unit keeps its trailing whitespace.
+UNIT_RE = re.compile(r".+?(?:\n\s*\n|(?<=[.!?])\s+|$)", re.DOTALL)
+
+Span = Tuple[int, int]
+
+
+# -------------------- Token Counting -------------------- #
+
+# (token count, character offset where each token starts) for a text.
+Tokenizer = Tuple[Callable[[str], int], Callable[[str], List[int]]]
+
+_tokenizer: Optional[Tokenizer] = None
+
+
+def _load_tokenizer() -> Tokenizer:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+
+        def token_starts(text: str) -> List[int]:
+            return encoding.decode_with_offsets(encoding.encode(text, disallowed_special=()))[1]
+
+        return lambda text: len(encoding.encode(text, disallowed_special=())), token_starts
+    except Exception:
+        # tiktoken downloads its BPE files on first use; fall back to the
+        # usual ~4 characters per token estimate when that is not possible.
+        return (
+            lambda text: max(1, (len(text) + 3) // 4) if text else 0,
+            lambda text: list(range(0, len(text), 4)),
+        )
+
+
+def _get_tokenizer() -> Tokenizer:
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = _load_tokenizer()
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    return _get_tokenizer()[0](text)
+
+
+def token_starts(text: str) -> List[int]:
+    """Character offsets in `text` where a token starts, in order and without repeats."""
+    return sorted(set(_get_tokenizer()[1](text)))
+
+
+# -------------------- Markdown Sections -------------------- #
+
+def iter_sections(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (heading, start, end) character spans split on markdown headings."""
+    heading = ""
+    start = 0
+    for match in HEADING_RE.finditer(text):
+        if match.start() > start:
+            yield heading, start, match.start()
+        heading = match.group(2).strip()
+        start = match.start()
+    if start < len(text):
+        yield heading, start, len(text)
+
+
+def _hard_split(text: str, start: int, end: int) -> Iterator[Span]:
+    """Split an oversized unit on word boundaries, or on characters for giant words."""
+    window_start = start
+    for word in re.finditer(r"\S+\s*", text[start:end]):
+        word_start, word_end = start + word.start(), start + word.end()
+        if count_tokens(text[window_start:word_end]) <= CHUNK_TOKENS:
+            continue
+        if window_start < word_start:
+            yield window_start, word_start
+            window_start = word_start
+        if count_tokens(text[word_start:word_end]) > CHUNK_TOKENS:
+            yield from _split_tokens(text, word_start, word_end)
+            window_start = word_end
+    if window_start < end:
+        yield window_start, end
+
+
+def _split_tokens(text: str, start: int, end: int) -> Iterator[Span]:
+    """Cut text[start:end] every CHUNK_TOKENS tokens, only where a token starts.
+
+    A character split across tokens starts at one offset, so a piece can
+    re-encode to a token more than its share; it is then cut a token earlier.
+    """
+    offsets = [start + offset for offset in token_starts(text[start:end]) if offset > 0]
+    offsets = [start, *offsets, end]
+    position = 0
+    while position < len(offsets) - 1:
+        cut = min(position + CHUNK_TOKENS, len(offsets) - 1)
+        while cut > position + 1 and count_tokens(text[offsets[position]:offsets[cut]]) > CHUNK_TOKENS:
+            cut -= 1
+        yield offsets[position], offsets[cut]
+        position = cut
+
+
+def _iter_units(text: str, start: int, end: int) -> Iterator[Span]:
+    """Yield paragraph/sentence spans, hard-splitting any unit over the budget."""
+    for match in UNIT_RE.finditer(text, start, end):
+        unit_start, unit_end = match.span()
+        if unit_start == unit_end:
+            continue
+        if count_tokens(text[unit_start:unit_end]) <= CHUNK_TOKENS:
+            yield unit_start, unit_end
+        else:
+            yield from _hard_split(text, unit_start, unit_end)
+
+
+def iter_windows(text: str, start: int, end: int) -> Iterator[Span]:
+    """Pack units of text[start:end] into overlapping windows of at most CHUNK_TOKENS."""
+    window: List[Tuple[Span, int]] = []
+    window_tokens = 0
+    for span in _iter_units(text, start, end):
+        tokens = count_tokens(text[span[0]:span[1]])
+        if window and window_tokens + tokens > CHUNK_TOKENS:
+            yield window[0][0][0], window[-1][0][1]
+            # Carry trailing units forward as overlap for the next window,
+            # only as many as still leave room for this unit.
+            overlap_budget = min(CHUNK_OVERLAP_TOKENS, CHUNK_TOKENS - tokens)
+            carried: List[Tuple[Span, int]] = []
+            carried_tokens = 0
+            for item in reversed(window):
+                if carried_tokens + item[1] > overlap_budget:
+                    break
+                carried.insert(0, item)
+                carried_tokens += item[1]
+            window, window_tokens = carried, carried_tokens
+        window.append((span, tokens))
+        window_tokens += tokens
+    if window:
+        yield window[0][0][0], window[-1][0][1]
+
+
+# -------------------- Chunking Stage -------------------- #
+
+def chunk_document(doc: dict) -> Iterator[dict]:
+    """Split one RAG document into heading-aware, overlapping chunks."""
+    text = doc["content"]
+    metadata = doc["metadata"]
+    doc_id = metadata.get("doc_id", "unknown")
+    title = metadata.get("title", "")
+
+    if count_tokens(text) <= CHUNK_TOKENS:
+        spans: Iterable[Tuple[str, Span]] = [("", (0, len(text)))]
+    else:
+        spans = (
+            (heading, window)
+            for heading, start, end in iter_sections(text)
+            for window in iter_windows(text, start, end)
+        )
+
+    for index, (heading, (start, end)) in enumerate(spans):
+        body = text[start:end].strip()
+        if not body:
+            continue
+        content = body
+        if index > 0:
+            label = f"{title} > {heading}" if heading else title
+            content = f"{label}\n{body}" if label else body
+        yield {
+            "content": content,
+            "metadata": {
+                **metadata,
+                "chunk_id": f"{doc_id}#{index}",
+                "chunk_index": index,
+                "section": heading,
+                "start_offset": start,
+                "end_offset": end,
+            },
+        }
+
+
+def chunk_documents(docs: Iterable[dict]) -> Iterator[dict]:
+    """Lazily chunk a stream of documents; each source text is dropped once chunked."""
+    for doc in docs:
+        yield from chunk_document(doc)
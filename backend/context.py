@@ -0,0 +1,161 @@
+"""Context assembly: turn ranked retrieval candidates into a compact prompt block.
+
+Retrieval over-fetches; this stage decides what the LLM actually reads.
+Near-duplicates (overlapping chunks, the same passage from two indexes) are
+dropped, the rest is reordered with maximal marginal relevance so the
+second passage adds something the first did not, and passages are packed
+greedily into a token budget, each under a numbered source line the model
+can cite. Similarities use the vectors already stored in the index, so no
+passage is embedded again; passages without one (FTS snippets) fall back
+to word overlap.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .chunking import count_tokens
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from chunking import count_tokens
+
+CONTEXT_TOKEN_BUDGET = 400
+MAX_PASSAGES = 4
+MMR_LAMBDA = 0.7
+# Cosine (or word-overlap) similarity above which a passage repeats one already kept.
+DUPLICATE_SIMILARITY = 0.92
+# Joins packed passages; its tokens count against the budget too.
+PASSAGE_SEPARATOR = "\n---\n"
+
+WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class Passage:
+    text: str
+    doc_id: str
+    source: str
+    title: str
+    relevance: float
+    vector: Optional[np.ndarray] = None
+
+    def header(self, number: int) -> str:
+        return f"[{number}] {self.source}: {self.title}" if self.title else f"[{number}] {self.source}"
+
+
+# -------------------- Similarity -------------------- #
+
+def _words(text: str) -> frozenset:
+    return frozenset(word.lower() for word in WORD_RE.findall(text))
+
+
+def _similarity_matrix(passages: Sequence[Passage]) -> np.ndarray:
+    """Pairwise similarity: cosine of stored vectors, else Jaccard of word sets."""
+    count = len(passages)
+    similarity = np.zeros((count, count), dtype=np.float32)
+    with_vectors = [i for i, passage in enumerate(passages) if passage.vector is not None]
+    if with_vectors:
+        vectors = np.stack([passages[i].vector for i in with_vectors]).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        similarity[np.ix_(with_vectors, with_vectors)] = vectors @ vectors.T
+    words = [_words(passage.text) for passage in passages]
+    for i in range(count):
+        for j in range(i + 1, count):
+            if passages[i].vector is None or passages[j].vector is None:
+                union = len(words[i] | words[j])
+                similarity[i, j] = similarity[j, i] = len(words[i] & words[j]) / union if union else 0.0
+    return similarity
+
+
+# -------------------- Selection -------------------- #
+
+def select_passages(
+    passages: Sequence[Passage],
+    mmr_lambda: float = MMR_LAMBDA,
+    duplicate_similarity: float = DUPLICATE_SIMILARITY,
+) -> List[Passage]:
+    """Drop near-duplicates and order the rest by maximal marginal relevance."""
+    if len(passages) <= 1:
+        return list(passages)
+    similarity = _similarity_matrix(passages)
+    top = max(passage.relevance for passage in passages) or 1.0
+    relevance = np.asarray([passage.relevance / top for passage in passages], dtype=np.float32)
+
+    selected: List[int] = []
+    remaining = list(range(len(passages)))
+    while remaining:
+        if selected:
+            redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining), dtype=np.float32)
+        scores = mmr_lambda * relevance[remaining] - (1 - mmr_lambda) * redundancy
+        best = int(np.argmax(scores))
+        if redundancy[best] < duplicate_similarity:
+            selected.append(remaining[best])
+        remaining.pop(best)
+    return [passages[i] for i in selected]
+
+
+# -------------------- Packing -------------------- #
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Longest word-boundary prefix of `text` within `budget` tokens."""
+    if count_tokens(text) <= budget:
+        return text
+    bounds = [match.end() for match in re.finditer(r"\S+", text)]
+    low, high = 0, len(bounds)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:bounds[middle - 1]] + " …") <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:bounds[low - 1]] + " …" if low else ""
+
+
+def pack_passages(
+    passages: Sequence[Passage],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    max_passages: int = MAX_PASSAGES,
+) -> List[str]:
+    """Greedily fit passages (in order) under `token_budget`, each with its source line.
+
+    A passage that does not fit is skipped in favour of shorter ones after
+    it; only the first passage is truncated rather than dropped, so the
+    block is never empty when there were candidates.
+    """
+    packed: List[str] = []
+    used = 0
+    separator_tokens = count_tokens(PASSAGE_SEPARATOR)
+    for passage in passages:
+        if len(packed) >= max_passages:
+            break
+        block = f"{passage.header(len(packed) + 1)}\n{passage.text}"
+        tokens = count_tokens(block) + (separator_tokens if packed else 0)
+        if used + tokens > token_budget:
+            if packed:
+                continue
+            header = passage.header(1)
+            body = truncate_to_tokens(passage.text, token_budget - count_tokens(header) - 1)
+            if not body:
+                break
+            block, tokens = f"{header}\n{body}", token_budget
+        packed.append(block)
+        used += tokens
+    return packed
+
+
+def assemble_context(
+    passages: Sequence[Passage],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    max_passages: int = MAX_PASSAGES,
+    mmr_lambda: float = MMR_LAMBDA,
+) -> List[str]:
+    """Deduplicate, MMR-order and pack `passages` into attributed prompt blocks."""
+    return pack_passages(select_passages(passages, mmr_lambda), token_budget, max_passages)
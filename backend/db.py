@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .metrics import observe_stage, span
+    from .process_lock import FileLock
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from metrics import observe_stage, span
+    from process_lock import FileLock
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 DB_PATH = DATA_DIR / "rag.db"
@@ -11,12 +24,99 @@ DOCUMENTS_SEED_PATH = DATA_DIR / "knowledge_base.json"
 PROJECTS_SEED_PATH = DATA_DIR / "projects_seed.json"
 BLOGS_SEED_PATH = DATA_DIR / "blogs_seed.json"
 STATE_PATH = DATA_DIR / ".seed_state.json"
+# Held by whichever worker process is seeding the database or saving and
+# publishing an index snapshot; the others wait for it and then find
+# nothing left to do. It is never held while documents are embedded.
+BUILD_LOCK = FileLock(DATA_DIR / ".build.lock")
+# Held for a whole index build, embedding included, so that worker processes
+# starting together embed the corpus once and the rest load its snapshot.
+INDEX_LOCK = FileLock(DATA_DIR / ".index.lock")
+
+
+# -------------------- Connections -------------------- #
+
+# Reads go through long-lived, per-thread, read-only connections so API hits
+# skip connection setup and schema parsing and reuse cached prepared
+# statements. All writes share one dedicated connection behind a lock.
+SHARED_PRAGMAS = (
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+)
+READ_PRAGMAS = SHARED_PRAGMAS + ("PRAGMA query_only = ON",)
+WRITE_PRAGMAS = SHARED_PRAGMAS + (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    # INSERT OR REPLACE only fires the FTS delete trigger with recursive triggers on.
+    "PRAGMA recursive_triggers = ON",
+)
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_connections: List[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+_pool_generation = 0
+_write_lock = threading.RLock()
+_write_conn: Optional[sqlite3.Connection] = None
+
+
+def _open_connection(uri: str, pragmas: Sequence[str]) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    for pragma in pragmas:
+        conn.execute(pragma)
+    with _connections_lock:
+        _connections.append(conn)
+    return conn
+
+
+@contextmanager
+def _read_connection() -> Iterator[sqlite3.Connection]:
+    """Yield this thread's read-only connection, opening it on first use."""
+    cached = getattr(_local, "conn", None)
+    if cached is None or cached[0] != _pool_generation:
+        conn = _open_connection(f"{DB_PATH.as_uri()}?mode=ro", READ_PRAGMAS)
+        conn.row_factory = sqlite3.Row
+        cached = (_pool_generation, conn)
+        _local.conn = cached
+    yield cached[1]
+
+
+@contextmanager
+def _write_connection() -> Iterator[sqlite3.Connection]:
+    """Yield the single writer connection; the block runs as one transaction."""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            _write_conn = _open_connection(DB_PATH.as_uri(), WRITE_PRAGMAS)
+        with _write_conn:
+            yield _write_conn
+
+
+def close_connections() -> None:
+    """Close every pooled connection; threads reopen lazily on next use."""
+    global _write_conn, _pool_generation
+    with _write_lock, _connections_lock:
+        for conn in _connections:
+            conn.close()
+        _connections.clear()
+        _write_conn = None
+        _pool_generation += 1
 
 
 # -------------------- Schema & Initialization -------------------- #
 
 def create_schema() -> None:
-    with sqlite3.connect(DB_PATH) as conn:
+    with _write_connection() as conn:
+        existing = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS documents (
@@ -69,11 +169,170 @@ def create_schema() -> None:
             conn.execute("ALTER TABLE blogs ADD COLUMN medium_link TEXT")
         except sqlite3.OperationalError:
             pass
-        conn.commit()
+        create_search_schema(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                doc_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (doc_id, content_hash, model)
+            )
+            """
+        )
+        # Content hash of every seeded row, so a seed file change is applied
+        # as a row-level diff instead of a full reseed.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seed_rows (
+                table_name TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                row_hash TEXT NOT NULL,
+                PRIMARY KEY (table_name, row_key)
+            ) WITHOUT ROWID
+            """
+        )
+        create_tag_schema(conn)
+        for statement in LISTING_INDEXES:
+            conn.execute(statement)
+        if "content_tags" not in existing:
+            _backfill_tags(conn)
+
+
+# Tags are normalized out of the comma-joined `tags` columns at seed time:
+# one `tags` row per distinct name (case-insensitive) and one `content_tags`
+# row per (content row, tag), indexed by tag so a tag filter is an index seek.
+TAGGED_TABLES = ("documents", "projects", "blogs")
+
+
+def create_tag_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tags (
+            tag_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS content_tags (
+            table_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            tag_id INTEGER NOT NULL REFERENCES tags (tag_id),
+            PRIMARY KEY (table_name, row_key, tag_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS content_tags_by_tag ON content_tags (tag_id, table_name, row_key)"
+    )
+
+
+# Keyset pagination walks these in listing order (see list_projects_page and
+# list_blogs_page). The blog index carries every summary column, so a page
+# never reads the rows themselves, whose `content` (stored before
+# `published_at`, often in overflow pages) would otherwise be paged in.
+LISTING_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS projects_listing ON projects (display_order, name, slug)",
+    "CREATE INDEX IF NOT EXISTS projects_by_type ON projects (project_type, display_order, name, slug)",
+    """
+    CREATE INDEX IF NOT EXISTS blogs_listing ON blogs (
+        COALESCE(published_at, '') DESC, title, slug,
+        excerpt, published_at, tags, hero_image, medium_link
+    )
+    """,
+)
+
+
+def _write_tags(conn: sqlite3.Connection, table_name: str, tags_by_key: Dict[str, List[str]]) -> None:
+    """Replace the tag links of every row key in `tags_by_key`."""
+    conn.executemany(
+        "DELETE FROM content_tags WHERE table_name = ? AND row_key = ?",
+        [(table_name, key) for key in tags_by_key],
+    )
+    names = {tag for tags in tags_by_key.values() for tag in tags}
+    conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(name,) for name in names])
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO content_tags (table_name, row_key, tag_id)
+        SELECT ?, ?, tag_id FROM tags WHERE name = ?
+        """,
+        [(table_name, key, tag) for key, tags in tags_by_key.items() for tag in tags],
+    )
+
+
+def _prune_tags(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM tags WHERE tag_id NOT IN (SELECT tag_id FROM content_tags)")
+
+
+def _backfill_tags(conn: sqlite3.Connection) -> None:
+    """Link the tags of rows seeded before the tag tables existed."""
+    for table_name in TAGGED_TABLES:
+        key = SEED_TABLES[table_name].key
+        rows = conn.execute(f"SELECT {key}, tags FROM {table_name}")
+        _write_tags(conn, table_name, {str(row_key): parse_tags(tags) for row_key, tags in rows})
+
+
+# Full-text indexes mirror the content tables (external content, kept in sync
+# by triggers) so keyword lookups never need to touch the vector store.
+SEARCH_TABLES = {
+    "documents": ("title", "category", "tags", "content"),
+    "projects": ("name", "short_summary", "long_summary", "tags"),
+    "blogs": ("title", "excerpt", "tags", "content"),
+}
+
+
+def create_search_schema(conn: sqlite3.Connection) -> None:
+    existing = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    for table, columns in SEARCH_TABLES.items():
+        fts = f"{table}_fts"
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {column_list},
+                content='{table}',
+                content_rowid='rowid',
+                tokenize='porter unicode61'
+            )
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+            END
+            """
+        )
+        if fts not in existing:
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
 
 
 def is_table_empty(table_name: str) -> bool:
-    with sqlite3.connect(DB_PATH) as conn:
+    with _read_connection() as conn, span("db_read", query="is_table_empty"):
         cursor = conn.execute(f"SELECT COUNT(*) FROM {table_name}")
         count = cursor.fetchone()[0]
     return count == 0
@@ -122,78 +381,75 @@ def save_current_state(state: Dict[str, float]) -> None:
 
 # -------------------- Seeding Functions -------------------- #
 
+def _document_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "doc_id": doc["doc_id"],
+        "title": doc["title"],
+        "category": doc["category"],
+        "tags": ", ".join(doc.get("tags", [])),
+        "content": doc["content"],
+    }
+
+
+def _project_row(project: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "slug": project["slug"],
+        "name": project["name"],
+        "short_summary": project.get("short_summary", ""),
+        "long_summary": project.get("long_summary", ""),
+        "tags": ", ".join(project.get("tags", [])),
+        "github_url": project.get("github_url"),
+        "demo_url": project.get("demo_url"),
+        "hero_image": project.get("hero_image"),
+        # Never NULL, so the keyset cursor on it compares cleanly.
+        "display_order": project.get("display_order") or 0,
+        "project_type": project.get("project_type", "personal"),
+    }
+
+
+def _blog_row(blog: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "slug": blog["slug"],
+        "title": blog["title"],
+        "excerpt": blog["excerpt"],
+        "content": blog["content"],
+        "content_format": blog.get("content_format", "markdown"),
+        "published_at": blog.get("published_at"),
+        "tags": ", ".join(blog.get("tags", [])),
+        "hero_image": blog.get("hero_image"),
+        "medium_link": blog.get("medium_link"),
+    }
+
+
+def _upsert_rows(conn: sqlite3.Connection, table: "SeedTable", rows: Sequence[Dict[str, Any]]) -> None:
+    """Insert or update in place, so rowids (and their FTS entries) stay stable."""
+    columns = ", ".join(table.columns)
+    values = ", ".join(f":{column}" for column in table.columns)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in table.columns if column != table.key)
+    conn.executemany(
+        f"""
+        INSERT INTO {table.name} ({columns}) VALUES ({values})
+        ON CONFLICT ({table.key}) DO UPDATE SET {updates}
+        """,
+        rows,
+    )
+    if "tags" in table.columns:
+        _write_tags(conn, table.name, {str(row[table.key]): parse_tags(row["tags"]) for row in rows})
+
+
 def seed_documents(documents: Iterable[Dict[str, str]]) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.executemany(
-            """
-            INSERT OR REPLACE INTO documents (doc_id, title, category, tags, content)
-            VALUES (:doc_id, :title, :category, :tags, :content)
-            """,
-            [
-                {
-                    "doc_id": doc["doc_id"],
-                    "title": doc["title"],
-                    "category": doc["category"],
-                    "tags": ", ".join(doc.get("tags", [])),
-                    "content": doc["content"],
-                }
-                for doc in documents
-            ],
-        )
-        conn.commit()
+    with _write_connection() as conn:
+        _upsert_rows(conn, SEED_TABLES["documents"], [_document_row(doc) for doc in documents])
 
 
 def seed_projects(projects: Iterable[Dict[str, str]]) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.executemany(
-            """
-            INSERT OR REPLACE INTO projects
-                (slug, name, short_summary, long_summary, tags, github_url, demo_url, hero_image, display_order, project_type)
-            VALUES (:slug, :name, :short_summary, :long_summary, :tags, :github_url, :demo_url, :hero_image, :display_order, :project_type)
-            """,
-            [
-                {
-                    "slug": project["slug"],
-                    "name": project["name"],
-                    "short_summary": project.get("short_summary", ""),
-                    "long_summary": project.get("long_summary", ""),
-                    "tags": ", ".join(project.get("tags", [])),
-                    "github_url": project.get("github_url"),
-                    "demo_url": project.get("demo_url"),
-                    "hero_image": project.get("hero_image"),
-                    "display_order": project.get("display_order", 0),
-                    "project_type": project.get("project_type", "personal"),
-                }
-                for project in projects
-            ],
-        )
-        conn.commit()
+    with _write_connection() as conn:
+        _upsert_rows(conn, SEED_TABLES["projects"], [_project_row(project) for project in projects])
 
 
 def seed_blogs(blogs: Iterable[Dict[str, str]]) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.executemany(
-            """
-            INSERT OR REPLACE INTO blogs
-                (slug, title, excerpt, content, content_format, published_at, tags, hero_image, medium_link)
-            VALUES (:slug, :title, :excerpt, :content, :content_format, :published_at, :tags, :hero_image, :medium_link)
-            """,
-            [
-                {
-                    "slug": blog["slug"],
-                    "title": blog["title"],
-                    "excerpt": blog["excerpt"],
-                    "content": blog["content"],
-                    "content_format": blog.get("content_format", "markdown"),
-                    "published_at": blog.get("published_at"),
-                    "tags": ", ".join(blog.get("tags", [])),
-                    "hero_image": blog.get("hero_image"),
-                    "medium_link": blog.get("medium_link"),
-                }
-                for blog in blogs
-            ],
-        )
-        conn.commit()
+    with _write_connection() as conn:
+        _upsert_rows(conn, SEED_TABLES["blogs"], [_blog_row(blog) for blog in blogs])
 
 
 # -------------------- Utility Functions -------------------- #
@@ -204,52 +460,40 @@ def parse_tags(tag_string: Optional[str]) -> List[str]:
     return [tag.strip() for tag in tag_string.split(",") if tag.strip()]
 
 
+def _normalize_project(project: Dict[str, str]) -> Dict[str, str]:
+    project["tags"] = parse_tags(project.get("tags"))
+    project["project_type"] = project.get("project_type") or "personal"
+    return project
+
+
+def _normalize_blog(blog: Dict[str, str]) -> Dict[str, str]:
+    blog["tags"] = parse_tags(blog.get("tags"))
+    blog["medium_link"] = blog.get("medium_link")
+    return blog
+
+
 def get_all_documents() -> List[Dict[str, str]]:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute(
-            "SELECT doc_id, title, category, tags, content FROM documents"
-        )
-        return [dict(row) for row in cursor.fetchall()]
+    return list(iter_documents())
 
 
 def get_all_projects() -> List[Dict[str, str]]:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute(
-            """
-            SELECT slug, name, short_summary, long_summary, tags, github_url, demo_url, hero_image, display_order, project_type
-            FROM projects
-            ORDER BY display_order ASC, name ASC
-            """
-        )
-        projects = [dict(row) for row in cursor.fetchall()]
-    for project in projects:
-        project["tags"] = parse_tags(project.get("tags"))
-        project["project_type"] = project.get("project_type") or "personal"
-    return projects
+    return list(iter_projects())
 
 
 def get_all_blogs() -> List[Dict[str, str]]:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _read_connection() as conn, span("db_read", query="get_all_blogs"):
         cursor = conn.execute(
             """
             SELECT slug, title, excerpt, published_at, tags, hero_image, medium_link
             FROM blogs
-            ORDER BY COALESCE(published_at, '') DESC, title ASC
+            ORDER BY COALESCE(published_at, '') DESC, title ASC, slug ASC
             """
         )
-        blogs = [dict(row) for row in cursor.fetchall()]
-    for blog in blogs:
-        blog["tags"] = parse_tags(blog.get("tags"))
-        blog["medium_link"] = blog.get("medium_link")
-    return blogs
+        return [_normalize_blog(dict(row)) for row in cursor.fetchall()]
 
 
 def get_blog_by_slug(slug: str) -> Optional[Dict[str, str]]:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _read_connection() as conn, span("db_read", query="get_blog_by_slug"):
         cursor = conn.execute(
             """
             SELECT slug, title, excerpt, content, content_format, published_at, tags, hero_image, medium_link
@@ -261,38 +505,504 @@ def get_blog_by_slug(slug: str) -> Optional[Dict[str, str]]:
         row = cursor.fetchone()
     if row is None:
         return None
-    blog = dict(row)
-    blog["tags"] = parse_tags(blog.get("tags"))
-    blog["medium_link"] = blog.get("medium_link")
-    return blog
+    return _normalize_blog(dict(row))
+
+
+# -------------------- Listing Pages -------------------- #
+
+# Listing order, made total with the primary key so it can serve as a keyset:
+# a page resumes strictly after the last row of the previous one. Both
+# queries seek straight to the cursor in their listing index, so a page
+# costs the same however deep it is.
+ProjectKey = Tuple[int, str, str]
+BlogKey = Tuple[str, str, str]
+
+
+def project_listing_key(project: Dict[str, Any]) -> ProjectKey:
+    return (project["display_order"], project["name"], project["slug"])
+
+
+def blog_listing_key(blog: Dict[str, Any]) -> BlogKey:
+    return (blog["published_at"] or "", blog["title"], blog["slug"])
+
+
+def _tag_id(conn: sqlite3.Connection, tag: str) -> Optional[int]:
+    row = conn.execute("SELECT tag_id FROM tags WHERE name = ?", (tag,)).fetchone()
+    return row[0] if row is not None else None
+
+
+def _tag_filter(table_name: str, key: str) -> str:
+    # Probed per row while walking the listing index, so a page stops after
+    # `limit` matches instead of collecting and sorting every tagged row.
+    return (
+        f"EXISTS (SELECT 1 FROM content_tags ct WHERE ct.table_name = '{table_name}' "
+        f"AND ct.row_key = {table_name}.{key} AND ct.tag_id = :tag_id)"
+    )
+
+
+def list_projects_page(
+    limit: int,
+    after: Optional[ProjectKey] = None,
+    tag: Optional[str] = None,
+    project_type: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Up to `limit` projects in listing order, after the key `after`, optionally filtered.
+
+    `tag` matches case-insensitively.
+    """
+    where = []
+    params: Dict[str, Any] = {"limit": limit}
+    if project_type is not None:
+        where.append("project_type = :project_type")
+        params["project_type"] = project_type
+    if after is not None:
+        where.append("(display_order, name, slug) > (:order, :name, :slug)")
+        params.update(order=after[0], name=after[1], slug=after[2])
+    # Only the clauses in use are added, so each combination gets its own
+    # cached statement and plan.
+    with _read_connection() as conn, span("db_read", query="list_projects_page"):
+        if tag is not None:
+            params["tag_id"] = _tag_id(conn, tag)
+            if params["tag_id"] is None:
+                return []
+            where.append(_tag_filter("projects", "slug"))
+        cursor = conn.execute(
+            f"""
+            SELECT slug, name, short_summary, long_summary, tags, github_url, demo_url, hero_image, display_order, project_type
+            FROM projects
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY display_order ASC, name ASC, slug ASC
+            LIMIT :limit
+            """,
+            params,
+        )
+        return [_normalize_project(dict(row)) for row in cursor.fetchall()]
+
+
+def list_blogs_page(
+    limit: int,
+    after: Optional[BlogKey] = None,
+    tag: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Up to `limit` blog summaries in listing order, after the key `after`, optionally tagged `tag`."""
+    where = []
+    params: Dict[str, Any] = {"limit": limit}
+    if after is not None:
+        # Newest first, then title and slug ascending. The first clause is
+        # the range the index seek starts from.
+        where.append(
+            "COALESCE(published_at, '') <= :published "
+            "AND (COALESCE(published_at, '') < :published OR (title, slug) > (:title, :slug))"
+        )
+        params.update(published=after[0], title=after[1], slug=after[2])
+    with _read_connection() as conn, span("db_read", query="list_blogs_page"):
+        if tag is not None:
+            params["tag_id"] = _tag_id(conn, tag)
+            if params["tag_id"] is None:
+                return []
+            where.append(_tag_filter("blogs", "slug"))
+        cursor = conn.execute(
+            f"""
+            SELECT slug, title, excerpt, published_at, tags, hero_image, medium_link
+            FROM blogs
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY COALESCE(published_at, '') DESC, title ASC, slug ASC
+            LIMIT :limit
+            """,
+            params,
+        )
+        return [_normalize_blog(dict(row)) for row in cursor.fetchall()]
+
+
+# -------------------- Bulk Streaming Readers -------------------- #
+
+FETCH_BATCH_SIZE = 200
+
+
+def _iter_rows(name: str, query: str) -> Iterator[Dict[str, str]]:
+    """Yield rows as dicts, pulling FETCH_BATCH_SIZE at a time from one cursor.
+
+    Only time spent inside SQLite is recorded, not the consumer's work
+    between batches.
+    """
+    with _read_connection() as conn:
+        started = time.perf_counter()
+        cursor = conn.execute(query)
+        elapsed = time.perf_counter() - started
+        try:
+            while True:
+                started = time.perf_counter()
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+            observe_stage("db_read", elapsed, query=name)
+
+
+def iter_documents() -> Iterator[Dict[str, str]]:
+    yield from _iter_rows("iter_documents", "SELECT doc_id, title, category, tags, content FROM documents")
+
+
+def iter_projects() -> Iterator[Dict[str, str]]:
+    for project in _iter_rows(
+        "iter_projects",
+        """
+        SELECT slug, name, short_summary, long_summary, tags, github_url, demo_url, hero_image, display_order, project_type
+        FROM projects
+        ORDER BY display_order ASC, name ASC, slug ASC
+        """
+    ):
+        yield _normalize_project(project)
+
+
+def iter_blogs() -> Iterator[Dict[str, str]]:
+    """Full blog rows, content included, in listing order."""
+    for blog in _iter_rows(
+        "iter_blogs",
+        """
+        SELECT slug, title, excerpt, content, content_format, published_at, tags, hero_image, medium_link
+        FROM blogs
+        ORDER BY COALESCE(published_at, '') DESC, title ASC, slug ASC
+        """
+    ):
+        yield _normalize_blog(blog)
+
+
+def search_content(match_query: str, limit: int = 5, source: Optional[str] = None) -> List[Dict[str, str]]:
+    """Run an FTS5 MATCH across documents, projects and blogs, best BM25 first.
+
+    `source` ("document", "project" or "blog") keeps hits from that table only.
+    """
+    if not match_query:
+        return []
+    with _read_connection() as conn, span("db_read", query="search_content"):
+        try:
+            cursor = conn.execute(
+                """
+                SELECT * FROM (
+                    SELECT 'document' AS source, d.doc_id AS doc_id, d.title AS title,
+                           snippet(documents_fts, -1, '', '', '…', 48) AS snippet,
+                           bm25(documents_fts) AS score
+                    FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid
+                    WHERE documents_fts MATCH :query
+                    UNION ALL
+                    SELECT 'project', 'project:' || p.slug, p.name,
+                           snippet(projects_fts, -1, '', '', '…', 48),
+                           bm25(projects_fts)
+                    FROM projects_fts JOIN projects p ON p.rowid = projects_fts.rowid
+                    WHERE projects_fts MATCH :query
+                    UNION ALL
+                    SELECT 'blog', 'blog:' || b.slug, b.title,
+                           snippet(blogs_fts, -1, '', '', '…', 48),
+                           bm25(blogs_fts)
+                    FROM blogs_fts JOIN blogs b ON b.rowid = blogs_fts.rowid
+                    WHERE blogs_fts MATCH :query
+                )
+                WHERE :source IS NULL OR source = :source
+                ORDER BY score ASC
+                LIMIT :limit
+                """,
+                {"query": match_query, "limit": limit, "source": source},
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.OperationalError:
+            return []
+
+
+# -------------------- Embedding Cache -------------------- #
+
+EmbeddingKey = Tuple[str, str]
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(blob: bytes) -> Sequence[float]:
+    """Decode to a float32 array (a quarter of the memory of a list of floats)."""
+    values = array("f")
+    values.frombytes(blob)
+    return values
+
+
+def get_cached_embeddings(
+    keys: Iterable[EmbeddingKey], model: str
+) -> Dict[EmbeddingKey, Sequence[float]]:
+    """Return stored vectors for the requested (doc_id, content_hash) pairs."""
+    wanted = list(set(keys))
+    vectors: Dict[EmbeddingKey, Sequence[float]] = {}
+    # Two parameters per key; the join (unlike a row-value IN) probes the primary key.
+    batch_size = FETCH_BATCH_SIZE // 2
+    with _read_connection() as conn, span("db_read", query="get_cached_embeddings"):
+        for start in range(0, len(wanted), batch_size):
+            batch = wanted[start:start + batch_size]
+            cursor = conn.execute(
+                "SELECT e.doc_id, e.content_hash, e.vector "
+                f"FROM (VALUES {', '.join(['(?, ?)'] * len(batch))}) AS k "
+                "JOIN embeddings e ON e.doc_id = k.column1 AND e.content_hash = k.column2 "
+                "AND e.model = ?",
+                [value for key in batch for value in key] + [model],
+            )
+            for doc_id, content_hash, blob in cursor:
+                vectors[(doc_id, content_hash)] = unpack_vector(blob)
+    return vectors
+
+
+def save_embeddings(
+    rows: Iterable[Tuple[str, str, Sequence[float]]], model: str
+) -> None:
+    with _write_connection() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO embeddings (doc_id, content_hash, model, dim, vector)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (doc_id, content_hash, model, len(vector), pack_vector(vector))
+                for doc_id, content_hash, vector in rows
+            ],
+        )
+
+
+def prune_embeddings(keep: Iterable[EmbeddingKey], model: str) -> int:
+    """Delete cached vectors for `model` that no longer match any indexed content."""
+    keep_set = set(keep)
+    with _write_connection() as conn:
+        stale = [
+            (doc_id, content_hash, model)
+            for doc_id, content_hash in conn.execute(
+                "SELECT doc_id, content_hash FROM embeddings WHERE model = ?",
+                (model,),
+            )
+            if (doc_id, content_hash) not in keep_set
+        ]
+        conn.executemany(
+            "DELETE FROM embeddings WHERE doc_id = ? AND content_hash = ? AND model = ?",
+            stale,
+        )
+    return len(stale)
+
+
+# -------------------- Change Sets -------------------- #
+
+@dataclass
+class ChangeSet:
+    """Row keys inserted, updated and deleted per table by one seed sync."""
+
+    inserted: Dict[str, List[str]] = field(default_factory=dict)
+    updated: Dict[str, List[str]] = field(default_factory=dict)
+    deleted: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return any(self.inserted.values()) or any(self.updated.values()) or any(self.deleted.values())
+
+    def upserted(self, table: str) -> List[str]:
+        return self.inserted.get(table, []) + self.updated.get(table, [])
+
+    def keys(self, table: str) -> List[str]:
+        """Every key of `table` whose row changed in any way."""
+        return self.upserted(table) + self.deleted.get(table, [])
+
+    def describe(self) -> str:
+        parts = [
+            f"{table} +{len(self.inserted.get(table, []))} "
+            f"~{len(self.updated.get(table, []))} -{len(self.deleted.get(table, []))}"
+            for table in SEED_TABLES
+            if self.keys(table)
+        ]
+        return ", ".join(parts) or "no row changes"
+
+
+# -------------------- Change Notifications -------------------- #
+
+_content_listeners: List[Callable[[ChangeSet], None]] = []
+
+
+def add_content_listener(callback: Callable[[ChangeSet], None]) -> None:
+    """Register `callback` to receive the change set of every seed sync that changed rows."""
+    _content_listeners.append(callback)
+
+
+def _notify_content_changed(changes: ChangeSet) -> None:
+    for callback in list(_content_listeners):
+        try:
+            callback(changes)
+        except Exception as exc:
+            print(f"Content change listener {callback!r} failed: {exc}")
+
+
+# -------------------- Seed Sync -------------------- #
+
+@dataclass(frozen=True)
+class SeedTable:
+    name: str
+    key: str
+    columns: Tuple[str, ...]
+    seed_path: str  # name of the module-level path, read at call time
+    to_row: Callable[[Dict[str, Any]], Dict[str, Any]]
+    normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+    @property
+    def path(self) -> Path:
+        return globals()[self.seed_path]
+
+
+SEED_TABLES: Dict[str, SeedTable] = {
+    "documents": SeedTable(
+        "documents", "doc_id", ("doc_id", "title", "category", "tags", "content"),
+        "DOCUMENTS_SEED_PATH", _document_row,
+    ),
+    "projects": SeedTable(
+        "projects", "slug",
+        (
+            "slug", "name", "short_summary", "long_summary", "tags", "github_url",
+            "demo_url", "hero_image", "display_order", "project_type",
+        ),
+        "PROJECTS_SEED_PATH", _project_row, _normalize_project,
+    ),
+    "blogs": SeedTable(
+        "blogs", "slug",
+        (
+            "slug", "title", "excerpt", "content", "content_format", "published_at",
+            "tags", "hero_image", "medium_link",
+        ),
+        "BLOGS_SEED_PATH", _blog_row, _normalize_blog,
+    ),
+}
+
+
+def row_hash(table: SeedTable, row: Dict[str, Any]) -> str:
+    # repr() of the column tuple is a canonical encoding that is several
+    # times cheaper than json.dumps, which dominated a sync of a large seed.
+    encoded = repr(tuple(row[column] for column in table.columns)).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _stored_hashes(conn: sqlite3.Connection, table: SeedTable) -> Dict[str, str]:
+    stored = dict(
+        conn.execute("SELECT row_key, row_hash FROM seed_rows WHERE table_name = ?", (table.name,))
+    )
+    count = conn.execute(f"SELECT COUNT(*) FROM {table.name}").fetchone()[0]
+    if len(stored) == count:
+        return stored
+    # Rows written without hashes (an older database, or seed_* called
+    # directly): hash what is actually in the table once.
+    stored = {}
+    for values in conn.execute(f"SELECT {', '.join(table.columns)} FROM {table.name}"):
+        row = dict(zip(table.columns, values))
+        stored[str(row[table.key])] = row_hash(table, row)
+    conn.execute("DELETE FROM seed_rows WHERE table_name = ?", (table.name,))
+    conn.executemany(
+        "INSERT INTO seed_rows (table_name, row_key, row_hash) VALUES (?, ?, ?)",
+        [(table.name, key, digest) for key, digest in stored.items()],
+    )
+    return stored
+
+
+def sync_seed_table(
+    conn: sqlite3.Connection, table: SeedTable, seed: Iterable[Dict[str, Any]]
+) -> Tuple[List[str], List[str], List[str]]:
+    """Apply `seed` to `table` as a diff; returns the inserted, updated and deleted keys."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for item in seed:
+        row = table.to_row(item)
+        rows[str(row[table.key])] = row
+    hashes = {key: row_hash(table, row) for key, row in rows.items()}
+    previous = _stored_hashes(conn, table)
+
+    inserted = [key for key in hashes if key not in previous]
+    updated = [key for key, digest in hashes.items() if key in previous and previous[key] != digest]
+    deleted = [key for key in previous if key not in hashes]
+
+    if deleted:
+        conn.executemany(f"DELETE FROM {table.name} WHERE {table.key} = ?", [(key,) for key in deleted])
+        conn.executemany(
+            "DELETE FROM seed_rows WHERE table_name = ? AND row_key = ?",
+            [(table.name, key) for key in deleted],
+        )
+        conn.executemany(
+            "DELETE FROM content_tags WHERE table_name = ? AND row_key = ?",
+            [(table.name, key) for key in deleted],
+        )
+    upserts = inserted + updated
+    if upserts:
+        _upsert_rows(conn, table, [rows[key] for key in upserts])
+        conn.executemany(
+            "INSERT OR REPLACE INTO seed_rows (table_name, row_key, row_hash) VALUES (?, ?, ?)",
+            [(table.name, key, hashes[key]) for key in upserts],
+        )
+    if deleted or upserts:
+        _prune_tags(conn)
+    return inserted, updated, deleted
+
+
+def get_rows_by_key(table_name: str, keys: Sequence[str]) -> List[Dict[str, Any]]:
+    """Current rows of `table_name` for `keys`, normalized like the listing readers."""
+    table = SEED_TABLES[table_name]
+    rows: List[Dict[str, Any]] = []
+    with _read_connection() as conn, span("db_read", query="get_rows_by_key"):
+        for start in range(0, len(keys), FETCH_BATCH_SIZE):
+            batch = list(keys[start:start + FETCH_BATCH_SIZE])
+            cursor = conn.execute(
+                f"SELECT {', '.join(table.columns)} FROM {table.name} "
+                f"WHERE {table.key} IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+            rows.extend(dict(row) for row in cursor.fetchall())
+    if table.normalize is not None:
+        rows = [table.normalize(row) for row in rows]
+    return rows
 
 
 # -------------------- Database Initialization -------------------- #
 
-def initialize_database(force_reseed: bool = False) -> None:
+def initialize_database(force_reseed: bool = False) -> ChangeSet:
+    """Sync the content tables with the seed files and return what changed.
+
+    Only seed files whose mtime moved (all of them with `force_reseed`, plus
+    any table that is empty) are parsed. Their rows are hashed and diffed
+    against the stored hashes, and the inserts, updates and deletes are
+    applied in a single transaction. Runs under BUILD_LOCK, so of several
+    worker processes starting together only the first one syncs.
+    """
+    with BUILD_LOCK:
+        return _sync_seed_tables(force_reseed)
+
+
+def _sync_seed_tables(force_reseed: bool) -> ChangeSet:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     create_schema()
 
     prev_state = load_previous_state()
     curr_state = get_seed_file_state()
-    json_changed = any(
-        prev_state.get(k) != curr_state.get(k) for k in curr_state.keys()
-    )
-
-    if force_reseed or json_changed:
-        print("Seed files changed — reseeding database...")
-        seed_documents(load_json_seed(DOCUMENTS_SEED_PATH))
-        seed_projects(load_json_seed(PROJECTS_SEED_PATH))
-        seed_blogs(load_json_seed(BLOGS_SEED_PATH))
-        save_current_state(curr_state)
-    else:
+    stale = [
+        table
+        for name, table in SEED_TABLES.items()
+        if force_reseed or prev_state.get(name) != curr_state.get(name) or is_table_empty(name)
+    ]
+    if not stale:
         print("Seed files unchanged — skipping reseed.")
-        if is_table_empty("documents"):
-            seed_documents(load_json_seed(DOCUMENTS_SEED_PATH))
-        if is_table_empty("projects"):
-            seed_projects(load_json_seed(PROJECTS_SEED_PATH))
-        if is_table_empty("blogs"):
-            seed_blogs(load_json_seed(BLOGS_SEED_PATH))
+        return ChangeSet()
+
+    print(f"Seed files changed — syncing {', '.join(table.name for table in stale)}...")
+    changes = ChangeSet()
+    with span("seed_sync"):
+        seeds = {table.name: load_json_seed(table.path) for table in stale}
+        with _write_connection() as conn:
+            for table in stale:
+                inserted, updated, deleted = sync_seed_table(conn, table, seeds[table.name])
+                changes.inserted[table.name] = inserted
+                changes.updated[table.name] = updated
+                changes.deleted[table.name] = deleted
+    save_current_state(curr_state)
+    print(f"Seed sync: {changes.describe()}.")
+    if changes:
+        _notify_content_changed(changes)
+    return changes
 
 
 # -------------------- Main -------------------- #
@@ -0,0 +1,210 @@
+"""Deterministic offline stand-ins for the OpenAI chat and embedding models.
+
+Enabled with PORTFOLIO_FAKE_MODELS=1 so the API can be exercised without
+network access or an API key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+import uuid
+import zlib
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_EMBEDDING_SIZE = 1536
+
+TOKEN_RE = re.compile(r"\w+")
+
+NAVIGATION_RE = re.compile(
+    r"\b(?:show|open|go|take|navigate|see|view)\b.*\b(projects?|blogs?|home)\b"
+)
+
+
+def _navigation_target(text: str) -> Optional[str]:
+    match = NAVIGATION_RE.search(text.lower())
+    if not match:
+        return None
+    target = match.group(1)
+    if target.startswith("project"):
+        return "projects"
+    if target.startswith("blog"):
+        return "blogs"
+    return "home"
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted tool-calling chat model.
+
+    Navigation requests produce a `navigate_to_section` call, every other
+    question a `retrieve_portfolio_context` call, and tool results are
+    echoed back as the final answer. `latency` seconds are spent before each
+    response to mimic a remote model.
+    """
+
+    answer_chars: int = 400
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-portfolio-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            if last.name == "navigate_to_section":
+                return AIMessage(content="Sure, taking you there now.")
+            return AIMessage(
+                content=f"Here is what I found:\n\n{str(last.content)[:self.answer_chars]}"
+            )
+        question = str(last.content)
+        section = _navigation_target(question)
+        if section:
+            name, args = "navigate_to_section", {"section": section}
+        else:
+            name, args = "retrieve_portfolio_context", {"query": question}
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}],
+        )
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
+            return
+        for token in re.findall(r"\S+\s*|\s+", str(message.content)):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for chunk in self._chunks(self._next_message(messages)):
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._next_message(messages)):
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+@lru_cache(maxsize=65536)
+def _hashed_token(token: str, size: int) -> Tuple[int, float]:
+    digest = zlib.crc32(token.encode("utf-8"))
+    return digest % size, 1.0 if digest & 0x80000000 else -1.0
+
+
+class HashEmbeddings(Embeddings):
+    """Feature-hashed bag of words, unit-normalized.
+
+    Deterministic like a hash-seeded random vector, but texts sharing words
+    land close together, so retrieval and the similarity cache behave
+    plausibly. `latency` seconds are spent per call to mimic the remote API.
+    """
+
+    def __init__(self, size: int = FAKE_EMBEDDING_SIZE, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        indices, signs = [], []
+        for token in TOKEN_RE.findall(text.lower()):
+            index, sign = _hashed_token(token, self.size)
+            indices.append(index)
+            signs.append(sign)
+        vector = np.bincount(indices, weights=signs, minlength=self.size) if indices else np.zeros(self.size)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+def fake_embeddings(size: int = FAKE_EMBEDDING_SIZE, latency: float = 0.0) -> HashEmbeddings:
+    """Hash-based vectors: identical text always maps to the same embedding."""
+    return HashEmbeddings(size=size, latency=latency)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+try:
+    from .db import DATA_DIR
+    from .indexing import index_backend
+    from .vector_index import NumpyVectorStore
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from db import DATA_DIR
+    from indexing import index_backend
+    from vector_index import NumpyVectorStore
+
+if TYPE_CHECKING:
+    from .indexing import VectorIndex
+
+SNAPSHOT_DIR = DATA_DIR / "faiss_index"
+MANIFEST_PATH = SNAPSHOT_DIR / "manifest.json"
+# Bump when the document formatting or snapshot layout changes so that old
+# snapshots are never loaded against a different corpus representation.
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+# -------------------- Fingerprinting -------------------- #
+
+def embedding_model_name(embeddings: Embeddings) -> str:
+    """Return a stable identifier for the embedding model behind `embeddings`."""
+    model = getattr(embeddings, "model", None)
+    if model:
+        return str(model)
+    size = getattr(embeddings, "size", None)
+    return f"{type(embeddings).__name__}:{size}" if size else type(embeddings).__name__
+
+
+def document_digest(doc: Dict[str, Any]) -> bytes:
+    """Hash one document's content and metadata for `corpus_fingerprint`."""
+    return hashlib.sha256(json.dumps(doc, sort_keys=True, ensure_ascii=False).encode("utf-8")).digest()
+
+
+def iter_recording_digests(docs: Iterable[Dict[str, Any]], digests: List[bytes]) -> Iterator[Dict[str, Any]]:
+    """Pass `docs` through, appending each one's `document_digest` to `digests`."""
+    for doc in docs:
+        digests.append(document_digest(doc))
+        yield doc
+
+
+def fingerprint_digests(doc_digests: Iterable[bytes], embedding_model: str) -> str:
+    """Combine per-document digests (in any order) with the embedding model."""
+    digest = hashlib.sha256()
+    digest.update(f"v{SNAPSHOT_FORMAT_VERSION}:{embedding_model}\n".encode("utf-8"))
+    for doc_digest in sorted(doc_digests):
+        digest.update(doc_digest)
+    return digest.hexdigest()
+
+
+def corpus_fingerprint(docs: Iterable[Dict[str, Any]], embedding_model: str) -> str:
+    """Hash every document's content and metadata together with the embedding model.
+
+    Documents are hashed one at a time and only their digests are sorted, so
+    the corpus is never serialized in full.
+    """
+    return fingerprint_digests((document_digest(doc) for doc in docs), embedding_model)
+
+
+# -------------------- Manifest Handling -------------------- #
+
+def load_manifest() -> Dict[str, Any]:
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with MANIFEST_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _write_manifest(manifest: Dict[str, Any]) -> None:
+    tmp_path = MANIFEST_PATH.with_suffix(".json.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _prune_stale_indexes(keep: AbstractSet[str]) -> None:
+    """Delete every index file except those named in `keep`."""
+    for path in SNAPSHOT_DIR.glob("index-*"):
+        if path.name not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+# -------------------- Load / Save -------------------- #
+
+def _load_faiss(index_name: str, embeddings: Embeddings) -> VectorIndex:
+    """Load a FAISS snapshot, memory-mapping the index file where FAISS supports it."""
+    import pickle
+
+    import faiss
+    from langchain_community.vectorstores.faiss import FAISS
+
+    index_path = str(SNAPSHOT_DIR / f"{index_name}.faiss")
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+    index = faiss.read_index(index_path, mmap_flag) if mmap_flag is not None else faiss.read_index(index_path)
+    # The pickle is written by save_snapshot below, never by a third party.
+    with (SNAPSHOT_DIR / f"{index_name}.pkl").open("rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def _load_index(manifest: Dict[str, Any], embeddings: Embeddings) -> Optional[VectorIndex]:
+    backend = manifest.get("backend", "faiss")
+    index_name = manifest.get("index_name")
+    suffix = ".faiss" if backend == "faiss" else ".npy"
+    if not index_name or not (SNAPSHOT_DIR / f"{index_name}{suffix}").exists():
+        return None
+
+    try:
+        if backend != "faiss":
+            return NumpyVectorStore.load(SNAPSHOT_DIR, index_name, embeddings)
+        return _load_faiss(index_name, embeddings)
+    except Exception as exc:
+        print(f"Failed to load vector store snapshot ({exc}); rebuilding.")
+        return None
+
+
+def load_snapshot(
+    fingerprint: str, embeddings: Embeddings, backend: str = "faiss"
+) -> Optional[Tuple[VectorIndex, Dict[str, Any]]]:
+    """Load the persisted index if it was built from the same corpus and model by `backend`.
+
+    Returns the store with the manifest that describes it.
+    """
+    manifest = load_manifest()
+    if manifest.get("fingerprint") != fingerprint or manifest.get("backend", "faiss") != backend:
+        return None
+    store = _load_index(manifest, embeddings)
+    return (store, manifest) if store is not None else None
+
+
+def load_latest_snapshot(
+    embeddings: Embeddings, backend: str = "faiss", newer_than: Optional[int] = None
+) -> Optional[Tuple[VectorIndex, Dict[str, Any]]]:
+    """Load whatever index the manifest points at, if `backend` wrote it after revision `newer_than`.
+
+    This is how a worker process picks up an index another worker built.
+    """
+    manifest = load_manifest()
+    revision = manifest.get("revision")
+    if manifest.get("backend", "faiss") != backend or revision is None:
+        return None
+    if newer_than is not None and revision <= newer_than:
+        return None
+    store = _load_index(manifest, embeddings)
+    return (store, manifest) if store is not None else None
+
+
+def save_snapshot(
+    store: VectorIndex,
+    fingerprint: Optional[str],
+    embedding_model: str,
+    document_count: int,
+) -> Dict[str, Any]:
+    """Persist `store` as the next snapshot revision and publish it in the manifest.
+
+    Every save writes new files, so processes still reading (or mapping)
+    the previous revision are unaffected. `fingerprint` is None for a
+    patched index, which only `load_latest_snapshot` will pick up. Callers
+    hold `db.BUILD_LOCK`, which keeps revisions unique across processes.
+    Returns the manifest written.
+    """
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    revision = int(load_manifest().get("revision") or 0) + 1
+    index_name = f"index-{revision:06d}"
+    if isinstance(store, NumpyVectorStore):
+        paths = store.save(SNAPSHOT_DIR, index_name)
+    else:
+        store.save_local(str(SNAPSHOT_DIR), index_name=index_name)
+        paths = [SNAPSHOT_DIR / f"{index_name}.faiss", SNAPSHOT_DIR / f"{index_name}.pkl"]
+    # The manifest is swapped in last so a crash mid-save never points at a
+    # partially written index.
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "revision": revision,
+        "fingerprint": fingerprint,
+        "index_name": index_name,
+        "backend": index_backend(store),
+        "embedding_model": embedding_model,
+        "document_count": document_count,
+        "created_at": time.time(),
+    }
+    _write_manifest(manifest)
+    # Workers still mapping an older revision keep their pages: on POSIX an
+    # unlinked file lives on until its last mapping is closed.
+    _prune_stale_indexes(keep={path.name for path in paths})
+    return manifest
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import hashlib
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from langchain_core.embeddings import Embeddings
+
+try:
+    from .db import get_cached_embeddings, prune_embeddings, save_embeddings
+    from .metrics import span
+    from .vector_index import NumpyVectorStore
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from db import get_cached_embeddings, prune_embeddings, save_embeddings
+    from metrics import span
+    from vector_index import NumpyVectorStore
+
+if TYPE_CHECKING:  # FAISS is only imported where an index is built or loaded
+    from langchain_community.vectorstores.faiss import FAISS
+
+    VectorIndex = Union[FAISS, NumpyVectorStore]
+
+EMBED_BATCH_SIZE = 128
+VECTOR_BACKENDS = ("faiss", "numpy")
+
+# Chunks with their vectors, as yielded by `iter_embedded_batches`.
+EmbeddedBatch = Tuple[List[dict], List[Sequence[float]]]
+
+
+# -------------------- Content Hashing -------------------- #
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def annotate_content_hashes(docs: List[dict]) -> None:
+    """Store the sha256 of each document's content in its metadata."""
+    for doc in docs:
+        doc["metadata"]["content_hash"] = content_hash(doc["content"])
+
+
+def iter_content_hashed(docs: Iterable[dict]) -> Iterator[dict]:
+    """Lazy `annotate_content_hashes` for a stream of documents."""
+    for doc in docs:
+        doc["metadata"]["content_hash"] = content_hash(doc["content"])
+        yield doc
+
+
+def index_id(doc: dict) -> str:
+    """Chunks are keyed by their chunk_id; unchunked documents by their doc_id."""
+    metadata = doc["metadata"]
+    return metadata.get("chunk_id") or metadata["doc_id"]
+
+
+def embedding_keys(docs: Sequence[dict]) -> List[Tuple[str, str]]:
+    return [(index_id(doc), doc["metadata"]["content_hash"]) for doc in docs]
+
+
+def iter_recording_keys(docs: Iterable[dict], keys: List[Tuple[str, str]]) -> Iterator[dict]:
+    """Pass `docs` through, appending each one's embedding key to `keys`."""
+    for doc in docs:
+        keys.append((index_id(doc), doc["metadata"]["content_hash"]))
+        yield doc
+
+
+# -------------------- Cached Embedding -------------------- #
+
+def embed_documents_cached(
+    docs: Sequence[dict],
+    embeddings: Embeddings,
+    model: str,
+    batch_size: int = EMBED_BATCH_SIZE,
+) -> List[Sequence[float]]:
+    """Return one vector per document, embedding only content missing from the cache."""
+    vectors, embedded = _embed_cached(docs, embeddings, model, batch_size)
+    print(f"Embedding cache: {len(docs) - embedded} hits, {embedded} embedded.")
+    return vectors
+
+
+def _embed_cached(
+    docs: Sequence[dict], embeddings: Embeddings, model: str, batch_size: int
+) -> Tuple[List[Sequence[float]], int]:
+    keys = embedding_keys(docs)
+    vectors = get_cached_embeddings(keys, model)
+
+    pending: Dict[Tuple[str, str], str] = {}
+    for key, doc in zip(keys, docs):
+        if key not in vectors:
+            pending.setdefault(key, doc["content"])
+
+    missing = list(pending.items())
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        batch_vectors = embeddings.embed_documents([text for _, text in batch])
+        rows = [
+            (doc_id, digest, vector)
+            for ((doc_id, digest), _), vector in zip(batch, batch_vectors)
+        ]
+        save_embeddings(rows, model)
+        for doc_id, digest, vector in rows:
+            vectors[(doc_id, digest)] = vector
+
+    return [vectors[key] for key in keys], len(missing)
+
+
+def iter_embedded_batches(
+    docs: Iterable[dict],
+    embeddings: Embeddings,
+    model: str,
+    batch_size: int = EMBED_BATCH_SIZE,
+) -> Iterator[EmbeddedBatch]:
+    """Embed a stream of chunks (cache first) about `batch_size` at a time.
+
+    Only one batch of vectors is held as Python lists at once. A batch
+    always ends on a source-document boundary, so every chunk of a document
+    lands in the same batch.
+    """
+    total = embedded = 0
+    batch: List[dict] = []
+
+    def flush() -> EmbeddedBatch:
+        nonlocal total, embedded
+        with span("embed_documents", documents=len(batch)):
+            vectors, missing = _embed_cached(batch, embeddings, model, batch_size)
+        total += len(batch)
+        embedded += missing
+        return batch, vectors
+
+    for doc in docs:
+        if len(batch) >= batch_size and doc["metadata"].get("doc_id") != batch[-1]["metadata"].get("doc_id"):
+            yield flush()
+            batch = []
+        batch.append(doc)
+    if batch:
+        yield flush()
+    print(f"Embedding cache: {total - embedded} hits, {embedded} embedded.")
+
+
+def prune_embedding_cache(keys: Iterable[Tuple[str, str]], model: str) -> int:
+    return prune_embeddings(keys, model)
+
+
+# -------------------- Index Construction -------------------- #
+
+def build_faiss_index(
+    docs: Sequence[dict], vectors: Sequence[Sequence[float]], embeddings: Embeddings
+) -> FAISS:
+    from langchain_community.vectorstores.faiss import FAISS
+
+    return FAISS.from_embeddings(
+        [(doc["content"], vector) for doc, vector in zip(docs, vectors)],
+        embeddings,
+        metadatas=[doc["metadata"] for doc in docs],
+        ids=[index_id(doc) for doc in docs],
+    )
+
+
+def build_vector_index(
+    docs: Sequence[dict],
+    vectors: Sequence[Sequence[float]],
+    embeddings: Embeddings,
+    backend: str = "faiss",
+    dtype: str = "float32",
+) -> VectorIndex:
+    """Build the index engine named by `backend`; `dtype` is the numpy engine's row storage."""
+    if backend == "numpy":
+        return NumpyVectorStore.from_embeddings(docs, vectors, embeddings, [index_id(doc) for doc in docs], dtype)
+    if backend != "faiss":
+        raise ValueError(f"Unsupported vector backend {backend!r}; expected one of {VECTOR_BACKENDS}.")
+    return build_faiss_index(docs, vectors, embeddings)
+
+
+def build_vector_index_batches(
+    batches: Iterable[EmbeddedBatch],
+    embeddings: Embeddings,
+    backend: str = "faiss",
+    dtype: str = "float32",
+) -> VectorIndex:
+    """`build_vector_index` over `iter_embedded_batches`, adding one batch at a time."""
+    if backend == "numpy":
+        parts = [
+            NumpyVectorStore.from_embeddings(docs, vectors, embeddings, [index_id(doc) for doc in docs], dtype)
+            for docs, vectors in batches
+        ]
+        if not parts:
+            raise ValueError("No documents to index.")
+        return NumpyVectorStore.concatenate(parts)
+    store = None
+    for docs, vectors in batches:
+        if store is None:
+            store = build_vector_index(docs, vectors, embeddings, backend, dtype)
+        else:
+            store.add_embeddings(
+                [(doc["content"], vector) for doc, vector in zip(docs, vectors)],
+                metadatas=[doc["metadata"] for doc in docs],
+                ids=[index_id(doc) for doc in docs],
+            )
+    if store is None:
+        raise ValueError("No documents to index.")
+    return store
+
+
+def index_backend(store: VectorIndex) -> str:
+    """Label of the engine (and row storage) behind `store`, e.g. "faiss" or "numpy-int8"."""
+    return f"numpy-{store.dtype}" if isinstance(store, NumpyVectorStore) else "faiss"
+
+
+def vector_count(store: Optional[VectorIndex]) -> int:
+    if store is None:
+        return 0
+    return len(store) if isinstance(store, NumpyVectorStore) else store.index.ntotal
+
+
+def clone_store(store: VectorIndex) -> VectorIndex:
+    """Independent copy of `store` that can be updated while the original keeps serving."""
+    if isinstance(store, NumpyVectorStore):
+        return store.copy()
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores.faiss import FAISS
+
+    return FAISS(
+        embedding_function=store.embedding_function,
+        index=faiss.clone_index(store.index),
+        docstore=InMemoryDocstore(dict(store.docstore._dict)),
+        index_to_docstore_id=dict(store.index_to_docstore_id),
+        relevance_score_fn=store.override_relevance_score_fn,
+        normalize_L2=store._normalize_L2,
+        distance_strategy=store.distance_strategy,
+    )
+
+
+def upsert_index(
+    store: VectorIndex,
+    docs: Sequence[dict],
+    vectors: Sequence[Sequence[float]],
+    doc_ids: Optional[AbstractSet[str]] = None,
+) -> Tuple[int, int, int]:
+    """Bring `store` in line with `docs`, touching only added, changed or removed entries.
+
+    With `doc_ids`, `docs` holds just the chunks of those source documents
+    and every other entry in the index is left alone.
+
+    Returns the number of added, replaced and removed chunks.
+    """
+    if isinstance(store, NumpyVectorStore):
+        return store.upsert(docs, vectors, [index_id(doc) for doc in docs], doc_ids)
+
+    indexed: Dict[str, str] = {}
+    for item_id in store.index_to_docstore_id.values():
+        metadata = getattr(store.docstore.search(item_id), "metadata", {})
+        if doc_ids is not None and metadata.get("doc_id") not in doc_ids:
+            continue
+        indexed[item_id] = metadata.get("content_hash", "")
+
+    wanted = {index_id(doc): (doc, vector) for doc, vector in zip(docs, vectors)}
+    removed = [item_id for item_id in indexed if item_id not in wanted]
+    changed = [
+        item_id
+        for item_id, (doc, _) in wanted.items()
+        if item_id in indexed and indexed[item_id] != doc["metadata"]["content_hash"]
+    ]
+    added = [item_id for item_id in wanted if item_id not in indexed]
+
+    upserts = changed + added
+    if removed or upserts:
+        replace_entries(
+            store,
+            removed + changed,
+            [wanted[item_id][0] for item_id in upserts],
+            [wanted[item_id][1] for item_id in upserts],
+        )
+    return len(added), len(changed), len(removed)
+
+
+def indexed_hashes(store: VectorIndex) -> Dict[str, str]:
+    """Item id -> content hash of every entry in `store`."""
+    if isinstance(store, NumpyVectorStore):
+        return {
+            item_id: document.metadata.get("content_hash", "")
+            for item_id, document in zip(store.ids, store.documents)
+        }
+    return {
+        item_id: getattr(store.docstore.search(item_id), "metadata", {}).get("content_hash", "")
+        for item_id in store.index_to_docstore_id.values()
+    }
+
+
+def replace_entries(
+    store: VectorIndex, drop_ids: Sequence[str], docs: Sequence[dict], vectors: Sequence[Sequence[float]]
+) -> None:
+    """Delete the entries `drop_ids` from `store`, then add `docs` with their vectors."""
+    if isinstance(store, NumpyVectorStore):
+        store.replace(drop_ids, docs, vectors, [index_id(doc) for doc in docs])
+        return
+    if drop_ids:
+        store.delete(list(drop_ids))
+    if docs:
+        store.add_embeddings(
+            [(doc["content"], vector) for doc, vector in zip(docs, vectors)],
+            metadatas=[doc["metadata"] for doc in docs],
+            ids=[index_id(doc) for doc in docs],
+        )
+
+
+def upsert_index_batches(store: VectorIndex, batches: Iterable[EmbeddedBatch]) -> Tuple[int, int, int]:
+    """`upsert_index` over `iter_embedded_batches`: the whole corpus, one batch at a time.
+
+    The store's entries are read once up front. Each batch keeps only its
+    new or changed chunks, and they are applied together with the removals
+    at the end, so the store is scanned and rewritten once per upsert.
+    """
+    indexed = indexed_hashes(store)
+    seen = set()
+    changed: List[str] = []
+    upsert_docs: List[dict] = []
+    upsert_vectors: List[Sequence[float]] = []
+    for docs, vectors in batches:
+        for doc, vector in zip(docs, vectors):
+            item_id = index_id(doc)
+            seen.add(item_id)
+            previous = indexed.get(item_id)
+            if previous == doc["metadata"]["content_hash"]:
+                continue
+            if previous is not None:
+                changed.append(item_id)
+            upsert_docs.append(doc)
+            upsert_vectors.append(vector)
+    removed = [item_id for item_id in indexed if item_id not in seen]
+    if removed or upsert_docs:
+        replace_entries(store, removed + changed, upsert_docs, upsert_vectors)
+    return len(upsert_docs) - len(changed), len(changed), len(removed)
@@ -0,0 +1,198 @@
+"""Local intent routing that answers navigation and off-topic messages without the LLM.
+
+A precompiled, fully anchored navigation pattern proposes a section and a
+small character n-gram classifier trained on `data/intent_examples.json`
+can veto it before the agent is bypassed. Off-topic messages are rejected by
+one compiled keyword pattern, or by the classifier when it is very sure.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .db import DATA_DIR
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from db import DATA_DIR
+
+INTENT_EXAMPLES_PATH = DATA_DIR / "intent_examples.json"
+
+SECTIONS = ("projects", "blogs", "home")
+OFF_TOPIC = "off_topic"
+PORTFOLIO = "portfolio"
+
+NAVIGATION_THRESHOLD = 0.5  # minimum 1 - P(portfolio or off_topic) to bypass
+OFF_TOPIC_THRESHOLD = 0.9
+
+NAVIGATION_REPLIES = {
+    "projects": "Sure! Taking you to the projects page.",
+    "blogs": "Sure! Taking you to the blog.",
+    "home": "Sure! Taking you back to the home page.",
+}
+
+# Keywords that suggest coding, general knowledge, or meta-instructions,
+# plus simple code-like structures.
+FORBIDDEN_KEYWORDS = [
+    "write code", "fastapi", "python code", "javascript", "react",
+    "what is the capital of", "who is the president of",
+    "ignore your instructions", "you are now", "act as",
+    "def ", "import ", "=> {",
+]
+OFF_TOPIC_RE = re.compile("|".join(re.escape(keyword) for keyword in FORBIDDEN_KEYWORDS))
+
+_LEAD = r"^\s*(?:(?:please|can you|could you|would you|i want to|i'd like to|i would like to|let me|let's|lets)\s+)*"
+_VERB = r"(?:show|take|bring|go|open|navigate|head|jump|switch|see|view|browse|display|visit|read|return|back)"
+_FILLER = r"(?:\s+(?:me|us|back|over|to|on|up|the|your|his|all|of|at|a|into))*"
+_TAIL = r"(?:\s+(?:page|section|tab))?(?:\s+please)?\s*[.!?]*\s*$"
+_TARGETS = {
+    "projects": r"projects?",
+    "blogs": r"(?:blogs?|blog\s+posts?|articles?|posts|writing)",
+    "home": r"(?:home(?:\s*page)?|main\s+page|start\s+page|landing\s+page)",
+}
+# One alternation per section, each anchored to the whole message so that
+# "show me projects that use RAG" is left to the agent.
+NAVIGATION_RE = re.compile(
+    "|".join(
+        rf"(?P<{section}>{_LEAD}(?:{_VERB}{_FILLER}\s+)?{target}{_TAIL})"
+        for section, target in _TARGETS.items()
+    ),
+    re.IGNORECASE,
+)
+# Used on the assistant's own reply when it did not call the navigation tool.
+NAVIGATION_TEXT_RE = re.compile(
+    r"(?P<projects>projects (?:page|section)|view all the projects)"
+    r"|(?P<blogs>blogs? (?:page|section))"
+    r"|(?P<home>home ?page)",
+    re.IGNORECASE,
+)
+
+
+def is_request_off_topic(message: str) -> bool:
+    """A simple guardrail to filter out-of-scope requests."""
+    return OFF_TOPIC_RE.search(message.lower()) is not None
+
+
+def match_navigation(message: str) -> Optional[str]:
+    match = NAVIGATION_RE.match(message)
+    return match.lastgroup if match else None
+
+
+def navigation_from_text(text: str) -> Optional[str]:
+    match = NAVIGATION_TEXT_RE.search(text)
+    return match.lastgroup if match else None
+
+
+@dataclass(frozen=True)
+class Intent:
+    kind: str  # "navigate", "off_topic" or "agent"
+    section: Optional[str] = None
+    confidence: float = 1.0
+    reason: str = ""
+
+
+def load_intent_examples(path=INTENT_EXAMPLES_PATH) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class IntentRouter:
+    """Routes a message to `navigate`, `off_topic` or the full `agent`.
+
+    The classifier is trained lazily on first use (or via `warm_up()`); if
+    scikit-learn is unavailable, routing falls back to the patterns alone.
+    After training only the vocabulary, idf and coefficient arrays are kept,
+    and scoring is a small gather plus matvec instead of a pipeline call.
+    """
+
+    def __init__(
+        self,
+        examples: Optional[List[Dict[str, str]]] = None,
+        navigation_threshold: float = NAVIGATION_THRESHOLD,
+        off_topic_threshold: float = OFF_TOPIC_THRESHOLD,
+    ):
+        self._examples = examples
+        self.navigation_threshold = navigation_threshold
+        self.off_topic_threshold = off_topic_threshold
+        self._analyzer = None
+        self._vocabulary: Dict[str, int] = {}
+        self._idf: Optional[np.ndarray] = None
+        self._coef: Optional[np.ndarray] = None
+        self._intercept: Optional[np.ndarray] = None
+        self._classes: List[str] = []
+        self._trained = False
+        self._lock = Lock()
+
+    @property
+    def trained(self) -> bool:
+        return self._trained
+
+    def warm_up(self) -> None:
+        with self._lock:
+            if self._trained:
+                return
+            examples = self._examples if self._examples is not None else load_intent_examples()
+            try:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                from sklearn.linear_model import LogisticRegression
+                from sklearn.pipeline import make_pipeline
+            except ImportError:
+                print("scikit-learn not installed; intent routing uses patterns only.")
+            else:
+                model = make_pipeline(
+                    TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True, lowercase=True),
+                    LogisticRegression(max_iter=2000, C=10.0),
+                )
+                model.fit([row["text"] for row in examples], [row["label"] for row in examples])
+                vectorizer, classifier = model.steps[0][1], model.steps[1][1]
+                self._analyzer = vectorizer.build_analyzer()
+                self._vocabulary = dict(vectorizer.vocabulary_)
+                self._idf = vectorizer.idf_.astype(np.float64)
+                self._coef = np.ascontiguousarray(classifier.coef_.T)
+                self._intercept = classifier.intercept_.copy()
+                self._classes = [str(label) for label in classifier.classes_]
+            self._trained = True
+
+    def probabilities(self, message: str) -> Dict[str, float]:
+        """Class probabilities, identical to the trained pipeline's `predict_proba`."""
+        self.warm_up()
+        if self._analyzer is None:
+            return {}
+        columns, counts = [], []
+        for term, count in Counter(self._analyzer(message)).items():
+            column = self._vocabulary.get(term)
+            if column is not None:
+                columns.append(column)
+                counts.append(count)
+        scores = self._intercept
+        if columns:
+            # sublinear tf * idf, l2-normalized, then the linear model.
+            weights = (1.0 + np.log(counts)) * self._idf[columns]
+            weights /= np.linalg.norm(weights)
+            scores = scores + weights @ self._coef[columns]
+        exp = np.exp(scores - scores.max())
+        return dict(zip(self._classes, (float(p) for p in exp / exp.sum())))
+
+    def route(self, message: str) -> Intent:
+        if is_request_off_topic(message):
+            return Intent("off_topic", reason="keyword")
+
+        section = match_navigation(message)
+        probabilities = self.probabilities(message)
+        if section:
+            # The anchored pattern is precise on its own; the classifier acts as
+            # a veto when it is confident the message is really a question.
+            confidence = 1.0 - max(probabilities.get(PORTFOLIO, 0.0), probabilities.get(OFF_TOPIC, 0.0))
+            if confidence >= self.navigation_threshold:
+                return Intent("navigate", section=section, confidence=confidence, reason="pattern")
+
+        off_topic = probabilities.get(OFF_TOPIC, 0.0)
+        if off_topic >= self.off_topic_threshold:
+            return Intent("off_topic", confidence=off_topic, reason="classifier")
+        return Intent("agent", confidence=probabilities.get(PORTFOLIO, 0.0))
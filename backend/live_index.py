@@ -0,0 +1,142 @@
+"""The published vector index and the background worker that rebuilds it.
+
+Readers take `LiveIndex.current` (a plain attribute read) and keep using that
+`IndexVersion` for the whole request. Builders never touch a published store:
+they build or copy-and-update a private one and `publish()` it with a single
+reference swap, read-copy-update style, so searches never block on a build
+and never observe a half-built index.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .indexing import index_backend, vector_count
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from indexing import index_backend, vector_count
+
+if TYPE_CHECKING:
+    from .indexing import VectorIndex
+
+
+@dataclass(frozen=True)
+class IndexVersion:
+    store: Optional[VectorIndex]
+    version: int
+    fingerprint: Optional[str]
+    document_count: int
+    build_seconds: float
+    built_at: float
+    mode: str
+    # Snapshot revision this version was saved as or loaded from, if any.
+    revision: Optional[int] = None
+
+
+class LiveIndex:
+    """Holds the current `IndexVersion` and runs rebuild jobs one at a time.
+
+    A job submitted while another is running is queued, unless the same job
+    with the same arguments is already waiting, so a burst of triggers costs
+    at most one extra build and an accepted request is never dropped.
+    """
+
+    def __init__(self):
+        self.current: Optional[IndexVersion] = None
+        self._version = 0
+        self._publish_lock = Lock()
+        self._worker_lock = Lock()
+        self._worker: Optional[Thread] = None
+        self._queued: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = []
+        self.last_error: Optional[str] = None
+        self.last_started_at: Optional[float] = None
+
+    @property
+    def store(self) -> Optional[VectorIndex]:
+        current = self.current
+        return current.store if current is not None else None
+
+    def publish(
+        self,
+        store: Optional[VectorIndex],
+        fingerprint: Optional[str],
+        document_count: int,
+        build_seconds: float,
+        mode: str,
+        revision: Optional[int] = None,
+    ) -> IndexVersion:
+        with self._publish_lock:
+            self._version += 1
+            published = IndexVersion(
+                store=store,
+                version=self._version,
+                fingerprint=fingerprint,
+                document_count=document_count,
+                build_seconds=build_seconds,
+                built_at=time.time(),
+                mode=mode,
+                revision=revision,
+            )
+            self.current = published
+        return published
+
+    # -------------------- Background Worker -------------------- #
+
+    @property
+    def building(self) -> bool:
+        return self._worker is not None
+
+    def submit(self, job: Callable[..., Any], *args: Any) -> bool:
+        """Run `job(*args)` in the background; returns False if it was queued behind a running build."""
+        with self._worker_lock:
+            if self._worker is not None:
+                if (job, args) not in self._queued:
+                    self._queued.append((job, args))
+                return False
+            self._worker = Thread(target=self._run, args=(job, args), name="reindex", daemon=True)
+            self._worker.start()
+            return True
+
+    def _run(self, job: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        while True:
+            self.last_started_at = time.time()
+            try:
+                job(*args)
+                self.last_error = None
+            except Exception as exc:
+                # The previous version stays published; the failure is reported in status().
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                print(f"Background reindex failed: {self.last_error}")
+            with self._worker_lock:
+                if not self._queued:
+                    # Cleared under the lock so a concurrent submit() either
+                    # queues for this loop or starts a fresh worker.
+                    self._worker = None
+                    return
+                job, args = self._queued.pop(0)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "state": "building" if self.building else "idle",
+            "queued": len(self._queued),
+            "version": current.version if current else 0,
+            "fingerprint": current.fingerprint if current else None,
+            "document_count": current.document_count if current else 0,
+            "vector_count": vector_count(current.store if current else None),
+            "backend": index_backend(current.store) if current and current.store is not None else None,
+            "build_seconds": current.build_seconds if current else None,
+            "built_at": current.built_at if current else None,
+            "mode": current.mode if current else None,
+            "revision": current.revision if current else None,
+            "last_started_at": self.last_started_at,
+            "last_error": self.last_error,
+        }
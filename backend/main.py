@@ -1,45 +1,243 @@
 # from __future_ import annotations
 
+import asyncio
+import base64
+import hmac
+import json
 import os
-import re
+import time
+from contextlib import nullcontext
 from threading import Lock
-from typing import Annotated, Any, List, Literal, Optional, TypedDict
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
 
+import httpx
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from langgraph.graph import StateGraph
-from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
-from langchain.tools import tool
-from langchain_community.vectorstores.faiss import FAISS
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from pydantic import BaseModel
 
 # --- Database Imports (assuming your db.py is in the same directory) ---
 try:
     from .db import (
+        BUILD_LOCK,
+        DATA_DIR,
+        INDEX_LOCK,
+        ChangeSet,
+        add_content_listener,
+        blog_listing_key,
+        close_connections,
         get_all_blogs,
-        get_all_documents,
         get_all_projects,
-        get_blog_by_slug,
+        get_rows_by_key,
         initialize_database,
+        iter_blogs,
+        iter_documents,
+        iter_projects,
+        list_blogs_page,
+        list_projects_page,
+        load_previous_state,
+        project_listing_key,
     )
+    from .admission import AdmissionController, Rejected, Ticket
+    from .answer_cache import AnswerCache, normalize_message
+    from .chunking import chunk_documents
+    from .index_snapshot import (
+        corpus_fingerprint,
+        embedding_model_name,
+        fingerprint_digests,
+        iter_recording_digests,
+        load_latest_snapshot,
+        load_snapshot,
+        save_snapshot,
+    )
+    from .intent import NAVIGATION_REPLIES, IntentRouter
+    from .metrics import (
+        CONTENT_TYPE,
+        REGISTRY,
+        MetricsMiddleware,
+        annotate,
+        span,
+        start_trace,
+    )
+    from .live_index import IndexVersion, LiveIndex
+    from .indexing import (
+        annotate_content_hashes,
+        build_vector_index_batches,
+        clone_store,
+        embed_documents_cached,
+        iter_content_hashed,
+        iter_embedded_batches,
+        iter_recording_keys,
+        prune_embedding_cache,
+        upsert_index,
+        upsert_index_batches,
+        vector_count,
+    )
+    from .context import PASSAGE_SEPARATOR
+    from .response_cache import CACHE_CONTROL, ResponseCache, serialize_json
+    from .retrieval import ahybrid_search, aprefetch_queries, prefetched_vector, use_prefetch
+    from .seed_watcher import SeedWatcher
+    from .singleflight import SingleFlight
+    from .sessions import (
+        InMemorySessionStore,
+        Session,
+        SessionStore,
+        SqliteSessionStore,
+        build_turn,
+        history_messages,
+        new_conversation_id,
+    )
+    from .streaming import format_sse, iter_agent_events
 except ImportError:  # pragma: no cover - fallback for direct execution
     from db import (
+        BUILD_LOCK,
+        DATA_DIR,
+        INDEX_LOCK,
+        ChangeSet,
+        add_content_listener,
+        blog_listing_key,
+        close_connections,
         get_all_blogs,
-        get_all_documents,
         get_all_projects,
-        get_blog_by_slug,
+        get_rows_by_key,
         initialize_database,
+        iter_blogs,
+        iter_documents,
+        iter_projects,
+        list_blogs_page,
+        list_projects_page,
+        load_previous_state,
+        project_listing_key,
+    )
+    from admission import AdmissionController, Rejected, Ticket
+    from answer_cache import AnswerCache, normalize_message
+    from chunking import chunk_documents
+    from index_snapshot import (
+        corpus_fingerprint,
+        embedding_model_name,
+        fingerprint_digests,
+        iter_recording_digests,
+        load_latest_snapshot,
+        load_snapshot,
+        save_snapshot,
+    )
+    from intent import NAVIGATION_REPLIES, IntentRouter
+    from metrics import (
+        CONTENT_TYPE,
+        REGISTRY,
+        MetricsMiddleware,
+        annotate,
+        span,
+        start_trace,
     )
+    from live_index import IndexVersion, LiveIndex
+    from indexing import (
+        annotate_content_hashes,
+        build_vector_index_batches,
+        clone_store,
+        embed_documents_cached,
+        iter_content_hashed,
+        iter_embedded_batches,
+        iter_recording_keys,
+        prune_embedding_cache,
+        upsert_index,
+        upsert_index_batches,
+        vector_count,
+    )
+    from context import PASSAGE_SEPARATOR
+    from response_cache import CACHE_CONTROL, ResponseCache, serialize_json
+    from retrieval import ahybrid_search, aprefetch_queries, prefetched_vector, use_prefetch
+    from seed_watcher import SeedWatcher
+    from singleflight import SingleFlight
+    from sessions import (
+        InMemorySessionStore,
+        Session,
+        SessionStore,
+        SqliteSessionStore,
+        build_turn,
+        history_messages,
+        new_conversation_id,
+    )
+    from streaming import format_sse, iter_agent_events
+
+if TYPE_CHECKING:
+    from .indexing import VectorIndex
 
 # --- Environment Variable Loading ---
 # Create a .env file in your project root and add: OPENAI_API_KEY="your-key-here"
 load_dotenv()
 
+# Set PORTFOLIO_FAKE_MODELS=1 to run fully offline with deterministic local models.
+USE_FAKE_MODELS = os.getenv("PORTFOLIO_FAKE_MODELS", "").lower() in ("1", "true", "yes")
+FAKE_LLM_LATENCY = float(os.getenv("PORTFOLIO_FAKE_LLM_LATENCY", "0"))
+FAKE_EMBEDDING_LATENCY = float(os.getenv("PORTFOLIO_FAKE_EMBEDDING_LATENCY", "0"))
+
+# Fraction of chat requests whose per-stage timings are logged as one JSON line.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+
+# When the index, agent graph and intent classifier are built: "eager" blocks
+# startup on them, "background" builds them after the port opens, "lazy" on
+# the first chat.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background").lower()
+
+# /api/chat/batch: most messages per request (never more than CHAT_RATE_BURST
+# while the rate limit is on), and agent runs in flight per batch.
+CHAT_BATCH_MAX_MESSAGES = int(os.getenv("CHAT_BATCH_MAX_MESSAGES", "32"))
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+
+# Admission control for the chat endpoints, per worker: requests running at
+# once, how many may wait for a slot and for how many seconds before a 503,
+# and a per-client token bucket (requests a minute, burst) behind 429s.
+# 0 disables the concurrency or the rate limit. Other endpoints are never limited.
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "16"))
+CHAT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "5"))
+CHAT_RATE_PER_MINUTE = float(os.getenv("CHAT_RATE_PER_MINUTE", "30"))
+CHAT_RATE_BURST = int(os.getenv("CHAT_RATE_BURST", "10"))
+# Request header holding the client address behind a proxy (e.g. X-Forwarded-For);
+# unset, clients are told apart by the connection's peer address.
+CLIENT_IP_HEADER = os.getenv("CLIENT_IP_HEADER", "").lower()
+
+# Seconds between checks of the seed files for edits; 0 disables the watcher.
+SEED_WATCH_INTERVAL = float(os.getenv("SEED_WATCH_INTERVAL", "2"))
+
+# Bounds on one agent run: model turns (the last one must answer), and seconds
+# before in-flight model/tool calls are cancelled and the best answer so far
+# is returned. 0 disables the deadline.
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "4"))
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "30"))
+
+# Retrieved context handed to the LLM per tool call: token budget and most passages.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "400"))
+CONTEXT_MAX_PASSAGES = int(os.getenv("CONTEXT_MAX_PASSAGES", "4"))
+
+# Vector index engine: "faiss", or "numpy" for the in-process matrix index,
+# whose rows are stored as VECTOR_DTYPE ("float32", "float16" or "int8").
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "faiss").lower()
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32").lower()
+VECTOR_BACKEND_LABEL = "faiss" if VECTOR_BACKEND == "faiss" else f"{VECTOR_BACKEND}-{VECTOR_DTYPE}"
+
+# Paged listings (/api/projects and /api/blogs given a filter, limit or
+# cursor): default and largest page size.
+LISTING_PAGE_SIZE = int(os.getenv("LISTING_PAGE_SIZE", "20"))
+LISTING_MAX_PAGE_SIZE = int(os.getenv("LISTING_MAX_PAGE_SIZE", "100"))
+
+# Bearer token for /api/admin/*; the admin endpoints are disabled when unset.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# --- Shared HTTP Clients ---
+# One pooled client per flavour, reused by every OpenAI chat and embedding call
+# so requests share keep-alive connections instead of opening their own.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+HTTP_CLIENT = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+ASYNC_HTTP_CLIENT = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
 # --- FastAPI App Initialization ---
 app = FastAPI(title="Portfolio RAG Agent API")
 
@@ -49,7 +247,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # --- Pydantic Models for API ---
 
@@ -59,12 +259,24 @@ class Action(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
-    # Optional: conversation_id to maintain state in a real app
-    # conversation_id: Optional[str] = None
+    # Omit to start a new conversation; the id comes back on the response.
+    conversation_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
     action: Optional[Action] = None
+    conversation_id: Optional[str] = None
+
+class ChatBatchRequest(BaseModel):
+    messages: List[str]
+
+class ChatBatchItem(BaseModel):
+    index: int
+    response: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatBatchItem]
 
 class ProjectOut(BaseModel):
     slug: str
@@ -93,15 +305,65 @@ class BlogDetail(BlogSummary):
 
 
 # --- RAG Agent State & Globals ---
-# Using a simple in-memory vector store. For production, consider a persistent one.
-VECTOR_STORE: Optional[FAISS] = None
-INDEX_LOCK = Lock()
+# The in-memory vector store is published through LIVE_INDEX: searches read
+# LIVE_INDEX.store without locking and rebuilds swap in a whole new version.
+# Builders hold INDEX_LOCK, which also serializes them across worker
+# processes; each build is saved as a snapshot that every worker maps.
+LIVE_INDEX = LiveIndex()
+EMBEDDING_MODEL = "text-embedding-3-small"
 
-# --- Agent State Definition for LangGraph ---
-class AgentState(TypedDict):
-    messages: Annotated[list[BaseMessage], add_messages]
-    navigation_payload: Optional[str]
+# Answers are keyed on normalized text, then on query-embedding similarity.
+# Rebuilding the vector store invalidates every cached answer.
+ANSWER_CACHE = AnswerCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+    similarity_threshold=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.93")),
+)
+
+# Identical concurrent questions from fresh conversations share one agent run.
+CHAT_FLIGHTS = SingleFlight()
 
+# Chat requests are rate-limited per client and queued for a bounded number
+# of run slots; see admission.py.
+CHAT_ADMISSION = AdmissionController(
+    max_concurrent=CHAT_MAX_CONCURRENCY,
+    max_queue=CHAT_MAX_QUEUE,
+    queue_timeout=CHAT_QUEUE_TIMEOUT_SECONDS,
+    rate_per_minute=CHAT_RATE_PER_MINUTE,
+    rate_burst=CHAT_RATE_BURST,
+)
+# A batch spends one rate-limit token per message up front, so it can be no
+# larger than a full bucket.
+CHAT_BATCH_LIMIT = (
+    min(CHAT_BATCH_MAX_MESSAGES, CHAT_ADMISSION.limiter.burst)
+    if CHAT_ADMISSION.limiter.enabled
+    else CHAT_BATCH_MAX_MESSAGES
+)
+
+# Navigation requests and obvious off-topic messages are answered locally;
+# everything else goes to the agent.
+INTENT_ROUTER = IntentRouter()
+
+# --- Conversation Sessions ---
+# Each conversation keeps a bounded history: over SESSION_TOKEN_BUDGET, older
+# tool outputs are dropped and old turns folded into a running summary.
+# SESSION_BACKEND=sqlite shares sessions between workers through a local file.
+def create_session_store() -> SessionStore:
+    options = dict(
+        ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "3600")),
+        token_budget=int(os.getenv("SESSION_TOKEN_BUDGET", "2000")),
+        summary_tokens=int(os.getenv("SESSION_SUMMARY_TOKENS", "400")),
+    )
+    max_sessions = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+    if os.getenv("SESSION_BACKEND", "memory").lower() == "sqlite":
+        return SqliteSessionStore(DATA_DIR / "sessions.db", max_sessions=max_sessions, **options)
+    return InMemorySessionStore(
+        max_sessions=max_sessions,
+        max_total_tokens=int(os.getenv("SESSION_MAX_TOTAL_TOKENS", "2000000")),
+        **options,
+    )
+
+SESSION_STORE = create_session_store()
 
 # --- Data Loading and Indexing ---
 
@@ -112,23 +374,32 @@ def ensure_tag_list(value: Any) -> List[str]:
         return []
     return [segment.strip() for segment in str(value).split(",") if segment.strip()]
 
-def gather_documents_for_rag() -> List[dict]:
-    """Gathers all content from DB and formats it for LangChain."""
-    docs = []
+# How each content table's rows are keyed in RAG document metadata.
+RAG_DOC_IDS = {"documents": "{}", "projects": "project:{}", "blogs": "blog:{}"}
+
+def iter_documents_for_rag(
+    documents: Optional[Iterable[dict]] = None,
+    projects: Optional[Iterable[dict]] = None,
+    blogs: Optional[Iterable[dict]] = None,
+) -> Iterator[dict]:
+    """Streams content formatted for LangChain, one document at a time.
 
+    Reads every row from the DB unless specific rows are passed in.
+    """
     # Process generic documents
-    for doc in get_all_documents():
+    for doc in iter_documents() if documents is None else documents:
         content = f"{doc.get('title', '')}\n{doc.get('content', '')}"
         metadata = {
             "source": "document",
             "doc_id": doc.get("doc_id", "unknown"),
             "title": doc.get("title", ""),
             "category": doc.get("category", ""),
+            "tags": ensure_tag_list(doc.get("tags")),
         }
-        docs.append({"content": content, "metadata": metadata})
+        yield {"content": content, "metadata": metadata}
 
     # Process projects
-    for project in get_all_projects():
+    for project in iter_projects() if projects is None else projects:
         content = f"""Project Type: {project.get('project_type', 'personal').title()}
 Project: {project['name']}
 Short Summary: {project.get('short_summary', '')}
@@ -139,208 +410,597 @@ Tags: {', '.join(ensure_tag_list(project.get('tags')))}"""
             "doc_id": f"project:{project['slug']}",
             "title": project["name"],
             "slug": project["slug"],
+            "tags": ensure_tag_list(project.get("tags")),
+        }
+        yield {"content": content, "metadata": metadata}
+
+    # Process blog posts (full rows in one query, no per-slug lookups)
+    for blog in iter_blogs() if blogs is None else blogs:
+        # Markdown body starts on its own line so its headings are detected when chunking.
+        content = f"""Blog Post: {blog['title']}
+Excerpt: {blog.get('excerpt', '')}
+Tags: {', '.join(ensure_tag_list(blog.get('tags')))}
+Content:
+{blog.get('content', '')}"""
+        metadata = {
+            "source": "blog",
+            "doc_id": f"blog:{blog['slug']}",
+            "title": blog["title"],
+            "slug": blog["slug"],
+            "tags": ensure_tag_list(blog.get("tags")),
         }
-        docs.append({"content": content, "metadata": metadata})
-
-    # Process blog posts
-    for blog in get_all_blogs():
-        detail = get_blog_by_slug(blog["slug"])
-        if detail:
-            content = f"""Blog Post: {detail['title']}
-Excerpt: {detail.get('excerpt', '')}
-Content: {detail.get('content', '')}
-Tags: {', '.join(ensure_tag_list(detail.get('tags')))}"""
-            metadata = {
-                "source": "blog",
-                "doc_id": f"blog:{detail['slug']}",
-                "title": detail["title"],
-                "slug": detail["slug"],
-            }
-            docs.append({"content": content, "metadata": metadata})
-
-    return docs
-
-def build_vector_store():
-    """Builds the FAISS vector store from the documents."""
-    global VECTOR_STORE
+        yield {"content": content, "metadata": metadata}
+
+def iter_chunks_for_rag() -> Iterator[dict]:
+    """Streams all content from the DB as heading-aware, token-bounded chunks with content hashes."""
+    return iter_content_hashed(chunk_documents(iter_documents_for_rag()))
+
+def create_embeddings() -> Embeddings:
+    if USE_FAKE_MODELS:
+        try:
+            from .fakes import fake_embeddings
+        except ImportError:  # pragma: no cover - fallback for direct execution
+            from fakes import fake_embeddings
+        return fake_embeddings(latency=FAKE_EMBEDDING_LATENCY)
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        http_client=HTTP_CLIENT,
+        http_async_client=ASYNC_HTTP_CLIENT,
+    )
+
+def build_vector_store(
+    force_rebuild: bool = False,
+    embeddings: Optional[Embeddings] = None,
+) -> str:
+    """Builds or incrementally refreshes the vector store (VECTOR_BACKEND) and publishes it.
+
+    Warm-starts from a disk snapshot when the corpus is unchanged; otherwise
+    only new or edited documents are embedded and upserted into a copy of the
+    live index. Builds are serialized by INDEX_LOCK; BUILD_LOCK is only taken
+    to save and publish the result, so seed syncs never wait on the embedding
+    API. Searches take neither and keep using the version they started with
+    until the new one is published.
+    """
+    with INDEX_LOCK, span("index_build") as build:
+        build["mode"] = _build_vector_store(force_rebuild, embeddings, time.perf_counter())
+        return build["mode"]
+
+def _build_vector_store(force_rebuild: bool, embeddings: Optional[Embeddings], started: float) -> str:
+    if embeddings is None:
+        embeddings = create_embeddings()
+    model_name = embedding_model_name(embeddings)
+
+    # Chunks are streamed, never held as a list: this pass keeps only their
+    # keys, and the chunks are read again below if they need embedding.
     print("Gathering documents for indexing...")
-    docs_for_rag = gather_documents_for_rag()
-    
-    if not docs_for_rag:
+    keys: List[Tuple[str, str]] = []
+    with span("gather_documents"):
+        fingerprint = corpus_fingerprint(iter_recording_keys(iter_chunks_for_rag(), keys), model_name)
+
+    if not keys:
         print("No documents found to index.")
-        with INDEX_LOCK:
-            VECTOR_STORE = None
-        return
+        LIVE_INDEX.publish(None, None, 0, time.perf_counter() - started, "empty")
+        ANSWER_CACHE.invalidate()
+        return "empty"
 
-    # Use LangChain's document format
-    from langchain_core.documents import Document
-    
-    documents = [
-        Document(page_content=d["content"], metadata=d["metadata"])
-        for d in docs_for_rag
-    ]
-    
-    print(f"Indexing {len(documents)} documents...")
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    
+    live = LIVE_INDEX.current
+    live_store = live.store if live is not None else None
+    if not force_rebuild and live_store is not None and live.fingerprint == fingerprint:
+        print("Vector store already up to date.")
+        return "unchanged"
+
+    store = None
+    revision = None
+    mode = "snapshot"
+    if not force_rebuild:
+        # Another worker process (or the previous deploy) may have built this corpus already.
+        with span("snapshot_load"):
+            loaded = load_snapshot(fingerprint, embeddings, VECTOR_BACKEND_LABEL)
+        if loaded is not None:
+            store, revision = loaded[0], loaded[1].get("revision")
+    if store is not None:
+        print(f"Loaded vector store snapshot {fingerprint[:12]} ({len(keys)} documents).")
+    else:
+        # Chunks are embedded (cache first) and added to the index one batch at a time.
+        # A seed sync may land between the two passes, so what this pass reads
+        # is fingerprinted again and that is what the snapshot records.
+        indexed_keys: List[Tuple[str, str]] = []
+        digests: List[bytes] = []
+        chunks = iter_recording_digests(iter_recording_keys(iter_chunks_for_rag(), indexed_keys), digests)
+        batches = iter_embedded_batches(chunks, embeddings, model_name)
+        if live_store is not None and not force_rebuild:
+            mode = "upsert"
+            # The published store is never mutated; the updated copy is swapped in below.
+            with span("index_upsert", documents=len(keys)):
+                store = clone_store(live_store)
+                added, replaced, removed = upsert_index_batches(store, batches)
+            print(f"Vector store updated: {added} added, {replaced} replaced, {removed} removed.")
+        else:
+            mode = "rebuild"
+            print(f"Indexing {len(keys)} documents...")
+            with span("index_construct", documents=len(keys)):
+                store = build_vector_index_batches(batches, embeddings, VECTOR_BACKEND, VECTOR_DTYPE)
+            print("Vector store built successfully.")
+        indexed = fingerprint_digests(digests, model_name)
+        if indexed != fingerprint:
+            print("Content changed while indexing; recording what was indexed.")
+            fingerprint, keys = indexed, indexed_keys
+        prune_embedding_cache(keys, model_name)
+        return share_and_publish(store, fingerprint, model_name, len(keys), started, mode)
+
+    published = LIVE_INDEX.publish(
+        store, fingerprint, len(keys), time.perf_counter() - started, mode, revision
+    )
+    print(f"Published index version {published.version} ({mode}, {published.build_seconds:.2f}s).")
+    ANSWER_CACHE.invalidate()
+    return mode
+
+def apply_index_changes(changes: ChangeSet) -> str:
+    """Re-chunk and re-embed only the rows in `changes`, then publish the patched index."""
+    with INDEX_LOCK, span("index_build") as build:
+        started = time.perf_counter()
+        live = LIVE_INDEX.current
+        if live is None or live.store is None:
+            build["mode"] = _build_vector_store(False, None, started)
+        else:
+            build["mode"] = _apply_index_changes(live, changes, started)
+        return build["mode"]
+
+def _apply_index_changes(live: IndexVersion, changes: ChangeSet, started: float) -> str:
+    with span("gather_documents"):
+        rows = {table: get_rows_by_key(table, changes.upserted(table)) for table in RAG_DOC_IDS}
+        docs = list(chunk_documents(iter_documents_for_rag(rows["documents"], rows["projects"], rows["blogs"])))
+    doc_ids = {
+        doc_id.format(key) for table, doc_id in RAG_DOC_IDS.items() for key in changes.keys(table)
+    }
+
+    embeddings = live.store.embeddings
+    model_name = embedding_model_name(embeddings)
+    annotate_content_hashes(docs)
+    with span("embed_documents", documents=len(docs)):
+        vectors = embed_documents_cached(docs, embeddings, model_name)
+    with span("index_upsert"):
+        store = clone_store(live.store)
+        added, replaced, removed = upsert_index(store, docs, vectors, doc_ids=doc_ids)
+    print(f"Vector store patched: {added} added, {replaced} replaced, {removed} removed.")
+
+    # The corpus fingerprint covers every document, so it is left unset here;
+    # the next full build recomputes it. The patch is still saved so the
+    # other worker processes can adopt it.
+    return share_and_publish(store, None, model_name, vector_count(store), started, "patch")
+
+def share_and_publish(
+    store: "VectorIndex",
+    fingerprint: Optional[str],
+    model_name: str,
+    document_count: int,
+    started: float,
+    mode: str,
+) -> str:
+    """Save `store` as a snapshot and publish it, holding BUILD_LOCK for just those two steps."""
+    with BUILD_LOCK:
+        with span("snapshot_save"):
+            store, revision = share_index(store, fingerprint, model_name, document_count)
+        published = LIVE_INDEX.publish(
+            store, fingerprint, document_count, time.perf_counter() - started, mode, revision
+        )
+    print(f"Published index version {published.version} ({mode}, {published.build_seconds:.2f}s).")
+    ANSWER_CACHE.invalidate()
+    return mode
+
+def share_index(
+    store: "VectorIndex", fingerprint: Optional[str], model_name: str, document_count: int
+) -> Tuple["VectorIndex", int]:
+    """Save `store` as the next snapshot revision; returns the copy to publish and its revision.
+
+    The copy is the snapshot loaded back memory-mapped, so this process
+    drops its private vectors and reads the same page-cache pages as every
+    other worker that maps the file.
+    """
+    manifest = save_snapshot(store, fingerprint, model_name, document_count)
+    loaded = load_latest_snapshot(store.embeddings, VECTOR_BACKEND_LABEL)
+    return (loaded[0] if loaded is not None else store), manifest["revision"]
+
+def follow_shared_index() -> bool:
+    """Publish the snapshot another worker process saved after our index; True if there was one."""
+    live = LIVE_INDEX.current
+    if live is None or live.store is None:
+        return False
+    started = time.perf_counter()
+    loaded = load_latest_snapshot(live.store.embeddings, VECTOR_BACKEND_LABEL, newer_than=live.revision)
+    if loaded is None:
+        return False
+    store, manifest = loaded
+    published = LIVE_INDEX.publish(
+        store,
+        manifest.get("fingerprint"),
+        manifest.get("document_count", vector_count(store)),
+        time.perf_counter() - started,
+        "shared",
+        manifest["revision"],
+    )
+    print(f"Published index version {published.version} (shared revision {published.revision}).")
+    ANSWER_CACHE.invalidate()
+    return True
+
+def reindex(reseed: bool = False, force_rebuild: bool = False) -> None:
+    """Background job: sync the seed files, then bring the index up to date.
+
+    Every worker process runs this when the seed files change. The first to
+    take INDEX_LOCK syncs and indexes; the rest find nothing left to sync,
+    refresh their content cache from the database and adopt the snapshot it
+    saved. A worker that has not loaded the index yet (lazy warm-up) leaves
+    it to the first chat, which builds from the synced database anyway.
+    """
     with INDEX_LOCK:
-        VECTOR_STORE = FAISS.from_documents(documents, embeddings)
-    print("Vector store built successfully.")
+        changes = initialize_database(force_reseed=reseed)
+        if not changes:
+            follow_content_changes()
+        if LIVE_INDEX.current is None and not force_rebuild:
+            return
+        if force_rebuild or LIVE_INDEX.store is None:
+            build_vector_store(force_rebuild=force_rebuild)
+        elif changes:
+            apply_index_changes(changes)
+        else:
+            follow_shared_index()
+
+# Seed edits are synced on the reindex worker, so they queue behind (and
+# coalesce with) admin-triggered rebuilds.
+SEED_WATCHER = SeedWatcher(SEED_WATCH_INTERVAL, lambda: LIVE_INDEX.submit(reindex))
+
+# --- Content Response Cache ---
+
+# Seed state (as recorded by the last sync) that CONTENT_CACHE reflects. A
+# sync applied by another worker process moves the recorded state without
+# handing this one a ChangeSet, which is how follow_content_changes notices.
+_content_seed_state: Dict[str, float] = {}
+
+def build_content_responses() -> dict:
+    """Every listing/detail payload, keyed for CONTENT_CACHE."""
+    global _content_seed_state
+    _content_seed_state = load_previous_state()
+    responses = {
+        "projects": [ProjectOut(**project).model_dump() for project in get_all_projects()],
+        "blogs": [BlogSummary(**blog).model_dump() for blog in get_all_blogs()],
+    }
+    for blog in iter_blogs():
+        responses[f"blog:{blog['slug']}"] = BlogDetail(**blog).model_dump()
+    return responses
+
+def refresh_content_responses(changes: ChangeSet) -> None:
+    """Re-serialize only the payloads a seed sync touched."""
+    global _content_seed_state
+    _content_seed_state = load_previous_state()
+    entries = {}
+    if changes.keys("projects"):
+        entries["projects"] = [ProjectOut(**project).model_dump() for project in get_all_projects()]
+    if changes.keys("blogs"):
+        entries["blogs"] = [BlogSummary(**blog).model_dump() for blog in get_all_blogs()]
+        for slug in changes.deleted.get("blogs", []):
+            entries[f"blog:{slug}"] = None
+        for blog in get_rows_by_key("blogs", changes.upserted("blogs")):
+            entries[f"blog:{blog['slug']}"] = BlogDetail(**blog).model_dump()
+    if entries:
+        CONTENT_CACHE.update(entries)
+
+def follow_content_changes() -> None:
+    """Rebuild CONTENT_CACHE if another worker process synced the seed files since it was built."""
+    if load_previous_state() != _content_seed_state:
+        print("Seed data synced by another worker; refreshing content responses.")
+        CONTENT_CACHE.rebuild()
+
+# Listing and blog responses are serialized (and compressed) once, then served
+# from memory; a seed sync swaps in fresh copies of just the changed payloads.
+CONTENT_CACHE = ResponseCache(build_content_responses)
+add_content_listener(refresh_content_responses)
+
+# --- Paged Listings ---
+# Filtered or paged listings are read straight from SQLite, one keyset page
+# at a time. The cursor is the last row's listing key, so it stays valid
+# while content changes and every page is a single index seek.
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str], types: Tuple[type, ...]) -> Optional[Tuple[Any, ...]]:
+    """The listing key inside `cursor`; a 400 if it is not one `encode_cursor` made for this listing."""
+    if cursor is None:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        key = None
+    if (
+        not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(type(value) is expected for value, expected in zip(key, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return tuple(key)
+
+def listing_page(rows: List[Dict[str, Any]], page_size: int, key, model: type) -> Response:
+    """Serialize one page; `rows` holds one extra row when another page follows."""
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        headers["X-Next-Cursor"] = encode_cursor(key(rows[-1]))
+    body = serialize_json([model(**row).model_dump() for row in rows])
+    return Response(body, media_type="application/json", headers=headers)
 
 # --- Agent Tools ---
+# Plain functions here; agent_graph turns them into LangChain tools (name,
+# docstring and signature become the tool schema) when the graph is built.
 
-def is_request_off_topic(message: str) -> bool:
-    """A simple guardrail to filter out-of-scope requests."""
-    message_lower = message.lower()
-    
-    # Keywords that suggest coding, general knowledge, or meta-instructions
-    forbidden_keywords = [
-        "write code", "fastapi", "python code", "javascript", "react",
-        "what is the capital of", "who is the president of",
-        "ignore your instructions", "you are now", "act as"
-    ]
-    
-    if any(keyword in message_lower for keyword in forbidden_keywords):
-        return True
-        
-    # Simple check for code-like structures
-    if "def " in message_lower or "import " in message_lower or "=> {" in message:
-        return True
-        
-    return False
-  
-@tool
-def retrieve_portfolio_context(query: str) -> str:
+async def retrieve_portfolio_context(
+    query: str,
+    source: Optional[Literal["project", "blog", "document"]] = None,
+) -> str:
     """
     Searches and retrieves relevant information about projects, blog posts,
     and other portfolio content. Use this to answer questions about skills,
-    experience, and specific work.
+    experience, and specific work. Set `source` to search only projects,
+    only blog posts, or only the general documents (bio, experience, skills).
     """
-    with INDEX_LOCK:
-        if VECTOR_STORE is None:
-            return "The document index is not available."
-    
-    retriever = VECTOR_STORE.as_retriever(search_kwargs={"k": 3})
-    results = retriever.invoke(query)
-    
+    store = LIVE_INDEX.store
+
+    with span("tool", tool="retrieve_portfolio_context"):
+        results = await ahybrid_search(store, query, source, CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_PASSAGES)
     if not results:
+        if store is None:
+            return "The document index is not available."
         return "No relevant information found."
-        
-    return "\n---\n".join([doc.page_content for doc in results])
 
-@tool
-def navigate_to_section(section: Literal["projects", "blogs", "home"]) -> str:
+    return PASSAGE_SEPARATOR.join(results)
+
+async def navigate_to_section(section: Literal["projects", "blogs", "home"]) -> str:
     """
     Use this tool to navigate the user to a specific section of the portfolio website,
     such as 'projects' or 'blogs'.
     """
-    return f"Successfully initiated navigation to the {section} page."
+    with span("tool", tool="navigate_to_section"):
+        return f"Successfully initiated navigation to the {section} page."
 
 
 # --- Agent Graph Definition ---
 
-# Initialize the LLM and bind the tools
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-tools = [retrieve_portfolio_context, navigate_to_section]
-llm_with_tools = llm.bind_tools(tools)
+def create_chat_model():
+    if USE_FAKE_MODELS:
+        try:
+            from .fakes import FakeChatModel
+        except ImportError:  # pragma: no cover - fallback for direct execution
+            from fakes import FakeChatModel
+        return FakeChatModel(latency=FAKE_LLM_LATENCY)
+    from langchain_openai import ChatOpenAI
 
-# 1. Agent Node: The brain of the operation, decides what to do.
-def agent_node(state: AgentState) -> dict:
-    """Invokes the LLM to determine the next action."""
-    response = llm_with_tools.invoke(state["messages"])
-    
-    print("Response: ", response)
-    print(f"Tool Calls: {response.tool_calls}")
-    
-    # Check if a navigation tool was called and extract the payload
-    navigation_payload = None
-    if response.tool_calls:
-        for tool_call in response.tool_calls:
-            if tool_call["name"] == "navigate_to_section":
-                navigation_payload = tool_call["args"].get("section")
-                break  # Stop after finding the first navigation call
-    else:
-        # Fallback: infer navigation intent from the assistant's text when the tool was not called
-        text = response.content.lower()
-        if "projects page" in text or "projects section" in text or "view all the projects" in text:
-            navigation_payload = "projects"
-        elif "blog page" in text or "blogs page" in text or "blogs section" in text:
-            navigation_payload = "blogs"
-        elif "home page" in text or "homepage" in text:
-            navigation_payload = "home"
-
-    return {"messages": [response], "navigation_payload": navigation_payload}
-
-# 2. Tool Node: Executes the tools chosen by the agent.
-tool_node = ToolNode(tools)
-
-# 3. Edge Logic: Decides whether to end the graph or continue.
-def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
-    """Determines the next step based on the last message."""
-    last_message = state["messages"][-1]
-    if last_message.tool_calls:
-        return "tools"
-    return "__end__"
-
-# --- Build the Graph ---
-def build_graph():
-    graph_builder = StateGraph(AgentState)
-
-    graph_builder.add_node("agent", agent_node)
-    graph_builder.add_node("tools", tool_node)
-
-    graph_builder.set_entry_point("agent")
-
-    graph_builder.add_conditional_edges(
-        "agent",
-        should_continue,
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+        http_client=HTTP_CLIENT,
+        http_async_client=ASYNC_HTTP_CLIENT,
     )
-    graph_builder.add_edge("tools", "agent")
 
-    return graph_builder.compile()
+AGENT_TOOLS = [retrieve_portfolio_context, navigate_to_section]
 
 # --- Global Agent Instance ---
-portfolio_agent = build_graph()
+# Built on first use (or by the startup warm-up), so importing this module
+# and serving the listing endpoints never pays for LangGraph or the OpenAI client.
+_portfolio_agent = None
+AGENT_LOCK = Lock()
+
+async def prefetch_tool_queries(tool_calls: List[dict]) -> ContextManager[None]:
+    """Embed the queries of a turn's retrieval calls in one batch before they run concurrently."""
+    queries = [
+        call["args"]["query"]
+        for call in tool_calls
+        if call["name"] == "retrieve_portfolio_context"
+        and call["args"].get("query")
+        and prefetched_vector(call["args"]["query"]) is None
+    ]
+    if len(queries) < 2:
+        return nullcontext()
+    return use_prefetch(await aprefetch_queries(LIVE_INDEX.store, queries))
+
+def agent_run_config() -> dict:
+    """Per-run LangGraph config carrying the run's deadline (see agent_graph)."""
+    deadline = time.monotonic() + AGENT_TIMEOUT_SECONDS if AGENT_TIMEOUT_SECONDS > 0 else None
+    # An iteration is an agent step plus a tools step; the recursion limit only backs up the cap.
+    return {"configurable": {"deadline": deadline}, "recursion_limit": 2 * AGENT_MAX_ITERATIONS + 2}
+
+def is_degraded(messages: Sequence[BaseMessage]) -> bool:
+    """Whether the run ended on a fallback answer (deadline or iteration cap) rather than the model's."""
+    return bool(messages) and bool(getattr(messages[-1], "response_metadata", {}).get("degraded"))
+
+def get_portfolio_agent():
+    global _portfolio_agent
+    if _portfolio_agent is None:
+        with AGENT_LOCK:
+            if _portfolio_agent is None:
+                with span("agent_build"):
+                    try:
+                        from .agent_graph import build_graph
+                    except ImportError:  # pragma: no cover - fallback for direct execution
+                        from agent_graph import build_graph
+                    _portfolio_agent = build_graph(
+                        create_chat_model(), AGENT_TOOLS, AGENT_MAX_ITERATIONS, prefetch_tool_queries
+                    )
+    return _portfolio_agent
+
+def prepare_chat() -> None:
+    """Everything a chat needs: the index, the agent graph and the intent classifier."""
+    if LIVE_INDEX.current is None:
+        build_vector_store()
+    get_portfolio_agent()
+    INTENT_ROUTER.warm_up()
+
+async def ensure_chat_ready():
+    """Return the agent, waiting for a startup warm-up (or doing it) if it has not finished."""
+    if _portfolio_agent is None or LIVE_INDEX.current is None:
+        await asyncio.to_thread(prepare_chat)
+    return _portfolio_agent
+
+async def ensure_router_ready() -> None:
+    """Train the intent classifier off the event loop; local replies need nothing else."""
+    if not INTENT_ROUTER.trained:
+        await asyncio.to_thread(INTENT_ROUTER.warm_up)
 
 
 # --- FastAPI Endpoints ---
 
 @app.on_event("startup")
-def on_startup():
-    """Initialize the database and build the vector store when the app starts."""
-    initialize_database()
-    build_vector_store()
+async def on_startup():
+    """Sync the database, then build the index and agent as STARTUP_WARMUP says.
+
+    The listing endpoints only need the database, so with the default
+    `background` the port opens right away and the first chat waits for
+    whatever part of the warm-up is still running. Both run in a thread:
+    the seed sync can wait on another worker's BUILD_LOCK, and the event
+    loop must not block on it.
+    """
+    await asyncio.to_thread(initialize_database)
+    if STARTUP_WARMUP == "eager":
+        await asyncio.to_thread(prepare_chat)
+    elif STARTUP_WARMUP == "background":
+        LIVE_INDEX.submit(prepare_chat)
+    SEED_WATCHER.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop the seed watcher, then close the pooled HTTP clients, session store and database connections."""
+    SEED_WATCHER.stop()
+    await ASYNC_HTTP_CLIENT.aclose()
+    HTTP_CLIENT.close()
+    SESSION_STORE.close()
+    close_connections()
 
 @app.get("/api/projects", response_model=List[ProjectOut])
-async def list_projects() -> list:
-    return [ProjectOut(**project) for project in get_all_projects()]
+async def list_projects(
+    request: Request,
+    tag: Optional[str] = None,
+    project_type: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=LISTING_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+) -> Response:
+    """Every project, or one page of them when any parameter is given.
+
+    A page holds `limit` projects (LISTING_PAGE_SIZE by default). When more
+    follow, its `X-Next-Cursor` header is passed back as `cursor`, with the
+    same filters, for the next page.
+    """
+    if tag is None and project_type is None and limit is None and cursor is None:
+        return CONTENT_CACHE.respond(request, "projects")
+    after = decode_cursor(cursor, (int, str, str))
+    page_size = limit or LISTING_PAGE_SIZE
+    rows = await asyncio.to_thread(list_projects_page, page_size + 1, after, tag, project_type)
+    return listing_page(rows, page_size, project_listing_key, ProjectOut)
 
 @app.get("/api/blogs", response_model=List[BlogSummary])
-async def list_blogs() -> list:
-    return [BlogSummary(**blog) for blog in get_all_blogs()]
+async def list_blogs(
+    request: Request,
+    tag: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=LISTING_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+) -> Response:
+    """Every blog summary, or one page of them when any parameter is given (see list_projects)."""
+    if tag is None and limit is None and cursor is None:
+        return CONTENT_CACHE.respond(request, "blogs")
+    after = decode_cursor(cursor, (str, str, str))
+    page_size = limit or LISTING_PAGE_SIZE
+    rows = await asyncio.to_thread(list_blogs_page, page_size + 1, after, tag)
+    return listing_page(rows, page_size, blog_listing_key, BlogSummary)
 
 @app.get("/api/blogs/{slug}", response_model=BlogDetail)
-async def get_blog(slug: str) -> dict:
-    blog = get_blog_by_slug(slug)
-    if not blog:
+async def get_blog(slug: str, request: Request) -> Response:
+    response = CONTENT_CACHE.respond(request, f"blog:{slug}")
+    if response is None:
         raise HTTPException(status_code=404, detail="Blog not found.")
-    return BlogDetail(**blog)
+    return response
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat_endpoint(payload: ChatRequest):
-    message = payload.message.strip()
-    if not message:
-        raise HTTPException(status_code=400, detail="Message must not be empty.")
+# --- Metrics ---
 
-    # --- GUARDRAIL CHECK ---
-    if is_request_off_topic(message):
-        return ChatResponse(
-            response="I can only answer questions about this portfolio. Please ask me about projects, skills, or blog posts.",
-            action=None
-        )
+def collect_app_metrics():
+    """Cache, session and index sizes, read at scrape time."""
+    answers = ANSWER_CACHE.stats()
+    yield "portfolio_answer_cache_lookups_total", "counter", "Answer cache lookups by result.", [
+        ({"result": "exact_hit"}, answers["exact_hits"]),
+        ({"result": "semantic_hit"}, answers["semantic_hits"]),
+        ({"result": "miss"}, answers["misses"]),
+    ]
+    yield "portfolio_answer_cache_entries", "gauge", "Cached chat answers.", [({}, answers["entries"])]
+    sessions = SESSION_STORE.stats()
+    yield "portfolio_sessions", "gauge", "Live conversation sessions.", [({}, sessions["sessions"])]
+    yield "portfolio_session_compactions_total", "counter", "Session history compactions.", [
+        ({}, sessions["compactions"])
+    ]
+    flights = CHAT_FLIGHTS.stats()
+    yield "portfolio_chat_requests_coalesced_total", "counter", (
+        "Fresh-conversation chat requests by role: leaders ran the agent, followers joined an in-flight run."
+    ), [({"role": "leader"}, flights["leaders"]), ({"role": "follower"}, flights["followers"])]
+    yield "portfolio_chat_runs_abandoned_total", "counter", "Shared runs cancelled after every waiter left.", [
+        ({}, flights["abandoned"])
+    ]
+    yield "portfolio_chat_runs_in_flight", "gauge", "Shared chat runs currently executing.", [
+        ({}, flights["in_flight"])
+    ]
+    index = LIVE_INDEX.status()
+    admission = CHAT_ADMISSION.stats()
+    yield "portfolio_chat_active", "gauge", "Chat requests holding a run slot.", [({}, admission["active"])]
+    yield "portfolio_chat_queue_depth", "gauge", "Chat requests waiting for a run slot.", [({}, admission["queued"])]
+    yield "portfolio_chat_admitted_total", "counter", "Chat requests admitted to a run slot.", [
+        ({}, admission["admitted"])
+    ]
+    yield "portfolio_chat_rejected_total", "counter", "Chat requests turned away, by reason.", [
+        ({"reason": reason}, count) for reason, count in admission["rejected"].items()
+    ]
+    yield "portfolio_index_vectors", "gauge", "Vectors in the live index.", [({}, index["vector_count"])]
+    yield "portfolio_index_version", "gauge", "Version number of the published index.", [({}, index["version"])]
+    yield "portfolio_index_build_seconds", "gauge", "Build time of the published index.", [
+        ({}, index["build_seconds"] or 0.0)
+    ]
+    yield "portfolio_index_rebuilding", "gauge", "1 while a background rebuild is running.", [
+        ({}, 1 if index["state"] == "building" else 0)
+    ]
+
+REGISTRY.add_collector(collect_app_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text exposition of the counters and histograms in metrics.py."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
 
-    # --- HARDENED SYSTEM PROMPT ---
-    system_prompt = """You are a specialized portfolio assistant. Your ONLY function is to answer questions about the portfolio owner's professional life, including their projects, skills, and blog posts, using ONLY the information provided by the tools available to you.
+# --- Admin ---
+
+class ReindexRequest(BaseModel):
+    reseed: bool = False
+    force_rebuild: bool = False
+
+def require_admin(request: Request) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token.", headers={"WWW-Authenticate": "Bearer"})
+
+@app.post("/api/admin/reindex", status_code=202, include_in_schema=False)
+async def admin_reindex(request: Request, options: Optional[ReindexRequest] = None) -> dict:
+    """Rebuild the index in the background; searches keep using the current version meanwhile."""
+    require_admin(request)
+    options = options or ReindexRequest()
+    started = LIVE_INDEX.submit(reindex, options.reseed, options.force_rebuild)
+    return {"accepted": "started" if started else "queued", **LIVE_INDEX.status()}
+
+@app.get("/api/admin/index", include_in_schema=False)
+async def admin_index_status(request: Request) -> dict:
+    require_admin(request)
+    return LIVE_INDEX.status()
+
+OFF_TOPIC_RESPONSE = "I can only answer questions about this portfolio. Please ask me about projects, skills, or blog posts."
+
+# --- HARDENED SYSTEM PROMPT ---
+SYSTEM_PROMPT = """You are a specialized portfolio assistant. Your ONLY function is to answer questions about the portfolio owner's professional life, including their projects, skills, and blog posts, using ONLY the information provided by the tools available to you.
 
 **--- YOUR DIRECTIVES ---**
 1.  **Identity:** You are a portfolio assistant, not a general AI.
@@ -356,15 +1016,106 @@ async def chat_endpoint(payload: ChatRequest):
 
 If a user asks for a forbidden action, you must politely decline and restate your purpose as a portfolio assistant."""
 
-    initial_state = {
+def client_address(request: Request) -> str:
+    if CLIENT_IP_HEADER:
+        forwarded = request.headers.get(CLIENT_IP_HEADER, "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+BUSY_DETAIL = "The assistant is busy right now. Please try again shortly."
+
+async def admit_chat(request: Request) -> Ticket:
+    """Take a chat run slot for the caller, or fail fast with 429/503 and Retry-After."""
+    try:
+        return await CHAT_ADMISSION.admit(client_address(request))
+    except Rejected as exc:
+        raise rejection_error(exc) from None
+
+def charge_chat(request: Request, cost: int) -> None:
+    """Spend `cost` of the caller's rate-limit tokens, or fail with 429 and Retry-After."""
+    try:
+        CHAT_ADMISSION.charge(client_address(request), cost)
+    except Rejected as exc:
+        raise rejection_error(exc) from None
+
+def rejection_error(exc: Rejected) -> HTTPException:
+    annotate(rejected=exc.reason)
+    if exc.status_code == 429:
+        detail = "Too many chat requests. Please wait a moment and try again."
+    else:
+        detail = BUSY_DETAIL
+    return HTTPException(status_code=exc.status_code, detail=detail, headers=exc.headers)
+
+def validate_chat_message(payload: ChatRequest) -> str:
+    message = payload.message.strip()
+    if not message:
+        raise HTTPException(status_code=400, detail="Message must not be empty.")
+    return message
+
+def local_response(message: str) -> Optional[ChatResponse]:
+    """Answer navigation and off-topic messages without calling the LLM."""
+    with span("guardrail") as check:
+        intent = INTENT_ROUTER.route(message)
+        check["intent"] = intent.kind
+    if intent.kind == "off_topic":
+        return ChatResponse(response=OFF_TOPIC_RESPONSE, action=None)
+    if intent.kind == "navigate":
+        return ChatResponse(
+            response=NAVIGATION_REPLIES[intent.section],
+            action=Action(type="NAVIGATE", payload=intent.section),
+        )
+    return None
+
+def build_initial_state(message: str, session: Optional[Session] = None) -> dict:
+    return {
         "messages": [
-            HumanMessage(content=system_prompt),
+            HumanMessage(content=SYSTEM_PROMPT),
+            *history_messages(session),
             HumanMessage(content=message),
         ],
     }
 
-    # Invoke the agent
-    final_state = portfolio_agent.invoke(initial_state)
+def open_session(payload: ChatRequest) -> Tuple[str, Optional[Session]]:
+    """Resolve the conversation id; unknown or expired ids start a fresh session."""
+    if payload.conversation_id:
+        return payload.conversation_id, SESSION_STORE.get(payload.conversation_id)
+    return new_conversation_id(), None
+
+def remember_turn(
+    conversation_id: str,
+    message: str,
+    response: ChatResponse,
+    messages: Sequence[BaseMessage] = (),
+) -> ChatResponse:
+    """Append the exchange to the session and tag the response with its id."""
+    SESSION_STORE.append_turn(conversation_id, build_turn(message, response.response, messages))
+    return response.model_copy(update={"conversation_id": conversation_id})
+
+async def lookup_cached_answer(message: str) -> Tuple[Optional[ChatResponse], Optional[List[float]], int]:
+    """Check the answer cache; returns (hit, query vector for storing, cache generation)."""
+    generation = ANSWER_CACHE.generation
+    cached = ANSWER_CACHE.lookup(message)
+    if cached is not None:
+        return cached, None, generation
+
+    vector = prefetched_vector(message)
+    store = LIVE_INDEX.store
+    if vector is None and store is not None and ANSWER_CACHE.semantic_enabled:
+        try:
+            vector = await store.embeddings.aembed_query(message)
+        except Exception as exc:
+            print(f"Answer cache embedding failed: {exc}")
+    return ANSWER_CACHE.lookup_similar(vector), vector, generation
+
+async def run_agent(
+    message: str, session: Optional[Session] = None
+) -> Tuple[ChatResponse, Sequence[BaseMessage]]:
+    """Run the agent graph; returns the response and the messages the run added."""
+    annotate(path="agent")
+    agent = await ensure_chat_ready()
+    initial_state = build_initial_state(message, session)
+    final_state = await agent.ainvoke(initial_state, agent_run_config())
     
     final_ai_message = next(
         (m for m in reversed(final_state["messages"]) if isinstance(m, AIMessage)), None
@@ -375,7 +1126,192 @@ If a user asks for a forbidden action, you must politely decline and restate you
     if final_state.get("navigation_payload"):
         action = Action(type="NAVIGATE", payload=final_state["navigation_payload"])
 
-    return ChatResponse(response=response_text, action=action)
+    response = ChatResponse(response=response_text, action=action)
+    return response, final_state["messages"][len(initial_state["messages"]):]
+
+async def answer_message(message: str) -> Tuple[ChatResponse, Sequence[BaseMessage]]:
+    """Answer a history-free message from the answer cache or the agent."""
+    cached, vector, generation = await lookup_cached_answer(message)
+    if cached is not None:
+        annotate(path="cache")
+        return cached, ()
+    response, new_messages = await run_agent(message)
+    # A cut-short run is answered but not cached, so the next asker gets a full answer.
+    if not is_degraded(new_messages):
+        ANSWER_CACHE.store(message, response, vector, generation)
+    return response, new_messages
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat_endpoint(payload: ChatRequest, request: Request):
+    message = validate_chat_message(payload)
+    conversation_id, session = open_session(payload)
+
+    with start_trace("chat", TRACE_SAMPLE_RATE), await admit_chat(request):
+        annotate(conversation_id=conversation_id)
+        # --- GUARDRAIL CHECK / LOCAL FAST PATH ---
+        # Answered before waiting for the index or the agent, which it does not need.
+        await ensure_router_ready()
+        local = local_response(message)
+        if local is not None:
+            annotate(path="local")
+            if local.action is None:
+                # Rejected messages are kept out of the history sent to the model.
+                return local.model_copy(update={"conversation_id": conversation_id})
+            return remember_turn(conversation_id, message, local)
+
+        await ensure_chat_ready()
+
+        # Cached answers were produced without history, so only a fresh
+        # conversation may use (or populate) the answer cache or join an
+        # identical in-flight request.
+        if session is None or session.is_empty:
+            response, new_messages = await CHAT_FLIGHTS.run(
+                normalize_message(message), lambda: answer_message(message)
+            )
+        else:
+            response, new_messages = await run_agent(message, session)
+        return remember_turn(conversation_id, message, response, new_messages)
+
+@app.post("/api/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch_endpoint(payload: ChatBatchRequest, request: Request):
+    """Answer independent, history-free messages; results come back in request order.
+
+    Messages the guardrail or the exact-match cache can answer skip the
+    model. The rest are embedded in one call and searched together, so
+    their semantic cache lookups and (when the agent retrieves with the
+    question as asked) their retrievals need no further embedding calls.
+    Duplicates share one run, and at most CHAT_BATCH_CONCURRENCY agent runs
+    are in flight. The batch spends one rate-limit token per message up
+    front, and each agent run takes its own admission slot, so a batch
+    never runs more agents than single chats could. A failing or shed
+    message only fails its own item.
+    """
+    if not payload.messages:
+        raise HTTPException(status_code=400, detail="Provide at least one message.")
+    if len(payload.messages) > CHAT_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {CHAT_BATCH_LIMIT} messages per batch.")
+
+    with start_trace("chat_batch", TRACE_SAMPLE_RATE):
+        charge_chat(request, len(payload.messages))
+        annotate(messages=len(payload.messages))
+        await ensure_router_ready()
+        results = [ChatBatchItem(index=index) for index in range(len(payload.messages))]
+        pending: Dict[str, Tuple[str, List[int]]] = {}  # normalized message -> (message, item indexes)
+        for item, raw in zip(results, payload.messages):
+            message = raw.strip()
+            if not message:
+                item.error = "Message must not be empty."
+                continue
+            local = local_response(message)
+            if local is None:
+                local = ANSWER_CACHE.lookup(message)
+            if local is not None:
+                item.response = local
+                continue
+            pending.setdefault(normalize_message(message), (message, []))[1].append(item.index)
+        annotate(agent_messages=len(pending))
+
+        if pending:
+            await ensure_chat_ready()
+            prefetch = await aprefetch_queries(LIVE_INDEX.store, [message for message, _ in pending.values()])
+            limit = asyncio.Semaphore(max(1, CHAT_BATCH_CONCURRENCY))
+
+            async def answer(key: str, message: str) -> ChatResponse:
+                async with limit:
+                    with await CHAT_ADMISSION.acquire():
+                        response, _ = await CHAT_FLIGHTS.run(key, lambda: answer_message(message))
+                        return response
+
+            with use_prefetch(prefetch):
+                outcomes = await asyncio.gather(
+                    *(answer(key, message) for key, (message, _) in pending.items()),
+                    return_exceptions=True,
+                )
+            for (message, indexes), outcome in zip(pending.values(), outcomes):
+                error = None
+                if isinstance(outcome, Rejected):
+                    annotate(rejected=outcome.reason)
+                    error = BUSY_DETAIL
+                elif isinstance(outcome, BaseException):
+                    print(f"Batch chat failed for {message[:60]!r}: {outcome}")
+                    error = "The assistant failed to respond."
+                for index in indexes:
+                    if error is not None:
+                        results[index].error = error
+                    else:
+                        results[index].response = outcome
+        return ChatBatchResponse(results=results)
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(payload: ChatRequest, request: Request):
+    """Server-sent events: `token`, `tool_start`, `tool_end`, `action`, then `done` (or `error`)."""
+    message = validate_chat_message(payload)
+    conversation_id, session = open_session(payload)
+    # Admitted before the 200 goes out, so an overloaded server can still refuse.
+    ticket = await admit_chat(request)
+
+    async def event_stream():
+        with ticket, start_trace("chat_stream", TRACE_SAMPLE_RATE):
+            annotate(conversation_id=conversation_id)
+            await ensure_router_ready()
+            local = local_response(message)
+            if local is not None:
+                annotate(path="local")
+                if local.action is None:
+                    local = local.model_copy(update={"conversation_id": conversation_id})
+                else:
+                    local = remember_turn(conversation_id, message, local)
+                    yield format_sse("action", local.action.model_dump())
+                yield format_sse("done", local.model_dump())
+                return
+
+            agent = await ensure_chat_ready()
+            use_cache = session is None or session.is_empty
+            vector, generation = None, ANSWER_CACHE.generation
+            if use_cache:
+                cached, vector, generation = await lookup_cached_answer(message)
+                if cached is not None:
+                    annotate(path="cache")
+                    cached = remember_turn(conversation_id, message, cached)
+                    if cached.action is not None:
+                        yield format_sse("action", cached.action.model_dump())
+                    yield format_sse("done", cached.model_dump())
+                    return
+
+            annotate(path="agent")
+            events = iter_agent_events(agent, build_initial_state(message, session), agent_run_config())
+            try:
+                async for name, data in events:
+                    if await request.is_disconnected():
+                        print("Chat stream client disconnected; cancelling generation.")
+                        return
+                    if name != "final":
+                        yield format_sse(name, data)
+                        continue
+                    action = None
+                    if data["navigation_payload"]:
+                        action = Action(type="NAVIGATE", payload=data["navigation_payload"])
+                    response = ChatResponse(
+                        response=data["response"] or "I'm not sure how to respond to that.",
+                        action=action,
+                    )
+                    if use_cache and not is_degraded(data["messages"]):
+                        ANSWER_CACHE.store(message, response, vector, generation)
+                    response = remember_turn(conversation_id, message, response, data["messages"])
+                    yield format_sse("done", response.model_dump())
+            except Exception as exc:
+                print(f"Chat stream failed: {exc}")
+                yield format_sse("error", {"detail": "The assistant failed to respond."})
+            finally:
+                await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the slot when the client left before the stream began.
+        background=BackgroundTask(ticket.release),
+    )
 
 
 # To run the app locally: uvicorn main:app --reload
@@ -0,0 +1,308 @@
+"""Dependency-free Prometheus metrics, timing spans and sampled request traces.
+
+`span("stage")` times a block into `portfolio_stage_duration_seconds` and,
+when the current request was sampled by `start_trace()`, also records it in
+that request's trace, which is printed as one JSON line when the request
+finishes. `REGISTRY.render()` produces the Prometheus text format served at
+`/metrics`.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+# -------------------- Metric Types -------------------- #
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(f"{self.name}_total", dict(key), value) for key, value in self._values.items()]
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip((*self.buckets, math.inf), counts):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+                samples.append((f"{self.name}_sum", labels, total[0]))
+                samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+# Collectors return (name, type, documentation, [(labels, value), ...]) for
+# values owned elsewhere, e.g. cache sizes read at scrape time.
+Collector = Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        metric = Counter(name, documentation)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels.items())} {_format_value(value)}")
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "portfolio_stage_duration_seconds", "Time spent in each pipeline stage."
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    "portfolio_http_requests", "HTTP requests by route, method and status."
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "portfolio_http_request_duration_seconds", "HTTP request latency until the last body byte."
+)
+LLM_TOKENS = REGISTRY.counter(
+    "portfolio_llm_tokens", "LLM tokens consumed, by kind (input/output)."
+)
+LLM_TOKENS_PER_CALL = REGISTRY.histogram(
+    "portfolio_llm_tokens_per_call", "LLM tokens per call, by kind.", TOKEN_BUCKETS
+)
+AGENT_DEGRADED = REGISTRY.counter(
+    "portfolio_agent_degraded", "Agent runs cut short, by limit hit (deadline/iterations)."
+)
+
+
+def record_token_usage(usage: Optional[Dict[str, Any]]) -> None:
+    """Count `usage_metadata` from an AIMessage; models that report none are skipped."""
+    if not usage:
+        return
+    for kind in ("input", "output"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens is not None:
+            LLM_TOKENS.inc(tokens, kind=kind)
+            LLM_TOKENS_PER_CALL.observe(tokens, kind=kind)
+    annotate_add("input_tokens", usage.get("input_tokens", 0))
+    annotate_add("output_tokens", usage.get("output_tokens", 0))
+
+
+# -------------------- Spans & Traces -------------------- #
+
+@dataclass
+class Trace:
+    name: str
+    started: float = field(default_factory=time.perf_counter)
+    spans: List[Dict[str, Any]] = field(default_factory=list)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("portfolio_trace", default=None)
+
+
+@contextmanager
+def start_trace(name: str, sample_rate: float) -> Iterator[Optional[Trace]]:
+    """Trace the enclosed request with probability `sample_rate`."""
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        yield None
+        return
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        print("trace " + json.dumps(
+            {
+                "name": trace.name,
+                "duration_ms": round((time.perf_counter() - trace.started) * 1000, 3),
+                **trace.attributes,
+                "spans": trace.spans,
+            },
+            default=str,
+        ))
+
+
+def annotate(**attributes: Any) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+
+def annotate_add(name: str, amount: float) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attributes[name] = trace.attributes.get(name, 0) + amount
+
+
+def observe_stage(stage: str, seconds: float, extra: Optional[Dict[str, Any]] = None, **labels: Any) -> None:
+    """Record an already-measured stage duration (see `span`)."""
+    STAGE_SECONDS.observe(seconds, stage=stage, **labels)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.spans.append(
+            {
+                "stage": stage,
+                **labels,
+                "start_ms": round((time.perf_counter() - seconds - trace.started) * 1000, 3),
+                "duration_ms": round(seconds * 1000, 3),
+                **(extra or {}),
+            }
+        )
+
+
+@contextmanager
+def span(stage: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+    """Time a block; yields a dict whose entries are added to the trace span."""
+    extra: Dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        observe_stage(stage, time.perf_counter() - started, extra, **labels)
+
+
+# -------------------- ASGI Middleware -------------------- #
+
+class MetricsMiddleware:
+    """Counts requests and times them until the last body chunk is sent.
+
+    Routes are labelled by their path template (`/api/blogs/{slug}`), so
+    label cardinality stays bounded.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._route_paths: Optional[Dict[Any, str]] = None
+
+    def _route_path(self, scope: Dict[str, Any]) -> str:
+        if self._route_paths is None:
+            router = scope.get("router")
+            if router is None:
+                return "unmatched"
+            self._route_paths = {
+                getattr(route, "endpoint", None): route.path
+                for route in router.routes
+                if hasattr(route, "path")
+            }
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = self._route_path(scope)
+            HTTP_REQUESTS.inc(route=route, method=scope["method"], status=status)
+            HTTP_SECONDS.observe(time.perf_counter() - started, route=route)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
@@ -0,0 +1,80 @@
+"""A lock shared by every process on the host, for work only one worker should do.
+
+With `uvicorn --workers N` each worker runs the startup hooks; seeding the
+database and building the vector index are guarded by a `FileLock` so the
+first worker does the work and the others wait, then reuse its result.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive OS lock on `path`, re-entrant within a process.
+
+    Threads of one process queue on an RLock first, so only one of them holds
+    the OS lock at a time; nested `with` blocks in the owning thread only
+    bump a counter (a second `flock` on a new descriptor would deadlock).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    else:  # pragma: no cover - Windows
+                        while True:
+                            try:
+                                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                                break
+                            except OSError:
+                                continue
+                except BaseException:
+                    os.close(fd)
+                    raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:  # pragma: no cover - Windows
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response
+
+try:  # optional: brotli variants are only produced when the module is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024
+CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+# Server preference when the client accepts several encodings.
+ENCODING_PREFERENCE = ("br", "gzip")
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """One pre-serialized JSON response and its compressed variants."""
+
+    body: bytes
+    etag: str
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        # Strong validators must differ per content-coding.
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+
+def serialize_json(content: Any) -> bytes:
+    """Same byte layout as FastAPI's JSONResponse."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def build_cached_body(content: Any) -> CachedBody:
+    body = serialize_json(content)
+    encodings: Dict[str, bytes] = {}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encodings["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            encodings["br"] = brotli.compress(body, quality=11)
+    return CachedBody(
+        body=body,
+        etag=hashlib.sha256(body).hexdigest()[:32],
+        encodings=encodings,
+    )
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates
+    )
+
+
+class ResponseCache:
+    """Pre-serialized responses keyed by name, built from `builder`.
+
+    The snapshot dict is never mutated after construction; `rebuild()` and
+    `update()` build a fresh one and swap the reference, so readers always
+    see one consistent generation of content.
+    """
+
+    def __init__(self, builder: Callable[[], Dict[str, Any]]):
+        self._builder = builder
+        self._snapshot: Optional[Dict[str, CachedBody]] = None
+        self._build_lock = Lock()
+
+    def rebuild(self) -> None:
+        with self._build_lock:
+            self._snapshot = {
+                key: build_cached_body(content) for key, content in self._builder().items()
+            }
+
+    def update(self, entries: Dict[str, Optional[Any]]) -> None:
+        """Re-serialize only `entries`; a None value drops that key."""
+        with self._build_lock:
+            if self._snapshot is None:
+                return  # the first get() builds everything anyway
+            snapshot = dict(self._snapshot)
+            for key, content in entries.items():
+                if content is None:
+                    snapshot.pop(key, None)
+                else:
+                    snapshot[key] = build_cached_body(content)
+            self._snapshot = snapshot
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.rebuild()
+            snapshot = self._snapshot
+        return snapshot.get(key)
+
+    def respond(self, request: Request, key: str) -> Optional[Response]:
+        """Serve `key` with ETag/Cache-Control, 304 on a matching If-None-Match."""
+        entry = self.get(key)
+        if entry is None:
+            return None
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next(
+            (name for name in ENCODING_PREFERENCE if name in accepted and name in entry.encodings),
+            None,
+        )
+        etag = entry.etag_for(encoding)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(entry.encodings[encoding], media_type="application/json", headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+try:
+    from .context import CONTEXT_TOKEN_BUDGET, MAX_PASSAGES, Passage, assemble_context
+    from .db import search_content
+    from .metrics import span
+    from .vector_index import NumpyVectorStore
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from context import CONTEXT_TOKEN_BUDGET, MAX_PASSAGES, Passage, assemble_context
+    from db import search_content
+    from metrics import span
+    from vector_index import NumpyVectorStore
+
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain_core.documents import Document
+
+    from .indexing import VectorIndex
+
+# Candidates fetched per ranking; context assembly keeps the few that fit.
+LEXICAL_K = 8
+VECTOR_K = 16
+# FAISS filters after searching, so filtered searches fetch this many first.
+FAISS_FILTER_FETCH_K = 64
+RRF_K = 60
+
+STOPWORDS = frozenset(
+    """a about an and any are as at be by can did do does for from has have he her
+    his how i in is it its me my of on or she show tell than that the their them
+    there they this to was what when where which who why with you your""".split()
+)
+TERM_RE = re.compile(r"[\w][\w\-\.]*[\w]|[\w]")
+# CamelCase, embedded digits, inner hyphens/underscores or ACRONYMS mark an
+# identifier-like token that exact matching serves better than embeddings.
+IDENTIFIER_RE = re.compile(
+    r"[a-z][A-Z]|[A-Za-z]\d|\d[A-Za-z]|\w[-_]\w|^[A-Z]{2,}$"
+)
+KEYWORD_QUERY_MAX_TERMS = 4
+
+
+# -------------------- Query Analysis -------------------- #
+
+def query_terms(query: str) -> List[str]:
+    return [
+        term
+        for term in TERM_RE.findall(query)
+        if term.lower() not in STOPWORDS and (len(term) > 1 or term.isdigit())
+    ]
+
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 OR-query of quoted terms."""
+    terms = query_terms(query)
+    return " OR ".join('"{}"'.format(term.replace('"', "")) for term in terms)
+
+
+def is_keyword_query(query: str) -> bool:
+    """Short queries made of identifier-like names skip the embedding round trip."""
+    terms = query_terms(query)
+    if not terms or len(terms) > KEYWORD_QUERY_MAX_TERMS:
+        return False
+    return any(IDENTIFIER_RE.search(term) for term in terms)
+
+
+# -------------------- Vector Search -------------------- #
+
+class VectorHit(NamedTuple):
+    document: Document
+    # The stored vector, reused by context assembly instead of re-embedding.
+    vector: np.ndarray
+
+
+def _matches(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    return all(metadata.get(key) == value for key, value in filter.items())
+
+
+def search_vectors(
+    store: VectorIndex,
+    vectors: Sequence[Sequence[float]],
+    k: int = VECTOR_K,
+    filter: Optional[Dict[str, Any]] = None,
+) -> List[List[VectorHit]]:
+    """One search for a matrix of query vectors, returning each hit's stored vector."""
+    if isinstance(store, NumpyVectorStore):
+        return [
+            [VectorHit(store.documents[row], vector) for row, vector in zip(rows, store.row_vectors(rows))]
+            for rows, _ in store.search_rows(vectors, k, filter)
+        ]
+    import faiss
+    import numpy as np
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if store._normalize_L2:
+        faiss.normalize_L2(matrix)
+    _, indices = store.index.search(matrix, max(k, FAISS_FILTER_FETCH_K) if filter else k)
+    results = []
+    for row in indices:
+        hits: List[VectorHit] = []
+        for i in row:
+            if i == -1 or len(hits) == k:
+                continue
+            document = store.docstore.search(store.index_to_docstore_id[i])
+            if filter is None or _matches(document.metadata, filter):
+                hits.append(VectorHit(document, store.index.reconstruct(int(i))))
+        results.append(hits)
+    return results
+
+
+# -------------------- Batched Prefetch -------------------- #
+
+@dataclass(frozen=True)
+class QueryPrefetch:
+    """Query vectors and vector-search hits computed for a batch of queries at once."""
+
+    vectors: Dict[str, List[float]]
+    hits: Dict[str, List[VectorHit]]
+
+
+_prefetch: ContextVar[Optional[QueryPrefetch]] = ContextVar("retrieval_prefetch", default=None)
+
+
+@contextmanager
+def use_prefetch(prefetch: QueryPrefetch) -> Iterator[None]:
+    """Serve embeddings and vector hits for prefetched queries (in this context and tasks it starts)."""
+    token = _prefetch.set(prefetch)
+    try:
+        yield
+    finally:
+        _prefetch.reset(token)
+
+
+def prefetched_vector(query: str) -> Optional[List[float]]:
+    prefetch = _prefetch.get()
+    return prefetch.vectors.get(query) if prefetch is not None else None
+
+
+async def aprefetch_queries(store: Optional[VectorIndex], queries: Sequence[str]) -> QueryPrefetch:
+    """Embed `queries` in one batched call and run their vector searches together."""
+    queries = list(dict.fromkeys(queries))
+    if store is None or not queries:
+        return QueryPrefetch({}, {})
+    with span("embed_query") as call:
+        call["queries"] = len(queries)
+        vectors = await store.embeddings.aembed_documents(queries)
+    with span("vector_search") as call:
+        call["queries"] = len(queries)
+        hits = await asyncio.to_thread(search_vectors, store, vectors)
+    return QueryPrefetch(dict(zip(queries, vectors)), dict(zip(queries, hits)))
+
+
+# -------------------- Fusion -------------------- #
+
+def _lexical_passage(hit: Dict[str, str], relevance: float) -> Passage:
+    return Passage(
+        # The title is already on the passage's source line.
+        text=hit["snippet"],
+        doc_id=hit["doc_id"],
+        source=hit["source"],
+        title=hit["title"],
+        relevance=relevance,
+    )
+
+
+def _candidates(lexical_hits: List[Dict[str, str]], vector_hits: Sequence[VectorHit]) -> List[Passage]:
+    """Score every vector chunk and lexical snippet by reciprocal rank fusion.
+
+    A chunk earns its own vector rank plus the BM25 rank of its source
+    document; a document found only by BM25 contributes its FTS snippet.
+    """
+    lexical_rank = {hit["doc_id"]: rank for rank, hit in enumerate(lexical_hits, start=1)}
+    passages = []
+    vector_doc_ids = set()
+    for rank, hit in enumerate(vector_hits, start=1):
+        metadata = hit.document.metadata
+        doc_id = metadata.get("doc_id", "")
+        vector_doc_ids.add(doc_id)
+        relevance = 1.0 / (RRF_K + rank)
+        if doc_id in lexical_rank:
+            relevance += 1.0 / (RRF_K + lexical_rank[doc_id])
+        passages.append(
+            Passage(
+                text=hit.document.page_content,
+                doc_id=doc_id,
+                source=metadata.get("source", ""),
+                title=metadata.get("title", ""),
+                relevance=relevance,
+                vector=hit.vector,
+            )
+        )
+    for hit in lexical_hits:
+        if hit["doc_id"] not in vector_doc_ids:
+            passages.append(_lexical_passage(hit, 1.0 / (RRF_K + lexical_rank[hit["doc_id"]])))
+    return sorted(passages, key=lambda passage: passage.relevance, reverse=True)
+
+
+def _vector_filter(source: Optional[str]) -> Optional[Dict[str, str]]:
+    return {"source": source} if source else None
+
+
+async def ahybrid_search(
+    store: Optional[VectorIndex],
+    query: str,
+    source: Optional[str] = None,
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    max_passages: int = MAX_PASSAGES,
+) -> List[str]:
+    """Return attributed passages, fused from BM25 and vector search, that fit `token_budget`.
+
+    `source` ("document", "project" or "blog") restricts both rankings to
+    that kind of content. Queries prefetched by `aprefetch_queries` reuse
+    the batch's vector hits (or just its query vector when `source` filters
+    the search).
+    """
+    lexical_hits = await asyncio.to_thread(search_content, build_match_query(query), LEXICAL_K, source)
+    vector_hits: List[VectorHit] = []
+    prefetch = _prefetch.get()
+    if store is None or (lexical_hits and is_keyword_query(query)):
+        pass  # BM25 alone answers identifier lookups; skip the embedding round trip.
+    elif prefetch is not None and not source and query in prefetch.hits:
+        vector_hits = prefetch.hits[query]
+    else:
+        vector = prefetched_vector(query)
+        if vector is None:
+            with span("embed_query"):
+                vector = await store.embeddings.aembed_query(query)
+        with span("vector_search"):
+            vector_hits = (
+                await asyncio.to_thread(search_vectors, store, [vector], VECTOR_K, _vector_filter(source))
+            )[0]
+    with span("assemble_context"):
+        return assemble_context(_candidates(lexical_hits, vector_hits), token_budget, max_passages)
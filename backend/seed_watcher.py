@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from threading import Event, Thread
+from typing import Callable, Dict, Optional
+
+try:
+    from .db import get_seed_file_state, load_previous_state
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from db import get_seed_file_state, load_previous_state
+
+
+class SeedWatcher:
+    """Polls the seed files' mtimes and calls `on_change` when any of them moves.
+
+    Polling three `stat()` calls every few seconds needs no extra dependency
+    and behaves the same on every platform and filesystem. The callback only
+    triggers a sync; `initialize_database()` works out what actually changed,
+    so a burst of writes from an editor costs at most a redundant no-op sync.
+    """
+
+    def __init__(self, interval: float, on_change: Callable[[], None]):
+        self.interval = interval
+        self.on_change = on_change
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._last: Dict[str, float] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        # Start from the state the last sync recorded, so an edit made while
+        # the app was starting is still picked up.
+        self._last = load_previous_state()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="seed-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(self.interval + 1)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            state = get_seed_file_state()
+            if state == self._last:
+                continue
+            self._last = state
+            try:
+                self.on_change()
+            except Exception as exc:
+                print(f"Seed watcher callback failed: {exc}")
@@ -0,0 +1,348 @@
+"""Server-side chat sessions with a bounded history per conversation.
+
+Each session keeps a running summary plus the most recent turns. Whenever a
+session goes over its token budget, tool outputs of older turns are dropped
+first, then the oldest turns are folded into the summary, so the prompt built
+from a session never grows past `token_budget + summary_tokens`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+try:
+    from .chunking import count_tokens
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from chunking import count_tokens
+
+TOKEN_BUDGET = 2000
+SUMMARY_TOKENS = 400
+SUMMARY_ANSWER_CHARS = 240
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+SUMMARY_ENTRY_RE = re.compile(r"\n(?=- )")
+
+
+# -------------------- Turns & Sessions -------------------- #
+
+@dataclass
+class Session:
+    conversation_id: str
+    summary: str = ""
+    # Each turn: {"user", "answer", "tools": [{"id", "name", "args", "output"}], "tokens"}
+    turns: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.turns and not self.summary
+
+
+def new_conversation_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _turn_tokens(turn: Dict[str, Any]) -> int:
+    return (
+        count_tokens(turn["user"])
+        + count_tokens(turn["answer"])
+        + sum(count_tokens(call["output"]) for call in turn["tools"])
+    )
+
+
+def build_turn(user: str, answer: str, messages: Sequence[BaseMessage] = ()) -> Dict[str, Any]:
+    """Record one exchange; `messages` are those the agent added during the run."""
+    outputs = {m.tool_call_id: m.content for m in messages if isinstance(m, ToolMessage)}
+    tools = [
+        {
+            "id": call["id"],
+            "name": call["name"],
+            "args": call["args"],
+            "output": str(outputs.get(call["id"], "")),
+        }
+        for m in messages
+        if isinstance(m, AIMessage)
+        for call in m.tool_calls
+    ]
+    turn = {"user": user, "answer": answer, "tools": tools}
+    turn["tokens"] = _turn_tokens(turn)
+    return turn
+
+
+def history_messages(session: Optional[Session]) -> List[BaseMessage]:
+    """The messages to place between the system prompt and the new user message."""
+    if session is None:
+        return []
+    messages: List[BaseMessage] = []
+    if session.summary:
+        messages.append(HumanMessage(content=f"Summary of the earlier conversation:\n{session.summary}"))
+    for turn in session.turns:
+        messages.append(HumanMessage(content=turn["user"]))
+        if turn["tools"]:
+            messages.append(
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {"id": call["id"], "name": call["name"], "args": call["args"]}
+                        for call in turn["tools"]
+                    ],
+                )
+            )
+            messages.extend(
+                ToolMessage(content=call["output"], tool_call_id=call["id"])
+                for call in turn["tools"]
+            )
+        messages.append(AIMessage(content=turn["answer"]))
+    return messages
+
+
+# -------------------- Compaction -------------------- #
+
+def _clip(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= SUMMARY_ANSWER_CHARS else text[:SUMMARY_ANSWER_CHARS].rstrip() + "…"
+
+
+def summarize_turn(turn: Dict[str, Any]) -> str:
+    """Extractive summary entry; keeps compaction free of extra LLM calls."""
+    answer = SENTENCE_END_RE.split(" ".join(turn["answer"].split()), maxsplit=1)[0]
+    return f"- User asked: {_clip(turn['user'])}\n  Assistant: {_clip(answer)}"
+
+
+def _trim_summary(summary: str, max_tokens: int) -> str:
+    # Entries start with "- "; the oldest are dropped first.
+    entries = SUMMARY_ENTRY_RE.split(summary)
+    while len(entries) > 1 and count_tokens("\n".join(entries)) > max_tokens:
+        entries.pop(0)
+    return "\n".join(entries)
+
+
+def compact(
+    session: Session,
+    token_budget: int = TOKEN_BUDGET,
+    summary_tokens: int = SUMMARY_TOKENS,
+    summarize: Callable[[Dict[str, Any]], str] = summarize_turn,
+) -> Session:
+    """Bring `session` under `token_budget`, keeping at least the latest turn verbatim."""
+    def turns_tokens() -> int:
+        return sum(turn["tokens"] for turn in session.turns)
+
+    # Retrieved context is the bulkiest part of a turn and the least useful
+    # once the answer built from it is in the history.
+    for turn in session.turns[:-1]:
+        if turns_tokens() <= token_budget:
+            break
+        if turn["tools"]:
+            turn["tools"] = []
+            turn["tokens"] = _turn_tokens(turn)
+
+    folded = []
+    while len(session.turns) > 1 and turns_tokens() > token_budget:
+        folded.append(summarize(session.turns.pop(0)))
+    if folded:
+        summary = "\n".join(filter(None, [session.summary, *folded]))
+        session.summary = _trim_summary(summary, summary_tokens)
+
+    session.tokens = turns_tokens() + count_tokens(session.summary)
+    return session
+
+
+# -------------------- Stores -------------------- #
+
+class SessionStore(ABC):
+    """Interface for session backends.
+
+    Backends implement `_load`, `_save`, `_delete` and `__len__`; turn
+    appends and compaction are shared so every backend enforces the same
+    per-session budget.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600.0,
+        token_budget: int = TOKEN_BUDGET,
+        summary_tokens: int = SUMMARY_TOKENS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.compactions = 0
+        self._lock = Lock()
+
+    @abstractmethod
+    def _load(self, conversation_id: str) -> Optional[Session]:
+        ...
+
+    @abstractmethod
+    def _save(self, session: Session) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, conversation_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def _load_live(self, conversation_id: str) -> Optional[Session]:
+        session = self._load(conversation_id)
+        if session is not None and session.updated_at + self.ttl_seconds <= time.time():
+            self._delete(conversation_id)
+            return None
+        return session
+
+    def get(self, conversation_id: str) -> Optional[Session]:
+        with self._lock:
+            return self._load_live(conversation_id)
+
+    def append_turn(self, conversation_id: str, turn: Dict[str, Any]) -> Session:
+        with self._lock:
+            current = self._load_live(conversation_id)
+            # Sessions handed out by `get()` are never mutated; a new one is saved.
+            session = Session(conversation_id) if current is None else replace(
+                current, turns=[dict(t) for t in current.turns]
+            )
+            session.turns.append(turn)
+            before = len(session.turns)
+            compact(session, self.token_budget, self.summary_tokens)
+            if len(session.turns) < before:
+                self.compactions += 1
+            session.updated_at = time.time()
+            self._save(session)
+            return session
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._delete(conversation_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self), "compactions": self.compactions}
+
+    def close(self) -> None:
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local LRU of sessions, capped by session count and total tokens."""
+
+    def __init__(self, max_sessions: int = 1000, max_total_tokens: int = 2_000_000, **kwargs):
+        super().__init__(**kwargs)
+        self.max_sessions = max_sessions
+        self.max_total_tokens = max_total_tokens
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._total_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _load(self, conversation_id: str) -> Optional[Session]:
+        session = self._sessions.get(conversation_id)
+        if session is not None:
+            self._sessions.move_to_end(conversation_id)
+        return session
+
+    def _save(self, session: Session) -> None:
+        self._delete(session.conversation_id)
+        self._sessions[session.conversation_id] = session
+        self._total_tokens += session.tokens
+        expired_before = time.time() - self.ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.updated_at > expired_before:
+                break
+            self._delete(oldest.conversation_id)
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._total_tokens > self.max_total_tokens
+        ):
+            _, evicted = self._sessions.popitem(last=False)
+            self._total_tokens -= evicted.tokens
+            self.evictions += 1
+
+    def _delete(self, conversation_id: str) -> None:
+        session = self._sessions.pop(conversation_id, None)
+        if session is not None:
+            self._total_tokens -= session.tokens
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "tokens": self._total_tokens,
+                "compactions": self.compactions,
+                "evictions": self.evictions,
+            }
+
+
+class SqliteSessionStore(SessionStore):
+    """Sessions serialized to a local SQLite file.
+
+    Stands in for a shared key-value store (e.g. Redis): every worker on the
+    host sees the same sessions, and expiry and the size cap are enforced
+    with queries instead of in-process bookkeeping.
+    """
+
+    def __init__(self, path: Path, max_sessions: int = 10_000, **kwargs):
+        super().__init__(**kwargs)
+        self.max_sessions = max_sessions
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                conversation_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at)")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _load(self, conversation_id: str) -> Optional[Session]:
+        row = self._conn.execute(
+            "SELECT payload FROM sessions WHERE conversation_id = ?", (conversation_id,)
+        ).fetchone()
+        return Session(**json.loads(row[0])) if row else None
+
+    def _save(self, session: Session) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (conversation_id, payload, updated_at) VALUES (?, ?, ?)",
+                (session.conversation_id, json.dumps(asdict(session)), session.updated_at),
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at <= ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                """
+                DELETE FROM sessions WHERE conversation_id IN (
+                    SELECT conversation_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_sessions,),
+            )
+
+    def _delete(self, conversation_id: str) -> None:
+        self._conn.execute("DELETE FROM sessions WHERE conversation_id = ?", (conversation_id,))
+
+    def close(self) -> None:
+        self._conn.close()
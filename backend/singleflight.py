@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one shared execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task. Each waiter is shielded,
+    so a cancelled waiter (e.g. a disconnected client) leaves the others
+    untouched. The work is cancelled only once every waiter has gone.
+    """
+
+    def __init__(self):
+        # key -> (task, number of callers still waiting on it)
+        self._inflight: Dict[Hashable, Tuple[asyncio.Task, int]] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.abandoned = 0
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(work())
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.leaders += 1
+        else:
+            task = entry[0]
+            self.followers += 1
+        self._inflight[key] = (task, (entry[1] if entry else 0) + 1)
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._leave(key, task)
+            raise
+
+    def _leave(self, key: Hashable, task: asyncio.Task) -> None:
+        entry = self._inflight.get(key)
+        if entry is None or entry[0] is not task:
+            return
+        waiters = entry[1] - 1
+        if waiters > 0:
+            self._inflight[key] = (task, waiters)
+            return
+        del self._inflight[key]
+        self.abandoned += 1
+        task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; every waiter re-raises it anyway
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "abandoned": self.abandoned,
+        }
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+TOOL_OUTPUT_PREVIEW_CHARS = 200
+
+StreamEvent = Tuple[str, Dict[str, Any]]
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return str(content or "")
+
+
+def _navigation_from_tool_calls(message: Any) -> Optional[str]:
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        if tool_call["name"] == "navigate_to_section":
+            return tool_call["args"].get("section")
+    return None
+
+
+async def iter_agent_events(
+    agent: Any, initial_state: Dict[str, Any], config: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[StreamEvent]:
+    """Translate LangGraph run events into chat stream events.
+
+    Yields ``token``, ``tool_start``, ``tool_end`` and ``action`` events as
+    they happen, then a single ``final`` event carrying the answer text,
+    navigation payload and the messages the run added. Closing this generator cancels the underlying run.
+    """
+    final_text = ""
+    navigation_payload: Optional[str] = None
+    final_messages: List[Any] = []
+
+    async with aclosing(agent.astream_events(initial_state, config, version="v2")) as events:
+        async for event in events:
+            kind = event["event"]
+            data = event.get("data", {})
+
+            if kind == "on_chat_model_stream":
+                text = _text(getattr(data.get("chunk"), "content", ""))
+                if text:
+                    yield "token", {"text": text}
+
+            elif kind == "on_chat_model_end":
+                output = data.get("output")
+                section = _navigation_from_tool_calls(output)
+                if section and navigation_payload is None:
+                    navigation_payload = section
+                    yield "action", {"type": "NAVIGATE", "payload": section}
+                if output is not None and not getattr(output, "tool_calls", None):
+                    final_text = _text(output.content)
+
+            elif kind == "on_tool_start":
+                yield "tool_start", {"name": event["name"], "input": data.get("input")}
+
+            elif kind == "on_tool_end":
+                output = data.get("output")
+                preview = _text(getattr(output, "content", output))
+                yield "tool_end", {
+                    "name": event["name"],
+                    "output": preview[:TOOL_OUTPUT_PREVIEW_CHARS],
+                }
+
+            elif kind == "on_chain_end" and event["name"] == "agent":
+                output = data.get("output")
+                message = output["messages"][-1] if isinstance(output, dict) and output.get("messages") else None
+                if getattr(message, "response_metadata", {}).get("degraded"):
+                    # A fallback answer after a deadline or the iteration cap; no model streamed it.
+                    final_text = _text(message.content)
+                    yield "token", {"text": final_text}
+                section = output.get("navigation_payload") if isinstance(output, dict) else None
+                if section and navigation_payload is None:
+                    # Navigation inferred from the answer text rather than a tool call.
+                    navigation_payload = section
+                    yield "action", {"type": "NAVIGATE", "payload": section}
+
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                output = data.get("output")
+                if isinstance(output, dict):
+                    final_messages = output.get("messages", [])
+
+    # `messages` holds only what the run added after the initial state.
+    yield "final", {
+        "response": final_text,
+        "navigation_payload": navigation_payload,
+        "messages": final_messages[len(initial_state["messages"]):],
+    }
@@ -0,0 +1,110 @@
+"""API tests against the offline fakes (PORTFOLIO_FAKE_MODELS=1) and a synthetic data dir."""
+
+import json
+import os
+
+os.environ["PORTFOLIO_FAKE_MODELS"] = "1"
+os.environ["SEED_WATCH_INTERVAL"] = "0"
+os.environ["STARTUP_WARMUP"] = "eager"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.admission import AdmissionController
+from backend.benchmarks.synthetic import temporary_data_dir
+
+AGENT_QUESTION = "Which of his projects use vector search, and how?"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with temporary_data_dir(rows=90), TestClient(main.app) as client:
+        yield client
+
+
+def parse_sse(body: str):
+    """The (event, data) pairs of a server-sent event stream."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_tokens_then_done(client):
+    response = client.post("/api/chat/stream", json={"message": AGENT_QUESTION})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and names.count("done") == 1
+    assert "error" not in names
+    assert names.count("tool_start") == names.count("tool_end")
+    # Any tool calls come first; the answer then streams as tokens until `done`.
+    answer = names[names.index("token"):-1]
+    assert answer and set(answer) == {"token"}
+    text = "".join(data["text"] for name, data in events if name == "token")
+    assert text == events[-1][1]["response"]
+
+
+def test_chat_is_rate_limited(client, monkeypatch):
+    admission = AdmissionController(max_concurrent=4, max_queue=4, queue_timeout=1, rate_per_minute=1, rate_burst=1)
+    monkeypatch.setattr(main, "CHAT_ADMISSION", admission)
+
+    assert client.post("/api/chat", json={"message": "Show me his projects"}).status_code == 200
+    response = client.post("/api/chat", json={"message": "Show me his projects"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert admission.rejected["rate_limited"] == 1
+
+
+def test_chat_is_refused_when_the_queue_is_full(client, monkeypatch):
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+    monkeypatch.setattr(main, "CHAT_ADMISSION", admission)
+    # Another request holds the only slot, on the app's own event loop.
+    ticket = client.portal.call(admission.acquire)
+    try:
+        response = client.post("/api/chat", json={"message": AGENT_QUESTION})
+    finally:
+        ticket.release()
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == main.BUSY_DETAIL
+    assert "Retry-After" in response.headers
+    assert client.post("/api/chat", json={"message": "Show me his projects"}).status_code == 200
+
+
+def test_project_cursor_round_trip(client):
+    everything = client.get("/api/projects").json()
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 7} if cursor is None else {"limit": 7, "cursor": cursor}
+        response = client.get("/api/projects", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert len(pages) > 1
+    assert all(len(page) == 7 for page in pages[:-1])
+    assert [project["slug"] for page in pages for project in page] == [p["slug"] for p in everything]
+
+
+def test_project_cursor_keeps_filters(client):
+    tag = client.get("/api/projects").json()[0]["tags"][0]
+    first = client.get("/api/projects", params={"tag": tag, "limit": 1})
+    assert first.status_code == 200
+
+    second = client.get("/api/projects", params={"tag": tag, "limit": 1, "cursor": first.headers["X-Next-Cursor"]})
+
+    assert second.status_code == 200
+    assert all(tag in project["tags"] for project in first.json() + second.json())
+    assert second.json()[0]["slug"] != first.json()[0]["slug"]
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/projects", params={"cursor": "not-a-cursor"}).status_code == 400
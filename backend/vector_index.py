@@ -0,0 +1,321 @@
+"""A dependency-light vector index on one contiguous NumPy matrix.
+
+Rows are unit-normalized at insert time, so cosine similarity for a query is
+a single matrix-vector product, and top-k is an `argpartition` over the
+scores. Rows can be stored as float32, float16 or int8 (symmetric, one
+scale per row); the reduced types are widened block by block while
+scoring, so memory stays at the stored size. int8 scores at close to
+float32 speed in a quarter of the memory; NumPy's float16 widening is
+slow, so float16 only trades latency for memory. Per-source and per-tag
+row masks are precomputed, which makes filtered search exact instead of
+an over-fetch-and-filter.
+
+The store exposes the slice of the LangChain vector store interface this
+app uses (`embeddings`, `similarity_search_by_vector` and its async twin),
+so it can stand in for the FAISS store anywhere in the pipeline.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+DTYPES = ("float32", "float16", "int8")
+# Rows widened to float32 per scoring step for float16/int8 storage (small
+# enough for the widened block to stay in cache).
+SCORE_BLOCK_ROWS = 256
+# Filters matching more than this fraction of rows score every row and pick
+# the candidates' scores; gathering that many rows first costs more.
+GATHER_MAX_FRACTION = 0.25
+# Metadata fields that get precomputed row masks, and the filter keys they answer to.
+MASK_FIELDS = {"source": "source", "tags": "tag"}
+
+
+# -------------------- Quantization -------------------- #
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(unit_rows: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Encode normalized float32 rows as `dtype`; int8 also returns per-row scales."""
+    if dtype == "float32":
+        return np.ascontiguousarray(unit_rows, dtype=np.float32), None
+    if dtype == "float16":
+        return np.ascontiguousarray(unit_rows, dtype=np.float16), None
+    if dtype == "int8":
+        peaks = np.abs(unit_rows).max(axis=1, initial=0.0)
+        peaks[peaks == 0] = 1.0
+        scales = (peaks / 127.0).astype(np.float32)
+        codes = np.rint(unit_rows / scales[:, None]).clip(-127, 127).astype(np.int8)
+        return np.ascontiguousarray(codes), scales
+    raise ValueError(f"Unsupported vector dtype {dtype!r}; expected one of {DTYPES}.")
+
+
+# -------------------- Store -------------------- #
+
+class NumpyVectorStore:
+    """Unit vectors in one matrix plus the documents and masks that describe each row.
+
+    Instances are treated as immutable once published: `upsert` is only
+    called on a `copy()`, and it replaces arrays rather than writing into
+    them, so a copy shares memory with its original until it changes.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        matrix: np.ndarray,
+        ids: Sequence[str],
+        documents: Sequence[Document],
+        scales: Optional[np.ndarray] = None,
+        dtype: str = "float32",
+    ):
+        self.embeddings = embeddings
+        self.matrix = matrix
+        self.scales = scales
+        self.dtype = dtype
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.masks = self._build_masks(self.documents)
+
+    @classmethod
+    def from_embeddings(
+        cls,
+        docs: Sequence[dict],
+        vectors: Sequence[Sequence[float]],
+        embeddings: Embeddings,
+        ids: Sequence[str],
+        dtype: str = "float32",
+    ) -> "NumpyVectorStore":
+        unit_rows = _normalize(vectors) if len(vectors) else np.zeros((0, 0), dtype=np.float32)
+        matrix, scales = quantize(unit_rows, dtype)
+        documents = [Document(page_content=doc["content"], metadata=doc["metadata"]) for doc in docs]
+        return cls(embeddings, matrix, ids, documents, scales, dtype)
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["NumpyVectorStore"]) -> "NumpyVectorStore":
+        """One store with the rows of `parts` in order; they share embeddings and dtype."""
+        first = parts[0]
+        scales = np.concatenate([part.scales for part in parts]) if first.scales is not None else None
+        return cls(
+            first.embeddings,
+            np.concatenate([part.matrix for part in parts]),
+            [item_id for part in parts for item_id in part.ids],
+            [document for part in parts for document in part.documents],
+            scales,
+            first.dtype,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vectors (and int8 scales), excluding documents."""
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    @staticmethod
+    def _build_masks(documents: Sequence[Document]) -> Dict[Tuple[str, str], np.ndarray]:
+        """(filter key, value) -> sorted row indices carrying that value."""
+        rows: Dict[Tuple[str, str], List[int]] = {}
+        for row, doc in enumerate(documents):
+            for field, key in MASK_FIELDS.items():
+                values = doc.metadata.get(field)
+                if values is None:
+                    continue
+                for value in values if isinstance(values, (list, tuple)) else (values,):
+                    rows.setdefault((key, str(value).lower()), []).append(row)
+        return {mask: np.asarray(indices, dtype=np.int64) for mask, indices in rows.items()}
+
+    # -------------------- Search -------------------- #
+
+    def candidates(self, filter: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """Row indices matching every key of `filter` (None means all rows)."""
+        if not filter:
+            return None
+        selected: Optional[np.ndarray] = None
+        for key, value in filter.items():
+            rows = self.masks.get((key, str(value).lower()))
+            if rows is None:
+                return np.zeros(0, dtype=np.int64)
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+        return selected
+
+    def scores(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of unit `queries` (q x d) against the stored rows (or `rows`)."""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        if self.dtype == "float32":
+            return queries @ matrix.T
+        out = np.empty((queries.shape[0], matrix.shape[0]), dtype=np.float32)
+        for start in range(0, matrix.shape[0], SCORE_BLOCK_ROWS):
+            block = matrix[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            out[:, start:start + SCORE_BLOCK_ROWS] = queries @ block.T
+        if self.scales is not None:
+            out *= self.scales if rows is None else self.scales[rows]
+        return out
+
+    def search_rows(
+        self,
+        vectors: Sequence[Sequence[float]],
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Top-`k` (row indices, cosine similarities) per query vector, best first."""
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        if not len(self.ids) or k <= 0:
+            return [empty for _ in vectors]
+        rows = self.candidates(filter)
+        if rows is not None and not len(rows):
+            return [empty for _ in vectors]
+        queries = _normalize(vectors)
+        if rows is not None and len(rows) > GATHER_MAX_FRACTION * len(self.ids):
+            scores = self.scores(queries)[:, rows]
+        else:
+            scores = self.scores(queries, rows)
+        k = min(k, scores.shape[1])
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, k - 1)[:k] if k < len(row_scores) else np.arange(len(row_scores))
+            top = top[np.argsort(-row_scores[top])]
+            results.append((rows[top] if rows is not None else top, row_scores[top]))
+        return results
+
+    def search(
+        self,
+        vectors: Sequence[Sequence[float]],
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Top-`k` (document, cosine similarity) per query vector, best first."""
+        return [
+            [(self.documents[row], float(score)) for row, score in zip(rows, scores)]
+            for rows, scores in self.search_rows(vectors, k, filter)
+        ]
+
+    def row_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """The stored unit vectors of `rows` as float32 (dequantized for int8)."""
+        vectors = self.matrix[rows].astype(np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[rows, None]
+        return vectors
+
+    def similarity_search_by_vector(
+        self, embedding: Sequence[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.search([embedding], k, filter)[0]]
+
+    async def asimilarity_search_by_vector(
+        self, embedding: Sequence[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        # A matvec over this corpus takes microseconds; a thread hop would cost more.
+        return self.similarity_search_by_vector(embedding, k, filter)
+
+    # -------------------- Updates -------------------- #
+
+    def copy(self) -> "NumpyVectorStore":
+        clone = object.__new__(NumpyVectorStore)
+        clone.__dict__.update(self.__dict__)
+        clone.ids = list(self.ids)
+        clone.documents = list(self.documents)
+        return clone
+
+    def upsert(
+        self,
+        docs: Sequence[dict],
+        vectors: Sequence[Sequence[float]],
+        ids: Sequence[str],
+        doc_ids: Optional[AbstractSet[str]] = None,
+    ) -> Tuple[int, int, int]:
+        """Same contract as `indexing.upsert_index`; returns added, replaced and removed counts."""
+        wanted = dict(zip(ids, zip(docs, vectors)))
+        position = {item_id: row for row, item_id in enumerate(self.ids)}
+        in_scope = [
+            item_id
+            for item_id, document in zip(self.ids, self.documents)
+            if doc_ids is None or document.metadata.get("doc_id") in doc_ids
+        ]
+        removed = [item_id for item_id in in_scope if item_id not in wanted]
+        changed = [
+            item_id
+            for item_id in in_scope
+            if item_id in wanted
+            and self.documents[position[item_id]].metadata.get("content_hash")
+            != wanted[item_id][0]["metadata"]["content_hash"]
+        ]
+        added = [item_id for item_id in wanted if item_id not in position]
+        if not (removed or changed or added):
+            return 0, 0, 0
+
+        upserts = changed + added
+        self.replace(
+            removed + changed,
+            [wanted[item_id][0] for item_id in upserts],
+            [wanted[item_id][1] for item_id in upserts],
+            upserts,
+        )
+        return len(added), len(changed), len(removed)
+
+    def replace(
+        self,
+        drop_ids: Sequence[str],
+        docs: Sequence[dict],
+        vectors: Sequence[Sequence[float]],
+        ids: Sequence[str],
+    ) -> None:
+        """Drop the rows `drop_ids`, then append `docs` with their vectors under `ids`."""
+        dropped = set(drop_ids)
+        keep = np.asarray([row for row, item_id in enumerate(self.ids) if item_id not in dropped], dtype=np.int64)
+        fresh = NumpyVectorStore.from_embeddings(docs, vectors, self.embeddings, ids, self.dtype)
+        kept_matrix = self.matrix[keep] if len(keep) else self.matrix[:0]
+        self.matrix = np.concatenate([kept_matrix, fresh.matrix]) if len(fresh) else kept_matrix
+        if self.scales is not None:
+            kept_scales = self.scales[keep] if len(keep) else self.scales[:0]
+            self.scales = np.concatenate([kept_scales, fresh.scales]) if len(fresh) else kept_scales
+        self.ids = [self.ids[row] for row in keep] + fresh.ids
+        self.documents = [self.documents[row] for row in keep] + fresh.documents
+        self.masks = self._build_masks(self.documents)
+
+    # -------------------- Persistence -------------------- #
+
+    def save(self, directory: Path, name: str) -> List[Path]:
+        """Write `<name>.npy` (plus `<name>.scales.npy`) and `<name>.json`; returns the paths written."""
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = [directory / f"{name}.npy", directory / f"{name}.json"]
+        np.save(paths[0], self.matrix)
+        if self.scales is not None:
+            paths.append(directory / f"{name}.scales.npy")
+            np.save(paths[-1], self.scales)
+        payload = {
+            "dtype": self.dtype,
+            "ids": self.ids,
+            "documents": [{"content": doc.page_content, "metadata": doc.metadata} for doc in self.documents],
+        }
+        with paths[1].open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False)
+        return paths
+
+    @classmethod
+    def load(cls, directory: Path, name: str, embeddings: Embeddings, mmap: bool = True) -> "NumpyVectorStore":
+        """Load a saved store; with `mmap` the vectors stay in the file, read-only.
+
+        A memory-mapped matrix lives in the OS page cache, so every process
+        that maps the same file shares one copy of it. Saved files are never
+        rewritten (each save uses a new name), so a mapping stays valid.
+        """
+        with (directory / f"{name}.json").open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        mmap_mode = "r" if mmap else None
+        matrix = np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+        scales_path = directory / f"{name}.scales.npy"
+        scales = np.load(scales_path, mmap_mode=mmap_mode) if scales_path.exists() else None
+        documents = [Document(page_content=doc["content"], metadata=doc["metadata"]) for doc in payload["documents"]]
+        return cls(embeddings, matrix, payload["ids"], documents, scales, payload["dtype"])
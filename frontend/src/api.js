@@ -18,11 +18,57 @@ export const fetchBlogs = () => apiFetch('/api/blogs');
 export const fetchBlogBySlug = (slug) =>
   apiFetch(`/api/blogs/${encodeURIComponent(slug)}`);
 
-export const postChatMessage = (message) =>
+export const postChatMessage = (message, conversationId = null) =>
   apiFetch('/api/chat', {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json'
     },
-    body: JSON.stringify({ message })
+    body: JSON.stringify({ message, conversation_id: conversationId })
   });
+
+const parseSseEvent = (raw) => {
+  let event = 'message';
+  const dataLines = [];
+  raw.split('\n').forEach((line) => {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      dataLines.push(line.slice(5).trimStart());
+    }
+  });
+  if (!dataLines.length) return null;
+  return { event, data: JSON.parse(dataLines.join('\n')) };
+};
+
+export const streamChatMessage = async (message, { conversationId = null, onEvent, signal } = {}) => {
+  const response = await fetch(`${API_BASE}/api/chat/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream'
+    },
+    body: JSON.stringify({ message, conversation_id: conversationId }),
+    signal
+  });
+  if (!response.ok || !response.body) {
+    const text = await response.text();
+    throw new Error(text || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const parsed = parseSseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      if (parsed) onEvent?.(parsed.event, parsed.data);
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+};
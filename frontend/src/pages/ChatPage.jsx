@@ -1,7 +1,7 @@
 import { useEffect, useRef, useState } from 'react';
 import PropTypes from 'prop-types';
 import ReactMarkdown from 'react-markdown';
-import { postChatMessage } from '../api.js';
+import { streamChatMessage } from '../api.js';
 
 const normalizeNavigation = (payload) => {
   if (!payload) return null;
@@ -32,6 +32,7 @@ const ChatPage = ({ setActivePage }) => {
   const [input, setInput] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const messagesEndRef = useRef(null);
+  const conversationIdRef = useRef(null);
 
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -42,30 +43,53 @@ const ChatPage = ({ setActivePage }) => {
     if (!trimmed) return;
 
     const userMessage = { sender: 'user', text: trimmed };
-    setMessages((prev) => [...prev, userMessage]);
+    setMessages((prev) => [...prev, userMessage, { sender: 'bot', text: '' }]);
     setInput('');
     setIsLoading(true);
 
-    try {
-      const data = await postChatMessage(trimmed);
-      setMessages((prev) => [
-        ...prev,
-        { sender: 'bot', text: data.response ?? 'I am here to help with projects and articles.' }
-      ]);
-      if (data.action && data.action.type === 'NAVIGATE') {
-        const target = normalizeNavigation(data.action.payload);
+    const updateBotMessage = (update) =>
+      setMessages((prev) => {
+        const next = [...prev];
+        const last = next[next.length - 1];
+        next[next.length - 1] = { ...last, text: update(last.text) };
+        return next;
+      });
+
+    const navigate = (action) => {
+      if (action && action.type === 'NAVIGATE') {
+        const target = normalizeNavigation(action.payload);
         if (target) {
           setActivePage(target);
         }
       }
-    } catch (error) {
-      setMessages((prev) => [
-        ...prev,
-        {
-          sender: 'bot',
-          text: 'I can only answer questions about the projects and articles on this portfolio. Try asking about a project.'
+    };
+
+    try {
+      let streamError = null;
+      await streamChatMessage(trimmed, {
+        conversationId: conversationIdRef.current,
+        onEvent: (event, data) => {
+          if (event === 'token') {
+            updateBotMessage((text) => text + data.text);
+          } else if (event === 'action') {
+            navigate(data);
+          } else if (event === 'done') {
+            if (data.conversation_id) {
+              conversationIdRef.current = data.conversation_id;
+            }
+            updateBotMessage(() => data.response ?? 'I am here to help with projects and articles.');
+          } else if (event === 'error') {
+            streamError = new Error(data.detail);
+          }
         }
-      ]);
+      });
+      if (streamError) throw streamError;
+    } catch (error) {
+      updateBotMessage(
+        (text) =>
+          text ||
+          'I can only answer questions about the projects and articles on this portfolio. Try asking about a project.'
+      );
       console.error(error);
     } finally {
       setIsLoading(false);
@@ -98,7 +122,7 @@ const ChatPage = ({ setActivePage }) => {
         <div className="absolute inset-x-12 top-0 h-32 rounded-full bg-gradient-to-r from-[#6f8cff]/15 to-transparent blur-3xl dark:from-[#2f3f70]/30" />
         <div className="relative flex min-h-[32rem] flex-col">
           <div className="flex-1 space-y-4 overflow-y-auto px-6 pb-6 pt-8 sm:px-10">
-            {messages.map((message, index) => (
+            {messages.map((message, index) => message.text && (
               <div
                 key={`${message.sender}-${index}`}
                 className={`flex ${message.sender === 'user' ? 'justify-end' : 'justify-start'}`}
@@ -114,7 +138,7 @@ const ChatPage = ({ setActivePage }) => {
                 </div>
               </div>
             ))}
-            {isLoading && (
+            {isLoading && !messages[messages.length - 1]?.text && (
               <div className="flex justify-start">
                 <span className="message-bubble bot bg-white/90 text-[#3b4d78] dark:bg-[#151f3d]/90 dark:text-[#9fb2ff]">
                   thinking…